@@ -5,6 +5,10 @@ import math
 import os
 import struct
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.replay import BALLOON, Recorder
+from common.scorestore import ScoreStore
+
 pygame.mixer.pre_init(44100, -16, 1, 512) 
 pygame.init()
 pygame.font.init()
@@ -83,13 +87,13 @@ class Particle:
             pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), int(self.radius))
 
 class Balloon:
-    def __init__(self, x, y, number, speed_multiplier):
+    def __init__(self, x, y, number, speed):
         self.start_x = x
         self.x = x
         self.y = y
         self.radius = 45
         self.number = number
-        self.base_speed = random.uniform(1.0, 2.0) * speed_multiplier
+        self.base_speed = speed
         self.color = random.choice(BALLOON_COLORS)
         self.wobble_speed = random.uniform(0.02, 0.05)
         self.wobble_amp = random.randint(10, 30)
@@ -147,44 +151,37 @@ class GameManager:
     def __init__(self):
         self.state = "MENU"
         self.score = 0
-        self.high_score = self.load_high_score()
+        self.store = ScoreStore("Beautiful-Balloon", legacy_file=HIGHSCORE_FILE)
+        self.high_score = self.store.high_score
         self.lives = 3
         self.question = ""
         self.correct_answer = 0
+        # One slot per column; a wrong balloon that floats away leaves its slot empty.
         self.balloons = []
         self.particles = []
+        # Gameplay draws come from the recorder's seeded RNG, in the order the
+        # server's replay makes them; frame counts game steps for the log.
+        self.recorder = None
+        self.frame = 0
         
         self.btn_start = Button(WIDTH//2 - 100, HEIGHT//2 + 50, 200, 60, "Start Game", BLUE, GREEN, self.start_game)
         self.btn_restart = Button(WIDTH//2 - 100, HEIGHT//2 + 80, 200, 60, "Play Again", BLUE, GREEN, self.start_game)
 
-    def load_high_score(self):
-        if not os.path.exists(HIGHSCORE_FILE):
-            return 0
-        try:
-            with open(HIGHSCORE_FILE, "r") as f:
-                return int(f.read().strip())
-        except:
-            return 0
-
     def save_high_score(self):
-        if self.score > self.high_score:
-            self.high_score = self.score
-            try:
-                with open(HIGHSCORE_FILE, "w") as f:
-                    f.write(str(self.high_score))
-            except IOError:
-                print("Could not save high score.")
+        self.store.record(self.score, self.recorder.encode())
+        self.high_score = self.store.high_score
 
     def generate_question(self):
+        rng = self.recorder.rng
         op_types = ['+']
         range_max = 10 + (self.score // 2)
         if self.score > 5: op_types.append('-')
         if self.score > 15: op_types.append('*')
         if self.score > 25: op_types.append('/')
 
-        op = random.choice(op_types)
-        num1 = random.randint(1, range_max)
-        num2 = random.randint(1, range_max)
+        op = op_types[rng.below(len(op_types))]
+        num1 = rng.below(range_max) + 1
+        num2 = rng.below(range_max) + 1
 
         if op == '+':
             self.correct_answer = num1 + num2
@@ -194,13 +191,13 @@ class GameManager:
             self.correct_answer = num1 - num2
             self.question = f"{num1} - {num2} = ?"
         elif op == '*':
-            n1 = random.randint(1, 6 + int(self.score/5))
-            n2 = random.randint(1, 6 + int(self.score/5))
+            n1 = rng.below(6 + int(self.score/5)) + 1
+            n2 = rng.below(6 + int(self.score/5)) + 1
             self.correct_answer = n1 * n2
             self.question = f"{n1} x {n2} = ?"
         elif op == '/':
-            num2 = random.randint(2, 8)
-            ans = random.randint(2, 10)
+            num2 = rng.below(7) + 2
+            ans = rng.below(9) + 2
             num1 = num2 * ans
             self.correct_answer = ans
             self.question = f"{num1} / {num2} = ?"
@@ -208,22 +205,26 @@ class GameManager:
         self.spawn_balloons()
 
     def spawn_balloons(self):
+        rng = self.recorder.rng
         self.balloons = []
         answers = [self.correct_answer]
         while len(answers) < 3:
-            offset = random.randint(-5, 5)
+            offset = rng.below(11) - 5
             fake = self.correct_answer + offset
             if fake != self.correct_answer and fake >= 0 and fake not in answers:
                 answers.append(fake)
         
-        random.shuffle(answers)
+        for i in range(len(answers) - 1, 0, -1):
+            j = rng.below(i + 1)
+            answers[i], answers[j] = answers[j], answers[i]
         spacing = WIDTH // 4
         positions = [spacing, spacing * 2, spacing * 3]
         speed_mult = 1.0 + (self.score * 0.05)
         
         for i in range(3):
-            y_pos = HEIGHT + 50 + random.randint(0, 100)
-            self.balloons.append(Balloon(positions[i], y_pos, answers[i], speed_mult))
+            y_pos = HEIGHT + 50 + rng.below(100)
+            speed = (rng.random() + 1.0) * speed_mult
+            self.balloons.append(Balloon(positions[i], y_pos, answers[i], speed))
 
     def create_explosion(self, x, y, color):
         for _ in range(15):
@@ -233,19 +234,19 @@ class GameManager:
         self.score = 0
         self.lives = 3
         self.particles = []
+        self.recorder = Recorder(BALLOON)
+        self.frame = 0
         self.generate_question()
         self.state = "PLAYING"
 
     def handle_click(self, pos):
         if self.state != "PLAYING": return
 
-        clicked_balloon = None
-        for b in self.balloons:
-            if b.is_clicked(pos):
-                clicked_balloon = b
-                break
+        slot = next((i for i, b in enumerate(self.balloons) if b and b.is_clicked(pos)), None)
         
-        if clicked_balloon:
+        if slot is not None:
+            clicked_balloon = self.balloons[slot]
+            self.recorder.record(self.frame, slot)
             pop_sound.play() 
             self.create_explosion(clicked_balloon.x, clicked_balloon.y, clicked_balloon.color)
             
@@ -262,18 +263,25 @@ class GameManager:
 
     def update(self):
         if self.state == "PLAYING":
-            for b in self.balloons[:]: 
-                b.move()
-                if b.y < -50:
-                    if b.number == self.correct_answer:
-                        self.lives -= 1
-                        if self.lives <= 0:
-                            self.save_high_score()
-                            self.state = "GAMEOVER"
-                        else:
-                            self.generate_question()
-                    else:
-                        self.balloons.remove(b)
+            # Move every balloon, then let them escape left to right; the
+            # server's replay steps a frame exactly like this.
+            self.frame += 1
+            for b in self.balloons:
+                if b:
+                    b.move()
+            for i, b in enumerate(self.balloons):
+                if not b or b.y >= -50:
+                    continue
+                if b.number != self.correct_answer:
+                    self.balloons[i] = None
+                    continue
+                self.lives -= 1
+                if self.lives <= 0:
+                    self.save_high_score()
+                    self.state = "GAMEOVER"
+                else:
+                    self.generate_question()
+                break
 
             for p in self.particles:
                 p.update()
@@ -320,7 +328,8 @@ class GameManager:
             screen.blit(q_txt, (WIDTH//2 - q_txt.get_width()//2, 10))
             
             for b in self.balloons:
-                b.draw(screen)
+                if b:
+                    b.draw(screen)
 
         elif self.state == "GAMEOVER":
             title = font_xl.render("GAME OVER", True, RED)
@@ -2,29 +2,13 @@ import tkinter as tk
 from tkinter import messagebox, Menu, scrolledtext
 from easyAI import TwoPlayersGame, AI_Player, Negamax
 import random
-import json
 import os
+import sys
 
-class HighScoreManager:
-    def __init__(self, filename="race21_highscore.json"):
-        self.filename = filename
-
-    def load_score(self):
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, "r") as f:
-                    data = json.load(f)
-                    return data.get("highscore", 500)
-            except:
-                return 500
-        return 500
-
-    def save_score(self, score):
-        try:
-            with open(self.filename, "w") as f:
-                json.dump({"highscore": score}, f)
-        except Exception as e:
-            print(f"Error saving score: {e}")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scorestore import ScoreStore
+
+HIGHSCORE_FILE = "race21_highscore.json"
 
 class RaceTo21(TwoPlayersGame):
     def __init__(self, players, difficulty="Hard"):
@@ -60,8 +44,8 @@ class CasinoBlackjackGUI:
         self.root.geometry("600x800")
         self.root.resizable(False, False)
         
-        self.hs_manager = HighScoreManager()
-        self.high_score = self.hs_manager.load_score()
+        self.store = ScoreStore("Black-Jack", legacy_file=HIGHSCORE_FILE, default=500)
+        self.high_score = self.store.high_score
         
         self.wallet = 500
         self.current_bet = 0
@@ -113,7 +97,7 @@ class CasinoBlackjackGUI:
 
     def reset_high_score(self):
         self.high_score = 500
-        self.hs_manager.save_score(500)
+        self.store.reset(500)
         self.update_stats_display()
         messagebox.showinfo("Reset", "High score reset to $500.")
 
@@ -293,7 +277,7 @@ class CasinoBlackjackGUI:
                 
                 if self.wallet > self.high_score:
                     self.high_score = self.wallet
-                    self.hs_manager.save_score(self.high_score)
+                    self.store.record(self.high_score)
                     self.log_action("NEW HIGH SCORE!")
                 
                 msg = f"BLACKJACK! You reached 21.\nPayout: ${winnings}"
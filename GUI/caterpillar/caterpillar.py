@@ -4,6 +4,7 @@ import os
 import wave
 import math
 import struct
+import sys
 
 try:
     import pygame
@@ -12,6 +13,9 @@ except ImportError:
     PYGAME_AVAILABLE = False
     print("For sound, please run: pip install pygame")
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scorestore import ScoreStore
+
 class SoundGenerator:
     @staticmethod
     def create_wav(filename, duration, type="noise"):
@@ -78,8 +82,8 @@ class KidsForestGame:
             except Exception as e:
                 print(f"Sound loading error: {e}")
 
-        self.score_file = "butterfly_count.txt"
-        self.butterflies_freed = self.load_score()
+        self.store = ScoreStore("Caterpillar", legacy_file="butterfly_count.txt")
+        self.butterflies_freed = self.store.high_score
         self.logic = CaterpillarLogic()
 
         self.header_frame = tk.Frame(root, bg="#558B2F", bd=5, relief="ridge")
@@ -120,19 +124,6 @@ class KidsForestGame:
         if PYGAME_AVAILABLE and name in self.sounds:
             self.sounds[name].play()
 
-    def load_score(self):
-        if os.path.exists(self.score_file):
-            try:
-                with open(self.score_file, "r") as f:
-                    return int(f.read())
-            except:
-                return 0
-        return 0
-
-    def save_score(self):
-        with open(self.score_file, "w") as f:
-            f.write(str(self.butterflies_freed))
-
     def draw_scene(self):
         self.canvas.delete("all")
         
@@ -205,7 +196,7 @@ class KidsForestGame:
         self.play_sound("magic")
         
         self.butterflies_freed += 1
-        self.save_score()
+        self.store.record(self.butterflies_freed)
         self.score_label.config(text=f"🦋 Butterflies Helped: {self.butterflies_freed}")
         
         self.bf_x, self.bf_y = 350, 300
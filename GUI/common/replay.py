@@ -0,0 +1,78 @@
+"""
+Seeded randomness and input logs for server-verified scores.
+
+The backend replays a play's log with the same rules (backend/base/replays)
+and only accepts the score the replay reaches, so every draw that shapes
+gameplay must come from the recorder's Random, in the order the server's
+simulator makes them. Cosmetic randomness (colours, particles) may keep
+using the random module.
+
+Usage:
+
+    recorder = Recorder(SNAKE, level=1)
+    recorder.rng.below(30)          # gameplay draws
+    recorder.record(tick, value)    # player inputs, ticks non-decreasing
+    store.record(score, recorder.encode())
+"""
+
+import base64
+import os
+import struct
+
+VERSION = 1
+SNAKE, BALLOON, PENCIL = 1, 2, 3
+GUI = 1
+# Snake's rules since it places food from its free-cell index.
+GUI_FREE_CELLS = 2
+MASK = 0xFFFFFFFF
+
+
+class Random:
+    """mulberry32, bit for bit as the server and the web client run it."""
+
+    def __init__(self, seed):
+        self.state = seed & MASK
+
+    def next_uint32(self):
+        self.state = state = (self.state + 0x6D2B79F5) & MASK
+        t = ((state ^ (state >> 15)) * (state | 1)) & MASK
+        t ^= (t + ((t ^ (t >> 7)) * (t | 61))) & MASK
+        return t ^ (t >> 14)
+
+    def random(self):
+        """A float in [0, 1)."""
+        return self.next_uint32() / 4294967296
+
+    def below(self, n):
+        """An int in [0, n)."""
+        return int(self.next_uint32() / 4294967296 * n)
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class Recorder:
+    def __init__(self, game, level=0, seed=None, variant=GUI):
+        self.game = game
+        self.level = level
+        self.variant = variant
+        self.seed = int.from_bytes(os.urandom(4), "little") if seed is None else seed
+        self.rng = Random(self.seed)
+        self.events = bytearray()
+        self.count = 0
+        self.last_tick = 0
+
+    def record(self, tick, value):
+        write_varint(self.events, tick - self.last_tick)
+        write_varint(self.events, value)
+        self.last_tick = tick
+        self.count += 1
+
+    def encode(self):
+        out = bytearray(struct.pack("<BBBBI", VERSION, self.game, self.variant, self.level, self.seed))
+        write_varint(out, self.count)
+        return base64.b64encode(bytes(out + self.events)).decode("ascii")
@@ -0,0 +1,344 @@
+"""
+Offline-first score storage shared by the GUI games.
+
+Every finished play is appended to a local SQLite journal (WAL mode) by a
+background thread, so recording a score never blocks a frame. A second
+thread uploads pending plays to the backend's
+/api/submit-scores/batch/ endpoint, retrying with exponential backoff and
+refreshing the JWT when it expires. Each play carries an idempotency key, so
+a retried upload is never counted twice by the server. Plays the server
+refuses outright (a 4xx that retrying cannot fix) are set aside in the
+journal instead of being sent again.
+
+Configuration lives in ~/.educational_games/config.json (or the directory in
+EDU_GAMES_HOME) and may be overridden by environment variables:
+
+    {"api_url": "http://localhost", "username": "...", "password": "..."}
+
+    EDU_GAMES_API_URL, EDU_GAMES_USERNAME, EDU_GAMES_PASSWORD
+
+Without credentials the journal still works and plays stay pending until an
+account is configured.
+
+Usage:
+
+    store = ScoreStore("Snaky-Snake", legacy_file="snake_highscore.txt")
+    store.high_score          # best score seen on this machine
+    store.record(score)       # journal a finished play; returns immediately
+    store.record(score, recorder.encode())   # ...with its replay (see replay.py)
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+
+HOME_DIR = os.environ.get("EDU_GAMES_HOME", os.path.join(os.path.expanduser("~"), ".educational_games"))
+DB_FILE = os.path.join(HOME_DIR, "scores.sqlite3")
+CONFIG_FILE = os.path.join(HOME_DIR, "config.json")
+AUTH_FILE = os.path.join(HOME_DIR, "auth.json")
+
+UPLOAD_INTERVAL = 30
+UPLOAD_BATCH = 500
+MAX_BACKOFF = 600
+HTTP_TIMEOUT = 10
+# Failures worth retrying later: an expired login, throttling and timeouts. So
+# is any 5xx; other 4xx responses, 403 included, will not change on a retry.
+RETRY_STATUSES = {401, 408, 429}
+
+# plays.uploaded: still to send, sent (accepted or rejected), refused outright.
+PENDING, UPLOADED, REFUSED = 0, 1, 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plays (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    played_at TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    uploaded INTEGER NOT NULL DEFAULT 0,
+    replay TEXT
+);
+CREATE INDEX IF NOT EXISTS plays_pending ON plays (uploaded, id);
+CREATE TABLE IF NOT EXISTS bests (
+    game TEXT PRIMARY KEY,
+    score INTEGER NOT NULL
+);
+"""
+
+
+def connect():
+    os.makedirs(HOME_DIR, exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(plays)")}
+    if "replay" not in columns:
+        # Journals written before plays carried replays.
+        conn.execute("ALTER TABLE plays ADD COLUMN replay TEXT")
+    return conn
+
+
+def read_legacy_score(path):
+    """Reads the per-game high score files the games used before the journal."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            text = f.read().strip()
+        if text.startswith("{"):
+            return int(json.loads(text)["highscore"])
+        return int(text)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def load_json(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Uploader:
+    """Pushes pending journal rows to the backend. Runs on the store's upload thread."""
+
+    def __init__(self):
+        config = load_json(CONFIG_FILE)
+        self.api_url = os.environ.get("EDU_GAMES_API_URL", config.get("api_url", "http://localhost")).rstrip("/")
+        self.username = os.environ.get("EDU_GAMES_USERNAME", config.get("username"))
+        self.password = os.environ.get("EDU_GAMES_PASSWORD", config.get("password"))
+        auth = load_json(AUTH_FILE)
+        self.access = auth.get("access")
+        self.refresh = auth.get("refresh", config.get("refresh_token"))
+        self.failures = 0
+        # Halved while the server refuses batches without saying which play is
+        # at fault, and back to UPLOAD_BATCH once a batch goes through.
+        self.batch_size = UPLOAD_BATCH
+        # Games the server did not know this session; their plays wait for the next one.
+        self.unknown_games = set()
+
+    @property
+    def configured(self):
+        return bool(self.refresh or (self.username and self.password))
+
+    def next_delay(self):
+        if not self.failures:
+            return UPLOAD_INTERVAL
+        delay = min(MAX_BACKOFF, UPLOAD_INTERVAL * 2 ** (self.failures - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def post(self, path, payload, token=None):
+        request = urllib.request.Request(
+            f"{self.api_url}{path}",
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            return json.loads(response.read() or b"{}")
+
+    def save_tokens(self):
+        try:
+            with open(AUTH_FILE, "w") as f:
+                json.dump({"access": self.access, "refresh": self.refresh}, f)
+        except OSError as e:
+            print(f"Could not save login tokens: {e}")
+
+    def authenticate(self):
+        """Gets a fresh access token, preferring the refresh token over a full login."""
+        if self.refresh:
+            try:
+                data = self.post("/api/token/refresh/", {"refresh": self.refresh})
+                self.access = data["access"]
+                self.refresh = data.get("refresh", self.refresh)
+                self.save_tokens()
+                return
+            except urllib.error.HTTPError as e:
+                if e.code not in (400, 401):
+                    raise
+                self.refresh = None
+        if not (self.username and self.password):
+            raise PermissionError("No valid credentials for score upload")
+        data = self.post("/api/token/", {"username": self.username, "password": self.password})
+        self.access, self.refresh = data["access"], data["refresh"]
+        self.save_tokens()
+
+    def upload(self, conn):
+        """Uploads one batch. Returns True when more pending rows remain."""
+        skip = sorted(self.unknown_games)
+        rows = conn.execute(
+            "SELECT id, game, score, played_at, idempotency_key, replay FROM plays"
+            f" WHERE uploaded = ? AND game NOT IN ({', '.join('?' * len(skip))}) ORDER BY id LIMIT ?",
+            (PENDING, *skip, self.batch_size),
+        ).fetchall()
+        if not rows:
+            return False
+
+        records = []
+        for _, game, score, played_at, key, replay in rows:
+            record = {"game_name": game, "score": score, "client_timestamp": played_at, "idempotency_key": key}
+            if replay:
+                record["replay"] = replay
+            records.append(record)
+        if not self.access:
+            self.authenticate()
+        try:
+            result = self.post_batch(records)
+        except urllib.error.HTTPError as e:
+            if e.code != 401:
+                raise
+            self.authenticate()
+            result = self.post_batch(records)
+        if isinstance(result, urllib.error.HTTPError):
+            return self.refused(conn, rows, result)
+        # A rejected play would be rejected again, so it counts as uploaded too.
+        for rejected in result.get("rejected", []):
+            print(f"Score rejected by the server: {rejected['error']}")
+        # The server skips plays of games it has no record of; they stay
+        # pending in case the game is added before the next session.
+        unknown = set(result.get("unknown_games", []))
+        if unknown - self.unknown_games:
+            print(f"Server does not know {', '.join(sorted(unknown - self.unknown_games))}; keeping those plays")
+        self.unknown_games |= unknown
+
+        conn.executemany(
+            "UPDATE plays SET uploaded = ? WHERE id = ?",
+            [(UPLOADED, row[0]) for row in rows if row[1] not in unknown],
+        )
+        conn.commit()
+        more = len(rows) == self.batch_size
+        self.batch_size = UPLOAD_BATCH
+        return more
+
+    def post_batch(self, records):
+        """The server's reply to a batch, or the HTTPError of a refusal that retrying cannot fix."""
+        try:
+            return self.post("/api/submit-scores/batch/", records, self.access)
+        except urllib.error.HTTPError as e:
+            if e.code in RETRY_STATUSES or e.code >= 500:
+                raise
+            return e
+
+    def refused(self, conn, rows, error):
+        """
+        Sets aside the plays of a batch the server refused with a 4xx, so they
+        are not sent again. A 400 listing errors per record marks the plays at
+        fault; otherwise batches are halved until the play at fault is sent
+        alone. Returns True, as the rest of the journal can go on at once.
+        """
+        try:
+            errors = json.loads(error.read() or b"null")
+        except (OSError, ValueError):
+            errors = None
+        bad = []
+        if isinstance(errors, list) and len(errors) == len(rows):
+            bad = [row for row, e in zip(rows, errors) if e]
+        if not bad:
+            if len(rows) > 1:
+                self.batch_size = len(rows) // 2
+                return True
+            bad = rows
+        print(f"Server refused {len(bad)} score(s) ({error.code}); setting them aside")
+        conn.executemany("UPDATE plays SET uploaded = ? WHERE id = ?", [(REFUSED, row[0]) for row in bad])
+        conn.commit()
+        return True
+
+
+class ScoreStore:
+    def __init__(self, game_name, legacy_file=None, default=0):
+        self.game_name = game_name
+        self.queue = queue.Queue()
+        self.wake_uploader = threading.Event()
+
+        # One short read at startup, before the game loop begins.
+        conn = connect()
+        row = conn.execute("SELECT score FROM bests WHERE game = ?", (game_name,)).fetchone()
+        if row is None:
+            legacy = read_legacy_score(legacy_file)
+            best = legacy if legacy is not None else default
+            conn.execute("INSERT OR IGNORE INTO bests (game, score) VALUES (?, ?)", (game_name, best))
+            conn.commit()
+        else:
+            best = row[0]
+        conn.close()
+        self.high_score = best
+
+        # Journal writes and uploads run on separate threads so a slow network
+        # never delays the write of a just-finished play.
+        self.writer = threading.Thread(target=self.write_loop, name=f"scorestore-{game_name}", daemon=True)
+        self.writer.start()
+        threading.Thread(target=self.upload_loop, name=f"scoreupload-{game_name}", daemon=True).start()
+        atexit.register(self.close)
+
+    def record(self, score, replay=None):
+        """Journals a finished play, with its replay log if any, and updates the local best. Never blocks."""
+        score = int(score)
+        if score > self.high_score:
+            self.high_score = score
+        played_at = datetime.now(timezone.utc).isoformat()
+        self.queue.put(("play", score, played_at, uuid.uuid4().hex, replay))
+
+    def reset(self, score=0):
+        """Resets the local best (e.g. a "Reset High Score" menu item). Recorded plays are kept."""
+        self.high_score = score
+        self.queue.put(("reset", score))
+
+    def close(self, timeout=2):
+        """Flushes queued plays to the journal; called automatically at exit."""
+        if self.writer.is_alive():
+            self.queue.put(("stop",))
+            self.writer.join(timeout)
+
+    def write_loop(self):
+        conn = connect()
+        while True:
+            message = self.queue.get()
+            if message[0] == "play":
+                _, score, played_at, key, replay = message
+                conn.execute(
+                    "INSERT INTO plays (game, score, played_at, idempotency_key, replay) VALUES (?, ?, ?, ?, ?)",
+                    (self.game_name, score, played_at, key, replay),
+                )
+                conn.execute("UPDATE bests SET score = MAX(score, ?) WHERE game = ?", (score, self.game_name))
+                conn.commit()
+                self.wake_uploader.set()
+            elif message[0] == "reset":
+                conn.execute("UPDATE bests SET score = ? WHERE game = ?", (message[1], self.game_name))
+                conn.commit()
+            elif message[0] == "stop":
+                conn.close()
+                return
+
+    def upload_loop(self):
+        conn = connect()
+        uploader = Uploader()
+        delay = 1
+        while True:
+            self.wake_uploader.wait(delay)
+            self.wake_uploader.clear()
+            if not uploader.configured:
+                delay = UPLOAD_INTERVAL
+                continue
+            try:
+                more = uploader.upload(conn)
+                uploader.failures = 0
+                delay = 0 if more else UPLOAD_INTERVAL
+            except (OSError, ValueError, KeyError, PermissionError, sqlite3.Error) as e:
+                uploader.failures += 1
+                print(f"Score upload failed ({e}); retrying later.")
+                # Sleep rather than wait on the event so new plays don't cut the backoff short.
+                time.sleep(uploader.next_delay())
+                delay = 0
@@ -0,0 +1,231 @@
+"""
+Tests for the score journal and its upload agent, against a SQLite file in a
+temporary directory and a stubbed Uploader.post. From GUI/:
+
+    python -m unittest common.tests
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+import urllib.error
+from unittest import mock
+
+from common import scorestore
+from common.scorestore import PENDING, REFUSED, UPLOADED, ScoreStore, Uploader
+
+BATCH_PATH = "/api/submit-scores/batch/"
+
+
+def http_error(code, body=b""):
+    return urllib.error.HTTPError("http://test" + BATCH_PATH, code, "error", {}, io.BytesIO(body))
+
+
+class StubServer:
+    """Stands in for Uploader.post: answers each call with the next scripted reply."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def __call__(self, path, payload, token=None):
+        self.calls.append((path, payload, token))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply(payload) if callable(reply) else reply
+
+    def batches(self):
+        return [payload for path, payload, _ in self.calls if path == BATCH_PATH]
+
+
+def accept_all(records):
+    return {"accepted": len(records), "duplicates": 0, "unknown_games": [], "rejected": [], "new_high_scores": []}
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        home = tempfile.TemporaryDirectory()
+        self.addCleanup(home.cleanup)
+        self.home = home.name
+        for name, value in {
+            "HOME_DIR": self.home,
+            "DB_FILE": os.path.join(self.home, "scores.sqlite3"),
+            "CONFIG_FILE": os.path.join(self.home, "config.json"),
+            "AUTH_FILE": os.path.join(self.home, "auth.json"),
+        }.items():
+            patcher = mock.patch.object(scorestore, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        environ = mock.patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        for key in ("EDU_GAMES_API_URL", "EDU_GAMES_USERNAME", "EDU_GAMES_PASSWORD"):
+            os.environ.pop(key, None)
+        quiet = mock.patch.object(scorestore, "print", create=True)
+        quiet.start()
+        self.addCleanup(quiet.stop)
+
+        self.conn = scorestore.connect()
+        self.addCleanup(self.conn.close)
+
+    def add_play(self, game="Snaky-Snake", score=10, key=None):
+        cursor = self.conn.execute(
+            "INSERT INTO plays (game, score, played_at, idempotency_key) VALUES (?, ?, ?, ?)",
+            (game, score, "2026-01-01T00:00:00+00:00", key or os.urandom(8).hex()),
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def states(self):
+        return dict(self.conn.execute("SELECT id, uploaded FROM plays"))
+
+    def uploader(self, *replies, access="token"):
+        with open(scorestore.CONFIG_FILE, "w") as f:
+            json.dump({"api_url": "http://test", "username": "kid", "password": "secret"}, f)
+        uploader = Uploader()
+        uploader.access = access
+        uploader.post = StubServer(*replies)
+        return uploader
+
+
+class ScoreStoreTests(JournalTestCase):
+    def test_record_journals_plays_and_best(self):
+        legacy = os.path.join(self.home, "legacy.txt")
+        with open(legacy, "w") as f:
+            f.write("25")
+        store = ScoreStore("Snaky-Snake", legacy_file=legacy)
+        self.assertEqual(store.high_score, 25)
+
+        store.record(40, replay="log")
+        store.record(30)
+        store.close()
+
+        self.assertEqual(store.high_score, 40)
+        plays = self.conn.execute("SELECT score, idempotency_key, uploaded, replay FROM plays ORDER BY id").fetchall()
+        self.assertEqual([(p[0], p[2], p[3]) for p in plays], [(40, PENDING, "log"), (30, PENDING, None)])
+        self.assertNotEqual(plays[0][1], plays[1][1])
+        self.assertEqual(self.conn.execute("SELECT score FROM bests WHERE game = 'Snaky-Snake'").fetchone(), (40,))
+
+
+class UploaderTests(JournalTestCase):
+    def test_retry_resends_the_same_idempotency_keys(self):
+        plays = [self.add_play(score=s) for s in (10, 20)]
+        uploader = self.uploader(http_error(503), accept_all)
+
+        with self.assertRaises(urllib.error.HTTPError):
+            uploader.upload(self.conn)
+        self.assertEqual(set(self.states().values()), {PENDING})
+        self.assertFalse(uploader.upload(self.conn))
+
+        first, second = uploader.post.batches()
+        self.assertEqual(first, second)
+        keys = dict(self.conn.execute("SELECT id, idempotency_key FROM plays"))
+        self.assertEqual([r["idempotency_key"] for r in second], [keys[i] for i in plays])
+        self.assertEqual(set(self.states().values()), {UPLOADED})
+
+    def test_expired_token_is_refreshed_and_batch_retried(self):
+        self.add_play()
+        uploader = self.uploader(http_error(401), {"access": "fresh"}, accept_all, access="stale")
+        uploader.refresh = "refresh-token"
+
+        self.assertFalse(uploader.upload(self.conn))
+
+        self.assertEqual(
+            [(path, token) for path, _, token in uploader.post.calls],
+            [(BATCH_PATH, "stale"), ("/api/token/refresh/", None), (BATCH_PATH, "fresh")],
+        )
+        with open(scorestore.AUTH_FILE) as f:
+            self.assertEqual(json.load(f), {"access": "fresh", "refresh": "refresh-token"})
+        self.assertEqual(set(self.states().values()), {UPLOADED})
+
+    def test_rejected_plays_are_done_and_unknown_games_stay_pending(self):
+        kept = self.add_play(key="kept")
+        rejected = self.add_play(key="cheat")
+        unknown = self.add_play(game="Brand-New-Game")
+        uploader = self.uploader({
+            "accepted": 1,
+            "duplicates": 0,
+            "unknown_games": ["Brand-New-Game"],
+            "rejected": [{"idempotency_key": "cheat", "error": "replay does not reach score"}],
+            "new_high_scores": [],
+        })
+
+        self.assertFalse(uploader.upload(self.conn))
+        self.assertEqual(self.states(), {kept: UPLOADED, rejected: UPLOADED, unknown: PENDING})
+
+        # The unknown game's play is not sent again this session.
+        self.assertFalse(uploader.upload(self.conn))
+        self.assertEqual(len(uploader.post.calls), 1)
+        self.assertEqual(self.states()[unknown], PENDING)
+
+    def test_upload_reports_whether_more_rows_remain(self):
+        for score in range(5):
+            self.add_play(score=score)
+        with mock.patch.object(scorestore, "UPLOAD_BATCH", 2):
+            uploader = self.uploader(accept_all, accept_all, accept_all)
+            self.assertEqual([uploader.upload(self.conn) for _ in range(4)], [True, True, False, False])
+        self.assertEqual([len(batch) for batch in uploader.post.batches()], [2, 2, 1])
+        self.assertEqual(set(self.states().values()), {UPLOADED})
+
+    def test_server_errors_leave_plays_pending(self):
+        self.add_play()
+        uploader = self.uploader(http_error(502))
+        with self.assertRaises(urllib.error.HTTPError):
+            uploader.upload(self.conn)
+        self.assertEqual(set(self.states().values()), {PENDING})
+
+    def test_invalid_records_are_set_aside(self):
+        good = self.add_play()
+        bad = self.add_play(score=-1)
+        errors = json.dumps([{}, {"score": ["Ensure this value is greater than or equal to 0."]}]).encode()
+        uploader = self.uploader(http_error(400, errors), accept_all)
+
+        self.assertTrue(uploader.upload(self.conn))
+        self.assertEqual(self.states(), {good: PENDING, bad: REFUSED})
+        self.assertFalse(uploader.upload(self.conn))
+        self.assertEqual(self.states(), {good: UPLOADED, bad: REFUSED})
+
+    def test_forbidden_plays_are_set_aside(self):
+        play = self.add_play()
+        uploader = self.uploader(http_error(403, b'{"detail": "forbidden"}'))
+
+        self.assertTrue(uploader.upload(self.conn))
+        self.assertEqual(self.states(), {play: REFUSED})
+        self.assertFalse(uploader.upload(self.conn))
+        self.assertEqual(len(uploader.post.calls), 1)
+
+    def test_batch_size_is_restored_after_an_upload_goes_through(self):
+        plays = [self.add_play(score=s) for s in range(5)]
+        with mock.patch.object(scorestore, "UPLOAD_BATCH", 4):
+            uploader = self.uploader(http_error(413), accept_all, accept_all)
+            self.assertTrue(uploader.upload(self.conn))
+            self.assertEqual(uploader.batch_size, 2)
+            self.assertTrue(uploader.upload(self.conn))
+            self.assertEqual(uploader.batch_size, 4)
+            self.assertFalse(uploader.upload(self.conn))
+
+        self.assertEqual([len(batch) for batch in uploader.post.batches()], [4, 2, 3])
+        self.assertEqual(self.states(), dict.fromkeys(plays, UPLOADED))
+
+    def test_refused_batch_is_split_until_the_bad_play_is_alone(self):
+        plays = [self.add_play(score=s) for s in range(4)]
+        too_big = plays[1]
+
+        def server(records):
+            if any(r["score"] == 1 for r in records):
+                raise http_error(413)
+            return accept_all(records)
+
+        uploader = self.uploader(*[server] * 10)
+        while uploader.upload(self.conn):
+            pass
+
+        self.assertEqual(self.states(), {p: REFUSED if p == too_big else UPLOADED for p in plays})
+        self.assertEqual([len(batch) for batch in uploader.post.batches()], [4, 2, 1, 3, 1, 1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
 import tkinter as tk
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scorestore import ScoreStore
 from easyAI import TwoPlayersGame, AI_Player, Negamax
 
 class CrawlerGame(TwoPlayersGame):
@@ -50,8 +54,8 @@ class KidsCrawlerGUI:
         self.root.geometry("800x700") 
         self.root.configure(bg="#C5E1A5")
 
-        self.score_file = "Crawler_highscore.txt"
-        self.high_score = self.load_score()
+        self.store = ScoreStore("Crawler", legacy_file="Crawler_highscore.txt")
+        self.high_score = self.store.high_score
 
  
         self.ai_algo = Negamax(5) 
@@ -61,19 +65,6 @@ class KidsCrawlerGUI:
         self.setup_ui()
         self.draw_scene()
 
-    def load_score(self):
-        if os.path.exists(self.score_file):
-            with open(self.score_file, "r") as f:
-                try:
-                    return int(f.read())
-                except:
-                    return 0
-        return 0
-
-    def save_score(self):
-        with open(self.score_file, "w") as f:
-            f.write(str(self.high_score))
-
     def setup_ui(self):
         self.score_frame = tk.Frame(self.root, bg="#33691E", bd=3, relief="ridge")
         self.score_frame.pack(fill="x", padx=10, pady=10)
@@ -146,7 +137,7 @@ class KidsCrawlerGUI:
 
         if self.game.is_over():
             self.high_score += 1
-            self.save_score()
+            self.store.record(self.high_score)
             self.score_label.config(text=f"⭐ Butterflies Helped: {self.high_score} ⭐")
             self.handle_game_over("You")
             return
@@ -206,7 +197,7 @@ class KidsCrawlerGUI:
 
     def reset_score_action(self):
         self.high_score = 0
-        self.save_score()
+        self.store.reset(0)
         self.score_label.config(text=f"⭐ Butterflies Helped: {self.high_score} ⭐")
 
     def disable_buttons(self):
@@ -6,6 +6,10 @@ import time
 import random
 import os
 import platform
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scorestore import ScoreStore
 
 HAS_PIL = False
 try:
@@ -172,7 +176,8 @@ class KangarooGame:
         
         self.score = 0
         self.answered_questions = set()
-        self.high_score = self.load_high_score()
+        self.store = ScoreStore("Kan-Ga-Roo", legacy_file=HIGH_SCORE_FILE)
+        self.high_score = self.store.high_score
 
         self.camera_x = 0
         self.game_started = False
@@ -188,23 +193,9 @@ class KangarooGame:
         self.update_ui()
         self.animate()
 
-    def load_high_score(self):
-        if os.path.exists(HIGH_SCORE_FILE):
-            try:
-                with open(HIGH_SCORE_FILE, "r") as f:
-                    return int(f.read().strip())
-            except:
-                return 0
-        return 0
-
     def save_high_score(self):
-        if self.score > self.high_score:
-            self.high_score = self.score
-            try:
-                with open(HIGH_SCORE_FILE, "w") as f:
-                    f.write(str(self.high_score))
-            except Exception as e:
-                print(f"Could not save score: {e}")
+        self.store.record(self.score)
+        self.high_score = self.store.high_score
 
     def init_level(self):
         self.platforms = []
@@ -376,7 +367,7 @@ class KangarooGame:
         }
         self.score = 0
         self.answered_questions = set()
-        self.high_score = self.load_high_score()
+        self.high_score = self.store.high_score
         
         self.camera_x = 0
         self.game_started = False
@@ -5,6 +5,9 @@ import os
 import math
 import array
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.scorestore import ScoreStore
+
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 750 
 CELL_SIZE = 200
@@ -137,17 +140,6 @@ class Mole:
         pygame.draw.rect(screen, (70, 70, 180), (self.rect.x + 35, self.hole_y + 35, 30, 30), border_radius=8)
         screen.blit(text_surf, (self.rect.x + 42, self.hole_y + 37))
 
-def load_high_score():
-    if os.path.exists(HS_FILE):
-        with open(HS_FILE, 'r') as f:
-            try: return int(f.read())
-            except: return 0
-    return 0
-
-def save_high_score(score):
-    with open(HS_FILE, 'w') as f:
-        f.write(str(score))
-
 def draw_button(screen, rect, text, font, hover=False):
     color = COLOR_BUTTON_HOVER if hover else COLOR_BUTTON
     pygame.draw.rect(screen, (50, 100, 40), (rect.x, rect.y+5, rect.width, rect.height), border_radius=15)
@@ -181,7 +173,8 @@ def main():
                pygame.K_KP1: 1, pygame.K_KP2: 2, pygame.K_KP3: 3, pygame.K_KP4: 4, pygame.K_KP5: 5, pygame.K_KP6: 6, pygame.K_KP7: 7, pygame.K_KP8: 8, pygame.K_KP9: 9}
 
     state, score, lives = "MENU", 0, 3
-    high_score = load_high_score()
+    store = ScoreStore("Whack-A-Mole", legacy_file=HS_FILE)
+    high_score = store.high_score
     next_popup = 0
     interval, duration = 2500, 2500 
 
@@ -213,13 +206,13 @@ def main():
                         
                         if hit_successful:
                             score += 10
-                            if score > high_score: high_score = score; save_high_score(high_score)
+                            if score > high_score: high_score = score
                             interval = max(900, interval - 20) 
                             duration = max(1000, duration - 20)
                         else:
                             lives -= 1
                             sounds['miss'].play()
-                            if lives <= 0: state = "GAMEOVER"
+                            if lives <= 0: state = "GAMEOVER"; store.record(score)
             
             elif state == "GAMEOVER":
                 if event.type == pygame.MOUSEBUTTONDOWN:
@@ -241,7 +234,7 @@ def main():
                 if m.update(): 
                     lives -= 1
                     sounds['miss'].play()
-                    if lives <= 0: state = "GAMEOVER"
+                    if lives <= 0 and state != "GAMEOVER": state = "GAMEOVER"; store.record(score)
 
         screen.fill(COLOR_BG)
         
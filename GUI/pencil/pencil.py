@@ -1,8 +1,11 @@
 import pygame
-import random
 import sys
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.replay import PENCIL, Recorder
+from common.scorestore import ScoreStore
+
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
 SIDEBAR_WIDTH = 250
@@ -241,9 +244,12 @@ RAW_PATTERNS = [
 ]
 
 
+# Every draw below comes from the game's seeded RNG, in the order the
+# server's replay (backend/base/replays/pencil.py) makes them.
+
 def parse_grid_string(pattern_data):
     grid = []
-    used_colors = set()
+    used_colors = {}
     
     for row_str in pattern_data:
         row_colors = []
@@ -251,29 +257,31 @@ def parse_grid_string(pattern_data):
             if char not in COLORS:
                 char = '.' 
             row_colors.append(char)
-            used_colors.add(char)
+            used_colors.setdefault(char)
         grid.append(row_colors)
         
     return grid, list(used_colors)
 
-def generate_math_problem(target_answer):
-    op = random.choice(['+', '-'])
+def generate_math_problem(rng, target_answer):
+    op = '+' if rng.random() > 0.5 else '-'
     
     if op == '+':
         if target_answer > 1:
-            a = random.randint(1, target_answer - 1)
+            a = rng.below(target_answer - 1) + 1
         else:
             a = 0
         b = target_answer - a
         return f"{a} + {b}"
     else:
-        b = random.randint(1, 10)
+        b = rng.below(10) + 1
         a = target_answer + b
         return f"{a} - {b}"
 
-def create_palette_assignment(used_chars):
-    needed_count = len(used_chars)
-    pool = random.sample(range(1, 51), k=needed_count + 5)
+def create_palette_assignment(rng, used_chars):
+    pool = list(range(1, 51))
+    for i in range(len(pool) - 1, 0, -1):
+        j = rng.below(i + 1)
+        pool[i], pool[j] = pool[j], pool[i]
     char_to_answers = {}
     palette_list = []
     pool_idx = 0
@@ -284,7 +292,7 @@ def create_palette_assignment(used_chars):
         char_to_answers[char] = [ans]
         palette_list.append({'ans': ans, 'color': COLORS[char], 'char': char})
         
-        if random.random() > 0.6: 
+        if rng.random() > 0.6: 
             ans2 = pool[pool_idx]
             pool_idx += 1
             char_to_answers[char].append(ans2)
@@ -368,26 +376,20 @@ class Game:
         self.font_big = pygame.font.Font(None, 80)
         self.font_hs = pygame.font.Font(None, 28)
 
-        self.high_score = self.load_high_score()
+        self.store = ScoreStore("Pencil-Game", legacy_file=HIGH_SCORE_FILE)
+        self.high_score = self.store.high_score
+        self.score = 0
+        self.play_recorded = False
         self.start_new_game()
 
-    def load_high_score(self):
-        if os.path.exists(HIGH_SCORE_FILE):
-            try:
-                with open(HIGH_SCORE_FILE, "r") as f:
-                    return int(f.read())
-            except ValueError:
-                return 0
-        return 0
-
-    def save_high_score(self):
-        try:
-            with open(HIGH_SCORE_FILE, "w") as f:
-                f.write(str(self.high_score))
-        except IOError:
-            print("Warning: Could not save high score.")
+    def finish_play(self):
+        if self.score > 0 and not self.play_recorded:
+            self.store.record(self.score, self.recorder.encode())
+            self.play_recorded = True
 
     def start_new_game(self):
+        self.finish_play()
+        self.play_recorded = False
         self.score = 0
         self.game_over = False
         self.tiles = []
@@ -395,12 +397,14 @@ class Game:
         self.selected_idx = None
         self.message = "Select a number -> Click the math!"
         self.msg_color = BLACK
+        self.recorder = Recorder(PENCIL)
+        rng = self.recorder.rng
 
-        pattern_raw = random.choice(RAW_PATTERNS)
+        pattern_raw = RAW_PATTERNS[rng.below(len(RAW_PATTERNS))]
         self.current_pattern_name = pattern_raw["name"]
         
         grid_codes, used_chars = parse_grid_string(pattern_raw["data"])
-        palette_data, char_to_answers_map = create_palette_assignment(used_chars)
+        palette_data, char_to_answers_map = create_palette_assignment(rng, used_chars)
         
         col_w = 90
         row_h = 50
@@ -430,9 +434,9 @@ class Game:
                 char = grid_codes[r][c]
                 visual_color = COLORS[char]
                 valid_nums = char_to_answers_map[char]
-                chosen_ans = random.choice(valid_nums)
+                chosen_ans = valid_nums[rng.below(len(valid_nums))]
                 
-                eq = generate_math_problem(chosen_ans)
+                eq = generate_math_problem(rng, chosen_ans)
                 
                 tx = off_x + c * tile_size
                 ty = off_y + r * tile_size
@@ -457,17 +461,18 @@ class Game:
         if self.selected_idx is not None:
             sel_btn = self.palette_btns[self.selected_idx]
             
-            for t in self.tiles:
+            for i, t in enumerate(self.tiles):
                 if t.rect.collidepoint(pos) and not t.is_painted:
+                    self.recorder.record(0, i | sel_btn.answer << 8)
                     if t.answer_number == sel_btn.answer:
                         t.is_painted = True
                         self.score += 10
                         if self.score > self.high_score:
                             self.high_score = self.score
-                            self.save_high_score()
 
                         if all(tile.is_painted for tile in self.tiles):
                             self.game_over = True
+                            self.finish_play()
                             self.message = f"{self.current_pattern_name} Complete!"
                             self.msg_color = (0, 150, 0)
                         else:
@@ -544,6 +549,7 @@ class Game:
             self.draw()
             self.clock.tick(30)
         
+        self.finish_play()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,242 @@
+"""
+Many Snake boards stepped in lockstep with NumPy, by SnakeCore's rules: the
+same seed and the same turns reach the same score, food for food. Each
+board's state is a row of a few arrays, so one step() moves every board at
+the cost of a few dozen array operations, for bots and balance testing at
+millions of ticks per second. Needs NumPy, which the game itself does not.
+
+    python batch.py [--boards 4096] [--ticks 2000] [--level 1] [--check 64]
+
+runs greedy_turns on every board, restarting finished ones with new seeds,
+and first checks --check boards' scores against core.replay.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core import BODY, COLS, DIFFICULTIES, EMPTY, OBSTACLE, POINTS_PER_FOOD, RIGHT, ROWS, START, STEPS, replay
+
+CELLS = COLS * ROWS
+MASK = np.uint64(0xFFFFFFFF)
+DX = np.array([dx for dx, _ in STEPS])
+DY = np.array([dy for _, dy in STEPS])
+
+
+class BatchSnake:
+    """
+    len(seeds) games at one level. Snakes are ring buffers of cell indices
+    (row * COLS + column) in body, the head at head_ptr; each board keeps
+    its own FreeCells as rows of free_cells, free_slots and free_count.
+    The per-cell arrays are indexed through flat views, at board * CELLS +
+    cell, which NumPy gathers faster than pairs of index arrays.
+    """
+
+    def __init__(self, seeds, level=1):
+        count = len(seeds)
+        self.obstacles = list(DIFFICULTIES.values())[level]["obstacles"]
+        self.rng = np.zeros(count, np.uint64)
+        self.grid = np.zeros((count, CELLS), np.uint8)
+        self.free_cells = np.zeros((count, CELLS), np.int32)
+        self.free_slots = np.zeros((count, CELLS), np.int32)
+        self.free_count = np.zeros(count, np.int32)
+        self.body = np.zeros((count, CELLS), np.int32)
+        self.head_ptr = np.zeros(count, np.int32)
+        self.length = np.zeros(count, np.int32)
+        self.direction = np.zeros(count, np.int8)
+        self.food = np.zeros(count, np.int32)
+        self.score = np.zeros(count, np.int32)
+        self.tick = np.zeros(count, np.int32)
+        self.alive = np.zeros(count, bool)
+        self._grid, self._body = self.grid.reshape(-1), self.body.reshape(-1)
+        self._cells, self._slots = self.free_cells.reshape(-1), self.free_slots.reshape(-1)
+        self.restart(np.arange(count), seeds)
+
+    def restart(self, boards, seeds):
+        """Starts new games on the given boards, as SnakeCore(Random(seed), level) would."""
+        boards = np.asarray(boards)
+        self.rng[boards] = np.asarray(seeds, np.uint64) & MASK
+        self.grid[boards] = EMPTY
+        self.free_cells[boards] = np.arange(CELLS)
+        self.free_slots[boards] = np.arange(CELLS)
+        self.free_count[boards] = CELLS
+        self.head_ptr[boards] = len(START) - 1
+        self.length[boards] = len(START)
+        base = boards * CELLS
+        for i, (col, row) in enumerate(START):
+            cell = row * COLS + col
+            self.body[boards, len(START) - 1 - i] = cell
+            self.grid[boards, cell] = BODY
+            self._remove(boards, base, cell)
+        for _ in range(self.obstacles):
+            cell = self._sample(boards, base)
+            self._remove(boards, base, cell)
+            self._grid[base + cell] = OBSTACLE
+        self.food[boards] = self._sample(boards, base)
+        self.direction[boards] = RIGHT
+        self.score[boards] = 0
+        self.tick[boards] = 0
+        self.alive[boards] = True
+
+    def _below(self, boards, n):
+        """Random.below(n) for each board: one mulberry32 draw from its own state."""
+        state = (self.rng[boards] + np.uint64(0x6D2B79F5)) & MASK
+        self.rng[boards] = state
+        t = ((state ^ (state >> np.uint64(15))) * (state | np.uint64(1))) & MASK
+        t ^= (t + ((t ^ (t >> np.uint64(7))) * (t | np.uint64(61)))) & MASK
+        t ^= t >> np.uint64(14)
+        return (t / 4294967296 * n).astype(np.int32)
+
+    # base is boards * CELLS, the boards' offsets into the flat views.
+
+    def _sample(self, boards, base):
+        """A free cell per board, or -1 where none is left (without drawing)."""
+        cell = np.full(len(boards), -1, np.int32)
+        has = self.free_count[boards] > 0
+        if has.any():
+            some = boards[has]
+            cell[has] = self._cells[base[has] + self._below(some, self.free_count[some])]
+        return cell
+
+    def _remove(self, boards, base, cell):
+        slot = self._slots[base + cell]
+        count = self.free_count[boards] - 1
+        self.free_count[boards] = count
+        last = self._cells[base + count]
+        self._cells[base + slot] = last
+        self._slots[base + last] = slot
+
+    def _add(self, boards, base, cell):
+        count = self.free_count[boards]
+        self._slots[base + cell] = count
+        self._cells[base + count] = cell
+        self.free_count[boards] = count + 1
+
+    def heads(self):
+        return self._body[np.arange(len(self.alive)) * CELLS + self.head_ptr]
+
+    def step(self, turns=None):
+        """
+        Moves every live snake one cell, after turning it to turns[board]
+        where that is 0-3 and not straight back (-1 keeps going). Returns the
+        boards whose game ended on this step.
+        """
+        boards = np.flatnonzero(self.alive)
+        direction = self.direction[boards]
+        if turns is not None:
+            turn = turns[boards]
+            ok = (turn >= 0) & ((turn ^ 1) != direction)
+            direction[ok] = turn[ok]
+            self.direction[boards] = direction
+
+        base = boards * CELLS
+        head_ptr = self.head_ptr[boards]
+        head = self._body[base + head_ptr]
+        col = head % COLS + DX[direction]
+        row = head // COLS + DY[direction]
+        inside = (col >= 0) & (col < COLS) & (row >= 0) & (row < ROWS)
+        cell = np.where(inside, row * COLS + col, 0)
+        crashed = ~inside | (self._grid[base + cell] != EMPTY)
+        ended = [boards[crashed]]
+        self.alive[boards[crashed]] = False
+        moved = ~crashed
+        boards, base, cell, head_ptr = boards[moved], base[moved], cell[moved], head_ptr[moved]
+
+        head_ptr = (head_ptr + 1) % CELLS
+        self.head_ptr[boards] = head_ptr
+        self._body[base + head_ptr] = cell
+        self._grid[base + cell] = BODY
+        self._remove(boards, base, cell)
+        self.tick[boards] += 1
+
+        ate = cell == self.food[boards]
+        eaters = boards[ate]
+        self.score[eaters] += POINTS_PER_FOOD
+        self.length[eaters] += 1
+        self.food[eaters] = self._sample(eaters, base[ate])
+        # The snake filled the board.
+        full = eaters[self.food[eaters] < 0]
+        ended.append(full)
+        self.alive[full] = False
+
+        kept = ~ate
+        movers, base = boards[kept], base[kept]
+        tail = self._body[base + (head_ptr[kept] - self.length[movers]) % CELLS]
+        self._grid[base + tail] = EMPTY
+        self._add(movers, base, tail)
+        return np.concatenate(ended)
+
+
+def greedy_turns(batch):
+    """Per board, the unblocked direction closest to the food, never straight back."""
+    heads = batch.heads()
+    col = heads[:, None] % COLS + DX
+    row = heads[:, None] // COLS + DY
+    inside = (col >= 0) & (col < COLS) & (row >= 0) & (row < ROWS)
+    cell = np.where(inside, row * COLS + col, 0)
+    blocked = ~inside | (batch._grid[(np.arange(len(heads)) * CELLS)[:, None] + cell] != EMPTY)
+    distance = np.abs(col - (batch.food % COLS)[:, None]) + np.abs(row - (batch.food // COLS)[:, None])
+    cost = distance + blocked * 1000
+    cost[np.arange(len(heads)), batch.direction ^ 1] = 1 << 20
+    return cost.argmin(axis=1).astype(np.int8)
+
+
+def check(count, level, steps=2000):
+    """
+    Plays count boards to the end, then replays each one's turns on SnakeCore.
+    Greedy snakes can circle forever, so after steps they go straight.
+    """
+    batch = BatchSnake(range(1, count + 1), level)
+    events = [[] for _ in range(count)]
+    for _ in range(steps):
+        turns = greedy_turns(batch)
+        for board in np.flatnonzero(batch.alive & (turns != batch.direction)):
+            events[board].append((int(batch.tick[board]), int(turns[board])))
+        batch.step(turns)
+    while batch.alive.any():
+        batch.step()
+    start = time.perf_counter()
+    expected = [replay(seed, level, board_events) for seed, board_events in zip(range(1, count + 1), events)]
+    elapsed = time.perf_counter() - start
+    mismatches = sum(int(a != b) for a, b in zip(batch.score, expected))
+    return mismatches, int(batch.tick.sum()) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--boards", type=int, default=4096)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--level", type=int, default=1, choices=range(len(DIFFICULTIES)))
+    parser.add_argument("--check", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.check:
+        mismatches, core_rate = check(args.check, args.level)
+        print(f"check: {args.check - mismatches}/{args.check} scores match SnakeCore, "
+              f"which replays {core_rate:,.0f} ticks/s")
+        if mismatches:
+            raise SystemExit(1)
+
+    batch = BatchSnake(range(1, args.boards + 1), args.level)
+    next_seed = args.boards + 1
+    games = moves = 0
+    policy = stepping = 0.0
+    for _ in range(args.ticks):
+        moves += int(batch.alive.sum())
+        start = time.perf_counter()
+        turns = greedy_turns(batch)
+        middle = time.perf_counter()
+        ended = batch.step(turns)
+        if len(ended):
+            games += len(ended)
+            batch.restart(ended, range(next_seed, next_seed + len(ended)))
+            next_seed += len(ended)
+        policy += middle - start
+        stepping += time.perf_counter() - middle
+    print(f"{args.boards} boards x {args.ticks} steps, {games} games finished: "
+          f"{moves / stepping:,.0f} ticks/s stepping, {moves / (policy + stepping):,.0f} with the policy")
+
+
+if __name__ == "__main__":
+    main()
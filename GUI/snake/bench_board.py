@@ -0,0 +1,98 @@
+"""
+Per-tick cost of big boards: SnakeCore's move plus Viewport scrolling and
+SnakeRenderer drawing, by board size. The snake wanders at random, turning
+away from walls and obstacles. Obstacles scale with the board, but the
+canvas only ever holds the visible chunks' share of them, which is what
+keeps a tick flat.
+
+Runs on a hidden Tk canvas when a display is available, otherwise on
+bench_render.CountingCanvas.
+
+    python bench_board.py [--sizes 30 100 200 500] [--ticks 2000] [--level 2]
+"""
+
+import argparse
+import random
+import time
+import tkinter as tk
+
+from bench_render import CountingCanvas
+from common.replay import Random
+from core import DIFFICULTIES, DIRECTIONS, EMPTY, STEPS, SnakeCore
+from snake import HEIGHT, WIDTH, SnakeRenderer, Viewport
+
+
+def wander(core, rng):
+    """A direction that does not crash this tick, mostly straight on."""
+    options = []
+    col, row = core.snake[0]
+    for direction, (dx, dy) in enumerate(STEPS):
+        x, y = col + dx, row + dy
+        if (direction ^ 1 != core.direction and 0 <= x < core.cols and 0 <= y < core.rows
+                and core.grid[y * core.cols + x] == EMPTY):
+            options.append(direction)
+    if core.direction in options and rng.random() > 0.1:
+        return core.direction
+    return rng.choice(options) if options else core.direction
+
+
+def item_count(canvas):
+    return len(canvas.items) if isinstance(canvas, CountingCanvas) else len(canvas.find_all())
+
+
+def bench(canvas, size, ticks, level, flush):
+    renderer, viewport = SnakeRenderer(canvas, "lime green"), Viewport(canvas)
+    rng = random.Random(size)
+    elapsed = calls = most_items = 0
+    seed = done = 0
+    while done < ticks:
+        seed += 1
+        core = SnakeCore(Random(seed), level, size, size)
+        canvas.delete("all")
+        viewport.reset(core, core.snake[0])
+        renderer.reset(core.snake, DIRECTIONS[core.direction])
+        flush()
+        while core.alive and done < ticks:
+            core.turn(wander(core, rng))
+            before = getattr(canvas, "calls", 0)
+            start = time.perf_counter()
+            move = core.step()
+            if move is None:
+                break
+            viewport.follow(move.new_head)
+            renderer.advance(move.old_head, move.new_head, DIRECTIONS[core.direction], move.ate)
+            flush()
+            elapsed += time.perf_counter() - start
+            calls += getattr(canvas, "calls", 0) - before
+            done += 1
+        most_items = max(most_items, item_count(canvas))
+    return len(core.obstacles), most_items, elapsed / ticks * 1000, calls / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 100, 200, 500])
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--level", type=int, default=2, choices=range(len(DIFFICULTIES)))
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT, highlightthickness=0)
+        canvas.pack()
+        flush = root.update_idletasks
+        backend = "Tk canvas"
+    except tk.TclError:
+        canvas, flush, backend = CountingCanvas(), lambda: None, "CountingCanvas (no display)"
+
+    print(f"{backend}, {args.ticks} ticks per board, {WIDTH}x{HEIGHT} px view")
+    print(f"{'board':>9} {'obstacles':>10} {'max items':>10} {'ms/tick':>8} {'calls/tick':>11}")
+    for size in args.sizes:
+        obstacles, items, ms, calls = bench(canvas, size, args.ticks, args.level, flush)
+        calls = f"{calls:.1f}" if backend.startswith("Counting") else "-"
+        print(f"{f'{size}x{size}':>9} {obstacles:>10} {items:>10} {ms:>8.3f} {calls:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Tick intervals of the game loop while each tick's work grows, as it does
+when drawing gets slower: rescheduling after(period) once the work is done
+against Ticker. Runs a Tk event loop when a display is available, otherwise
+sleeps between ticks the way after() would; either way nothing is drawn.
+
+    python bench_loop.py [--period 60] [--ticks 100] [--work 2 30]
+"""
+
+import argparse
+import time
+import tkinter as tk
+
+from ticker import IntervalStats, Ticker
+
+
+class SleepRoot:
+    """root.after and mainloop without a display: callbacks run in due order."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, callback):
+        self.jobs.append((time.monotonic() + ms / 1000, callback))
+
+    def mainloop(self):
+        while self.jobs:
+            self.jobs.sort(key=lambda job: job[0])
+            due, callback = self.jobs.pop(0)
+            time.sleep(max(0.0, due - time.monotonic()))
+            callback()
+
+    def quit(self):
+        self.jobs.clear()
+
+
+def run(root, period, ticks, work, fixed):
+    """Runs ticks ticks whose work ramps from work[0] to work[1] ms; returns their IntervalStats."""
+    ticker = Ticker(period / 1000)
+    stats = IntervalStats(recent=ticks)
+    state = {"done": 0, "last": None}
+
+    def play():
+        now = time.monotonic()
+        if state["last"] is not None:
+            stats.add(now - state["last"])
+        state["last"] = now
+        if fixed:
+            ticker.tick()
+        done = state["done"]
+        time.sleep((work[0] + (work[1] - work[0]) * done / max(ticks - 1, 1)) / 1000)
+        state["done"] = done + 1
+        if state["done"] == ticks:
+            root.quit()
+            return
+        root.after(ticker.delay_ms() if fixed else period, play)
+
+    ticker.start()
+    root.after(0, play)
+    root.mainloop()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--period", type=int, default=60, help="target ms per tick (Hard is 60)")
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--work", type=float, nargs=2, default=[2, 30], help="work ms at the first and last tick")
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        backend = "Tk event loop"
+    except tk.TclError:
+        root, backend = SleepRoot(), "sleep loop (no display)"
+
+    print(f"{backend}: {args.ticks} ticks, target {args.period} ms, work {args.work[0]:g} -> {args.work[1]:g} ms")
+    print(f"{'loop':>14} {'mean ms':>8} {'worst ms':>9} {'behind s':>9}")
+    for label, fixed in (("after(period)", False), ("Ticker", True)):
+        stats = run(root, args.period, args.ticks, args.work, fixed)
+        # How much later the last tick started than a steady clock would have.
+        behind = stats.total - stats.count * args.period / 1000
+        print(f"{label:>14} {stats.mean * 1000:>8.1f} {stats.worst * 1000:>9.1f} {behind:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
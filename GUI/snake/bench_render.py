@@ -0,0 +1,163 @@
+"""
+Per-tick drawing cost of the snake by length: the old redraw-everything
+approach against SnakeRenderer.
+
+Runs on a real Tk canvas when a display is available (the window stays
+hidden), otherwise on CountingCanvas, which counts canvas calls and, like
+Tk, scans every item to resolve a tag. Either way nothing is shown.
+
+    python bench_render.py [--lengths 10 100 300 600] [--ticks 300]
+"""
+
+import argparse
+import time
+import tkinter as tk
+
+from snake import SIZE, SnakeRenderer, head_color, tongue_coords
+
+GRID = 30
+
+
+class CountingCanvas:
+    """The slice of tk.Canvas the renderers and Viewport use, counting every call."""
+
+    def __init__(self):
+        self.items = {}
+        self.next_id = 1
+        self.calls = 0
+
+    def _create(self, coords, tag="", **options):
+        self.calls += 1
+        item = self.next_id
+        self.next_id += 1
+        tags = (tag,) if isinstance(tag, str) else tuple(tag)
+        self.items[item] = [list(coords), set(tags), options]
+        return item
+
+    create_rectangle = create_line = create_oval = lambda self, *coords, **options: self._create(coords, **options)
+
+    def _find(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        if tag_or_id == "all":
+            return list(self.items)
+        return [item for item, (_, tags, _) in self.items.items() if tag_or_id in tags]
+
+    def delete(self, *tags_or_ids):
+        self.calls += 1
+        for tag_or_id in tags_or_ids:
+            for item in self._find(tag_or_id):
+                del self.items[item]
+
+    def config(self, **options):
+        self.calls += 1
+
+    def xview_moveto(self, fraction):
+        self.calls += 1
+
+    yview_moveto = xview_moveto
+
+    def coords(self, item, *coords):
+        self.calls += 1
+        self.items[item][0] = list(coords)
+
+    def move(self, tag_or_id, dx, dy):
+        self.calls += 1
+        for item in self._find(tag_or_id):
+            coords = self.items[item][0]
+            self.items[item][0] = [c + (dx if i % 2 == 0 else dy) for i, c in enumerate(coords)]
+
+    def itemconfigure(self, tag_or_id, **options):
+        self.calls += 1
+        for item in self._find(tag_or_id):
+            self.items[item][2].update(options)
+
+    def tag_raise(self, tag_or_id):
+        self.calls += 1
+        for item in self._find(tag_or_id):
+            self.items[item] = self.items.pop(item)
+
+
+def redraw(canvas, snake, direction, color="lime green"):
+    """What SnakeGame.draw_snake did every tick before SnakeRenderer."""
+    canvas.delete("snake")
+    for i, (col, row) in enumerate(snake):
+        x, y = col * SIZE, row * SIZE
+        if i == 0:
+            canvas.create_rectangle(x, y, x + SIZE, y + SIZE, fill=head_color(color), outline="black",
+                                    width=2, tag="snake")
+            for line in tongue_coords(x, y, direction):
+                canvas.create_line(*line, fill="red", width=2, tag="snake")
+            canvas.create_oval(x + 4, y + 4, x + 8, y + 8, fill="black", tag="snake")
+            canvas.create_oval(x + SIZE - 8, y + 4, x + SIZE - 4, y + 8, fill="black", tag="snake")
+        else:
+            canvas.create_rectangle(x, y, x + SIZE, y + SIZE, fill=color, outline="black", tag="snake")
+
+
+def serpentine():
+    """Cells along a path covering the board row by row, as (position, direction)."""
+    path = []
+    for row in range(GRID):
+        columns = range(GRID) if row % 2 == 0 else range(GRID - 1, -1, -1)
+        for i, column in enumerate(columns):
+            if i == GRID - 1:
+                direction = "Down"
+            else:
+                direction = "Right" if row % 2 == 0 else "Left"
+            path.append(((column, row), direction))
+    return path
+
+
+def bench(canvas, length, ticks, retained, flush):
+    path = serpentine()
+    if length + ticks > len(path):
+        raise SystemExit(f"length + ticks must be at most {len(path)} on a {GRID}x{GRID} board")
+    canvas.delete("all")
+    snake = [path[i][0] for i in range(length - 1, -1, -1)]
+    renderer = SnakeRenderer(canvas, "lime green")
+    renderer.reset(snake, path[length - 1][1])
+    flush()
+
+    calls = getattr(canvas, "calls", 0)
+    start = time.perf_counter()
+    for t in range(length, length + ticks):
+        head, direction = path[t]
+        if retained:
+            renderer.advance(snake[0], head, direction, grew=False)
+        snake.insert(0, head)
+        snake.pop()
+        if not retained:
+            redraw(canvas, snake, direction)
+        flush()
+    elapsed = time.perf_counter() - start
+    return elapsed / ticks * 1000, (getattr(canvas, "calls", 0) - calls) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 300, 600])
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        canvas = tk.Canvas(root, width=GRID * SIZE, height=GRID * SIZE)
+        canvas.pack()
+        # Runs the idle work Tk queues after each tick, as the game loop does.
+        flush = root.update_idletasks
+        backend = "Tk canvas"
+    except tk.TclError:
+        canvas, flush, backend = CountingCanvas(), lambda: None, "CountingCanvas (no display)"
+
+    print(f"{backend}, {args.ticks} ticks per run")
+    print(f"{'length':>7} {'redraw ms/tick':>15} {'retained ms/tick':>17} {'calls/tick':>16}")
+    for length in args.lengths:
+        old_ms, old_calls = bench(canvas, length, args.ticks, retained=False, flush=flush)
+        new_ms, new_calls = bench(canvas, length, args.ticks, retained=True, flush=flush)
+        calls = f"{old_calls:.0f} -> {new_calls:.0f}" if backend.startswith("Counting") else "-"
+        print(f"{length:>7} {old_ms:>15.3f} {new_ms:>17.3f} {calls:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Snake's rules without a window: the board, the snake's moves, growth,
+obstacles and food, seeded so a game plays out the same every time. The
+Tk game (snake.py) draws what SnakeCore does, batch.py runs the same rules
+on many boards at once, and the server replays GUI_FREE_CELLS logs by them
+(backend/base/replays/snake.py).
+
+    core = SnakeCore(Random(seed), level)      # or cols=200, rows=200
+    core.turn(UP)
+    move = core.step()      # None once the snake has crashed
+"""
+
+import os
+import sys
+from collections import deque, namedtuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.replay import Random
+
+# The standard board, the only one the server replays.
+COLS, ROWS = 30, 30
+POINTS_PER_FOOD = 10
+# Side of the squares Chunks groups cells by.
+CHUNK = 16
+
+# Numbered as the server's replay of the game numbers them.
+UP, DOWN, LEFT, RIGHT = range(4)
+DIRECTIONS = ("Up", "Down", "Left", "Right")
+STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Tick length in ms and obstacle count on the standard board (other boards
+# get as many per cell); the level is the index in this order.
+DIFFICULTIES = {
+    "Easy": {"speed": 150, "obstacles": 0},
+    "Medium": {"speed": 100, "obstacles": 8},
+    "Hard": {"speed": 60, "obstacles": 15},
+}
+
+# What covers a cell of SnakeCore.grid.
+EMPTY, BODY, OBSTACLE = 0, 1, 2
+
+# old_head and new_head are (column, row) cells; ate means the snake kept its tail.
+Move = namedtuple("Move", "old_head new_head ate")
+
+
+def start_cells(cols, rows):
+    """The snake at the start, head first, facing right from the middle of the board."""
+    col, row = cols // 2, rows // 2
+    return ((col, row), (col - 1, row), (col - 2, row))
+
+
+START = start_cells(COLS, ROWS)
+
+
+class FreeCells:
+    """
+    Indices (row * columns + column) of the cells nothing covers, and each one's
+    slot in that list. Removing a cell moves the last one into its slot, so
+    removing, adding and drawing a cell are O(1), with no retries however full
+    the board is. A draw depends on the order of every earlier add and remove,
+    which the server's replay of GUI_FREE_CELLS logs repeats.
+    """
+
+    def __init__(self, count):
+        self.cells = list(range(count))
+        self.slots = list(range(count))
+
+    def remove(self, cell):
+        slot = self.slots[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[slot] = last
+            self.slots[last] = slot
+
+    def add(self, cell):
+        self.slots[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def sample(self, rng):
+        return self.cells[rng.below(len(self.cells))] if self.cells else None
+
+
+class Chunks:
+    """
+    Cells grouped by the CHUNK x CHUNK square they fall in. Only squares
+    holding a cell take memory, and finding the cells in view reads the few
+    squares it overlaps, however big the board.
+    """
+
+    def __init__(self):
+        self.chunks = {}
+        self.count = 0
+
+    def add(self, cell):
+        self.chunks.setdefault((cell[0] // CHUNK, cell[1] // CHUNK), []).append(cell)
+        self.count += 1
+
+    def in_chunk(self, key):
+        return self.chunks.get(key, ())
+
+    def __iter__(self):
+        for cells in self.chunks.values():
+            yield from cells
+
+    def __len__(self):
+        return self.count
+
+
+class SnakeCore:
+    """
+    One game. Cells are (column, row); the grid says what covers each cell,
+    so a collision check is one lookup however long the snake is. Every
+    gameplay draw comes from rng, so pass the recorder's Random to have the
+    server reach the same score. Other board sizes play by the same rules,
+    but the server only replays COLS x ROWS games.
+    """
+
+    def __init__(self, rng, level=1, cols=COLS, rows=ROWS):
+        self.rng = rng
+        self.level = level
+        self.cols, self.rows = cols, rows
+        self.snake = deque(start_cells(cols, rows))
+        self.grid = bytearray(cols * rows)
+        self.free = FreeCells(cols * rows)
+        for col, row in self.snake:
+            self.grid[row * cols + col] = BODY
+            self.free.remove(row * cols + col)
+        self.direction = self.next_direction = RIGHT
+        self.score = 0
+        self.tick = 0
+        self.alive = True
+
+        self.obstacles = Chunks()
+        for _ in range(list(DIFFICULTIES.values())[level]["obstacles"] * cols * rows // (COLS * ROWS)):
+            cell = self.free.sample(rng)
+            self.free.remove(cell)
+            self.grid[cell] = OBSTACLE
+            self.obstacles.add(divmod(cell, cols)[::-1])
+        self.food = None
+        self.place_food()
+
+    def place_food(self):
+        cell = self.free.sample(self.rng)
+        # None: the snake covers every free cell.
+        self.food = None if cell is None else divmod(cell, self.cols)[::-1]
+
+    def turn(self, direction):
+        """Turns the snake on its next move; returns False if that would reverse it."""
+        if direction ^ 1 == self.direction:
+            return False
+        self.next_direction = direction
+        return True
+
+    def step(self):
+        """Moves the snake one cell. Returns the Move, or None if it crashed."""
+        if not self.alive:
+            return None
+        self.direction = self.next_direction
+        dx, dy = STEPS[self.direction]
+        old_head = self.snake[0]
+        col, row = old_head[0] + dx, old_head[1] + dy
+        cols = self.cols
+        if not (0 <= col < cols and 0 <= row < self.rows) or self.grid[row * cols + col] != EMPTY:
+            self.alive = False
+            return None
+
+        new_head = (col, row)
+        self.snake.appendleft(new_head)
+        self.grid[row * cols + col] = BODY
+        self.free.remove(row * cols + col)
+
+        ate = new_head == self.food
+        if ate:
+            self.score += POINTS_PER_FOOD
+            self.place_food()
+            if self.food is None:
+                self.alive = False
+        else:
+            col, row = self.snake.pop()
+            self.grid[row * cols + col] = EMPTY
+            self.free.add(row * cols + col)
+        self.tick += 1
+        return Move(old_head, new_head, ate)
+
+
+def replay(seed, level, events):
+    """
+    The score a game reaches from its seed and (tick, direction) key presses,
+    as the server scores a GUI_FREE_CELLS log. Once the presses run out, the
+    snake goes straight until it crashes.
+    """
+    core = SnakeCore(Random(seed), level)
+    events = iter(events)
+    event = next(events, None)
+    while core.alive:
+        while event is not None and event[0] <= core.tick:
+            core.turn(event[1])
+            event = next(events, None)
+        core.step()
+    return core.score
@@ -1,16 +1,28 @@
 import tkinter as tk
-import random
 import threading
+from collections import deque
 import platform
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.replay import GUI_FREE_CELLS, SNAKE, Recorder
+from common.scorestore import ScoreStore
+from core import CHUNK, COLS, DIFFICULTIES, DIRECTIONS, ROWS, SnakeCore
+from ticker import Ticker
 
 system_platform = platform.system()
 if system_platform == "Windows":
     import winsound
 
-WIDTH, HEIGHT = 600, 600 
 SIZE = 20
+# The canvas shows this much of the board, all of the standard one.
+WIDTH, HEIGHT = COLS * SIZE, ROWS * SIZE
 HIGHSCORE_FILE = "snake_highscore.txt"
+# Turns pressed faster than the snake moves wait for their tick, up to this many.
+MAX_QUEUED_TURNS = 3
+# Ticks between refreshes of the tick timing line.
+TIMING_REFRESH = 20
 
 SNAKE_COLORS = [
     "green", "lime green", "cyan", "magenta", "gold", "orange red", "hot pink", 
@@ -29,60 +41,195 @@ FRUIT_SHAPES = [
     "Circle", "Square", "Triangle", "Diamond"
 ]
 
+# Columns and rows. Bigger boards scroll and are practice only: the server
+# replays standard games alone.
+BOARD_SIZES = {"30x30": (COLS, ROWS), "100x100": (100, 100), "200x200": (200, 200)}
+
+def head_color(body_color):
+    return "white" if body_color != "white" else "yellow"
+
+
+def tongue_coords(x, y, direction):
+    """The tongue's stem and two forks, sticking out of the head at (x, y)."""
+    if direction == "Up":
+        tip = (x + SIZE / 2, y - 8)
+        return ((x + SIZE / 2, y) + tip, tip + (tip[0] - 3, tip[1] - 3), tip + (tip[0] + 3, tip[1] - 3))
+    if direction == "Down":
+        tip = (x + SIZE / 2, y + SIZE + 8)
+        return ((x + SIZE / 2, y + SIZE) + tip, tip + (tip[0] - 3, tip[1] + 3), tip + (tip[0] + 3, tip[1] + 3))
+    if direction == "Left":
+        tip = (x - 8, y + SIZE / 2)
+        return ((x, y + SIZE / 2) + tip, tip + (tip[0] - 3, tip[1] - 3), tip + (tip[0] - 3, tip[1] + 3))
+    tip = (x + SIZE + 8, y + SIZE / 2)
+    return ((x + SIZE, y + SIZE / 2) + tip, tip + (tip[0] + 3, tip[1] - 3), tip + (tip[0] + 3, tip[1] + 3))
+
+
+class SnakeRenderer:
+    """
+    Keeps one canvas rectangle per segment between ticks instead of redrawing
+    the snake. A move turns the tail's rectangle into the new head and the old
+    head into body; growing adds a rectangle. The tongue and eyes follow the
+    head. Items are addressed by id, never by tag, since Tk finds tagged items
+    by scanning the whole canvas: a tick costs the same few canvas calls
+    however long the snake is.
+    """
+
+    def __init__(self, canvas, color):
+        self.canvas = canvas
+        self.color = color
+        self.segments = deque()
+        self.tongue = []
+        self.eyes = []
+
+    def reset(self, snake, direction):
+        """Draws a snake given as (column, row) cells, head first."""
+        self.canvas.delete("snake")
+        self.segments.clear()
+        for col, row in snake:
+            x, y = col * SIZE, row * SIZE
+            self.segments.append(self.canvas.create_rectangle(
+                x, y, x + SIZE, y + SIZE, fill=self.color, outline="black", tag=("snake", "snake_body")
+            ))
+        self.canvas.itemconfigure(self.segments[0], fill=head_color(self.color), width=2)
+        x, y = snake[0][0] * SIZE, snake[0][1] * SIZE
+        self.tongue = [
+            self.canvas.create_line(*line, fill="red", width=2, tag="snake")
+            for line in tongue_coords(x, y, direction)
+        ]
+        eye_size = 4
+        self.eyes = [
+            self.canvas.create_oval(x + 4, y + 4, x + 4 + eye_size, y + 4 + eye_size, fill="black", tag="snake"),
+            self.canvas.create_oval(x + SIZE - 8, y + 4, x + SIZE - 8 + eye_size, y + 4 + eye_size,
+                                    fill="black", tag="snake"),
+        ]
+
+    def advance(self, old_head, new_head, direction, grew):
+        """The snake moved one cell; grew means it ate and kept its tail."""
+        x, y = new_head[0] * SIZE, new_head[1] * SIZE
+        self.canvas.itemconfigure(self.segments[0], fill=self.color, width=1)
+        if grew:
+            head = self.canvas.create_rectangle(
+                x, y, x + SIZE, y + SIZE, fill=head_color(self.color), outline="black", width=2,
+                tag=("snake", "snake_body"),
+            )
+        else:
+            head = self.segments.pop()
+            self.canvas.coords(head, x, y, x + SIZE, y + SIZE)
+            self.canvas.itemconfigure(head, fill=head_color(self.color), width=2)
+        self.segments.appendleft(head)
+
+        for item, line in zip(self.tongue, tongue_coords(x, y, direction)):
+            self.canvas.coords(item, *line)
+        for item in self.eyes:
+            self.canvas.move(item, (new_head[0] - old_head[0]) * SIZE, (new_head[1] - old_head[1]) * SIZE)
+        # The head's rectangle may be older or newer than its neighbours, and
+        # the tongue overhangs them.
+        for item in self.tongue + self.eyes:
+            self.canvas.tag_raise(item)
+
+    def recolor(self, color):
+        self.color = color
+        self.canvas.itemconfigure("snake_body", fill=color)
+        if self.segments:
+            self.canvas.itemconfigure(self.segments[0], fill=head_color(color))
+
+
+class Viewport:
+    """
+    Scrolls the canvas over the board to keep the snake's head in the middle
+    of the WIDTH x HEIGHT view. Obstacles are drawn a chunk at a time as
+    their chunk comes into view and deleted when it leaves, so the canvas
+    holds a view's worth of them and a tick costs the same on any board.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.view_cols, self.view_rows = WIDTH // SIZE, HEIGHT // SIZE
+        self.core = None
+        self.origin = None
+        self.drawn = {}
+
+    def reset(self, core, head):
+        """Shows a new game; the canvas must have been cleared."""
+        self.core = core
+        self.origin = None
+        self.drawn = {}
+        width, height = core.cols * SIZE, core.rows * SIZE
+        self.canvas.config(scrollregion=(0, 0, width, height))
+        if core.cols > self.view_cols or core.rows > self.view_rows:
+            # The view's edge is not always a wall.
+            self.canvas.create_rectangle(1, 1, width - 1, height - 1, outline="gray50", width=2)
+        self.follow(head)
+
+    def follow(self, head):
+        col = min(max(head[0] - self.view_cols // 2, 0), max(self.core.cols - self.view_cols, 0))
+        row = min(max(head[1] - self.view_rows // 2, 0), max(self.core.rows - self.view_rows, 0))
+        if (col, row) == self.origin:
+            return
+        self.origin = (col, row)
+        self.canvas.xview_moveto(col / self.core.cols)
+        self.canvas.yview_moveto(row / self.core.rows)
+
+        visible = {
+            (x, y)
+            for x in range(col // CHUNK, (col + self.view_cols - 1) // CHUNK + 1)
+            for y in range(row // CHUNK, (row + self.view_rows - 1) // CHUNK + 1)
+        }
+        for key in self.drawn.keys() - visible:
+            items = self.drawn.pop(key)
+            if items:
+                self.canvas.delete(*items)
+        for key in visible - self.drawn.keys():
+            self.drawn[key] = [
+                self.canvas.create_rectangle(x * SIZE, y * SIZE, (x + 1) * SIZE, (y + 1) * SIZE,
+                                             fill="gray40", outline="gray20", tag="obstacle")
+                for x, y in self.core.obstacles.in_chunk(key)
+            ]
+
+    def center(self):
+        """Canvas coordinates of the middle of the view."""
+        return self.canvas.canvasx(WIDTH / 2), self.canvas.canvasy(HEIGHT / 2)
+
+
 class SnakeGame:
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, root):
+        self.root = root
         self.root.title("Snaky-Snake")
-        self.root.geometry(f"{WIDTH}x{HEIGHT + 150}")
+        self.root.geometry(f"{WIDTH}x{HEIGHT + 200}")
         self.root.resizable(False, False)
         
-        self.snake = [(300, 300), (280, 300), (260, 300)]
-        self.direction = "Right"
-        self.next_direction = "Right"
+        self.core = None
+        self.turns = deque()
+        self.ticker = None
+        self.tick_job = None
+        self.ranked = True
         self.running = False
         self.is_paused = False  
-        self.food = None
-        self.obstacles = [] 
         self.score = 0
-        self.high_score = self.load_high_score()
+        self.recorder = None
+        self.store = ScoreStore("Snaky-Snake", legacy_file=HIGHSCORE_FILE)
+        self.high_score = self.store.high_score
         
 
         self.snake_color = tk.StringVar(value="lime green")
         self.bg_color = tk.StringVar(value="black")
         self.food_shape = tk.StringVar(value="Circle")
         self.difficulty = tk.StringVar(value="Medium")
+        self.board_size = tk.StringVar(value="30x30")
         
-        self.difficulty_settings = {
-            "Easy": {"speed": 150, "obstacles": 0},
-            "Medium": {"speed": 100, "obstacles": 8},
-            "Hard": {"speed": 60, "obstacles": 15},
-        }
+        self.difficulty_settings = DIFFICULTIES
 
         self.setup_ui()
         
         self.root.bind("<KeyPress>", self.change_direction)
         self.root.bind("<space>", lambda e: self.toggle_pause())
-        self.root.mainloop()
-
-    def load_high_score(self):
-        if not os.path.exists(HIGHSCORE_FILE):
-            return 0
-        try:
-            with open(HIGHSCORE_FILE, "r") as f:
-                return int(f.read().strip())
-        except:
-            return 0
-
-    def save_high_score(self):
-        try:
-            with open(HIGHSCORE_FILE, "w") as f:
-                f.write(str(self.high_score))
-        except Exception as e:
-            print(f"Error saving high score: {e}")
 
     def setup_ui(self):
         self.canvas = tk.Canvas(self.root, width=WIDTH, height=HEIGHT, bg="black", highlightthickness=0)
         self.canvas.pack(pady=10)
+        self.renderer = SnakeRenderer(self.canvas, self.snake_color.get())
+        self.viewport = Viewport(self.canvas)
+        self.snake_color.trace_add("write", lambda *_: self.renderer.recolor(self.snake_color.get()))
 
         self.top_frame = tk.Frame(self.root)
         self.top_frame.pack(fill="x", pady=5)
@@ -112,92 +259,94 @@ class SnakeGame:
         tk.Label(self.bottom_frame, text="Difficulty:").grid(row=1, column=2, padx=5)
         tk.OptionMenu(self.bottom_frame, self.difficulty, *self.difficulty_settings.keys()).grid(row=1, column=3, padx=5)
 
+        tk.Label(self.bottom_frame, text="Board:").grid(row=2, column=0, padx=5)
+        tk.OptionMenu(self.bottom_frame, self.board_size, *BOARD_SIZES).grid(row=2, column=1, padx=5)
+
         self.score_label = tk.Label(self.root, font=("Arial", 12, "bold"))
         self.score_label.pack(pady=5)
+        self.timing_label = tk.Label(self.root, font=("Arial", 9), fg="gray40")
+        self.timing_label.pack()
         self.update_score_display()
 
     def play_sound(self, freq, duration):
         if system_platform == "Windows":
             threading.Thread(target=lambda: winsound.Beep(freq, duration), daemon=True).start()
 
-    def create_food(self):
+    def draw_food(self):
         self.canvas.delete("food")
-        while True:
-            x = random.randint(0, (WIDTH-SIZE)//SIZE) * SIZE
-            y = random.randint(0, (HEIGHT-SIZE)//SIZE) * SIZE
-            
-            if (x, y) not in self.snake and (x, y) not in self.obstacles:
-                break
-        
+        if self.core.food is None:
+            return
+        col, row = self.core.food
+        x, y = col * SIZE, row * SIZE
+
         shape = self.food_shape.get()
         if shape == "Circle":
-            self.food = self.canvas.create_oval(x, y, x+SIZE, y+SIZE, fill="red", outline="white", tag="food")
+            self.canvas.create_oval(x, y, x+SIZE, y+SIZE, fill="red", outline="white", tag="food")
         elif shape == "Square":
-            self.food = self.canvas.create_rectangle(x, y, x+SIZE, y+SIZE, fill="red", outline="white", tag="food")
+            self.canvas.create_rectangle(x, y, x+SIZE, y+SIZE, fill="red", outline="white", tag="food")
         elif shape == "Triangle":
-            self.food = self.canvas.create_polygon(x+SIZE/2, y, x, y+SIZE, x+SIZE, y+SIZE, fill="red", outline="white", tag="food")
+            self.canvas.create_polygon(x+SIZE/2, y, x, y+SIZE, x+SIZE, y+SIZE, fill="red", outline="white", tag="food")
         else:
-             self.food = self.canvas.create_polygon(x+SIZE/2, y, x+SIZE, y+SIZE/2, x+SIZE/2, y+SIZE, x, y+SIZE/2, fill="red", outline="white", tag="food")
-        
-        return (x, y)
+             self.canvas.create_polygon(x+SIZE/2, y, x+SIZE, y+SIZE/2, x+SIZE/2, y+SIZE, x, y+SIZE/2, fill="red", outline="white", tag="food")
 
     def play(self):
-        if not self.running:
-            return
-            
-        if self.is_paused:
-            self.root.after(100, self.play)
+        self.tick_job = None
+        if not self.running or self.is_paused:
             return
 
-        self.direction = self.next_direction
+        self.ticker.period = self.difficulty_settings[self.difficulty.get()]["speed"] / 1000
+        self.ticker.tick()
+        if self.turns:
+            # Recorded when it takes effect, so the replay turns at the same tick.
+            direction = self.turns.popleft()
+            if self.core.turn(direction):
+                self.recorder.record(self.core.tick, direction)
 
-        x, y = self.snake[0]
-        if self.direction == "Up": y -= SIZE
-        elif self.direction == "Down": y += SIZE
-        elif self.direction == "Left": x -= SIZE
-        elif self.direction == "Right": x += SIZE
-        
-        new_head = (x, y)
-
-        if (x < 0 or x >= WIDTH or y < 0 or y >= HEIGHT or 
-            new_head in self.snake or new_head in self.obstacles):
+        move = self.core.step()
+        if move is None:
             self.game_over()
             return
 
-        self.snake.insert(0, new_head)
-        
-        overlap = self.canvas.find_overlapping(x+1, y+1, x+SIZE-1, y+SIZE-1)
-        is_eating = False
-        for item in overlap:
-            if "food" in self.canvas.gettags(item):
-                is_eating = True
-                break
-
-        if is_eating:
-            self.score += 10
-            if self.score > self.high_score:
+        if move.ate:
+            self.score = self.core.score
+            if self.ranked and self.score > self.high_score:
                 self.high_score = self.score
             self.update_score_display()
-            self.create_food()
+            self.draw_food()
             self.play_sound(900, 50)
-        else:
-            self.snake.pop()
 
-        self.draw_snake()
-        
-        current_speed = self.difficulty_settings[self.difficulty.get()]["speed"]
-        self.root.after(current_speed, self.play)
+        self.viewport.follow(move.new_head)
+        self.renderer.advance(move.old_head, move.new_head, DIRECTIONS[self.core.direction], move.ate)
+        if not self.core.alive:
+            # The snake filled the board.
+            self.game_over()
+            return
+
+        if self.core.tick % TIMING_REFRESH == 0:
+            self.update_timing_display()
+        self.tick_job = self.root.after(self.ticker.delay_ms(), self.play)
+
+    def stop_ticking(self):
+        if self.tick_job is not None:
+            self.root.after_cancel(self.tick_job)
+            self.tick_job = None
 
     def start_game(self):
         if not self.running:
             self.canvas.delete("all")
             self.canvas.config(bg=self.bg_color.get())
             
-            self.snake = [(300, 300), (280, 300), (260, 300)]
-            self.direction = "Right"
-            self.next_direction = "Right"
             self.score = 0
             self.update_score_display()
+            level = list(self.difficulty_settings).index(self.difficulty.get())
+            self.recorder = Recorder(SNAKE, level, variant=GUI_FREE_CELLS)
+            cols, rows = BOARD_SIZES[self.board_size.get()]
+            self.ranked = (cols, rows) == (COLS, ROWS)
+            self.core = SnakeCore(self.recorder.rng, level, cols, rows)
+            self.turns.clear()
+            self.stop_ticking()
+            self.ticker = Ticker(self.difficulty_settings[self.difficulty.get()]["speed"] / 1000)
+            self.timing_label.config(text="")
             
             self.running = True
             self.is_paused = False
@@ -206,21 +355,27 @@ class SnakeGame:
             self.pause_btn.config(state="normal", text="Pause")
             self.restart_btn.config(state="normal")
             
-            self.create_obstacles()
-            self.create_food()
+            self.viewport.reset(self.core, self.core.snake[0])
+            self.draw_food()
+            self.renderer.reset(self.core.snake, DIRECTIONS[self.core.direction])
+            self.ticker.start()
             self.play()
 
     def game_over(self):
         self.running = False
         
-        if self.score > self.high_score:
-            self.high_score = self.score
-        
-        self.save_high_score()
+        if self.ranked:
+            if self.score > self.high_score:
+                self.high_score = self.score
+            self.store.record(self.score, self.recorder.encode())
         self.update_score_display()
+        self.update_timing_display()
         
-        self.canvas.create_text(WIDTH/2, HEIGHT/2, text="GAME OVER", fill="white", font=("Arial", 30, "bold"))
-        self.canvas.create_text(WIDTH/2, HEIGHT/2 + 40, text=f"Final Score: {self.score}", fill="white", font=("Arial", 15))
+        x, y = self.viewport.center()
+        self.canvas.create_text(x, y, text="GAME OVER", fill="white", font=("Arial", 30, "bold"))
+        self.canvas.create_text(x, y + 40, text=f"Final Score: {self.score}", fill="white", font=("Arial", 15))
+        if not self.ranked:
+            self.canvas.create_text(x, y + 70, text="Practice board: score not saved", fill="white", font=("Arial", 11))
         
         self.start_btn.config(state="normal")
         self.pause_btn.config(state="disabled")
@@ -229,45 +384,13 @@ class SnakeGame:
     def update_score_display(self):
         self.score_label.config(text=f"High Score: {self.high_score}  |  Current Score: {self.score}")
 
-    def draw_snake(self):
-        self.canvas.delete("snake")
-        
-        for i, seg in enumerate(self.snake):
-            if i == 0: 
-                head_color = "white" if self.snake_color.get() != "white" else "yellow"
-                self.canvas.create_rectangle(
-                    seg[0], seg[1], seg[0]+SIZE, seg[1]+SIZE, 
-                    fill=head_color, outline="black", width=2, tag="snake"
-                )
-                
-                t_color = "red"
-                x, y = seg[0], seg[1]
-                if self.direction == "Up":
-                    self.canvas.create_line(x+SIZE/2, y, x+SIZE/2, y-8, fill=t_color, width=2, tag="snake")
-                    self.canvas.create_line(x+SIZE/2, y-8, x+SIZE/2-3, y-11, fill=t_color, width=2, tag="snake") 
-                    self.canvas.create_line(x+SIZE/2, y-8, x+SIZE/2+3, y-11, fill=t_color, width=2, tag="snake") 
-                elif self.direction == "Down":
-                    self.canvas.create_line(x+SIZE/2, y+SIZE, x+SIZE/2, y+SIZE+8, fill=t_color, width=2, tag="snake")
-                    self.canvas.create_line(x+SIZE/2, y+SIZE+8, x+SIZE/2-3, y+SIZE+11, fill=t_color, width=2, tag="snake")
-                    self.canvas.create_line(x+SIZE/2, y+SIZE+8, x+SIZE/2+3, y+SIZE+11, fill=t_color, width=2, tag="snake")
-                elif self.direction == "Left":
-                    self.canvas.create_line(x, y+SIZE/2, x-8, y+SIZE/2, fill=t_color, width=2, tag="snake")
-                    self.canvas.create_line(x-8, y+SIZE/2, x-11, y+SIZE/2-3, fill=t_color, width=2, tag="snake")
-                    self.canvas.create_line(x-8, y+SIZE/2, x-11, y+SIZE/2+3, fill=t_color, width=2, tag="snake")
-                elif self.direction == "Right":
-                    self.canvas.create_line(x+SIZE, y+SIZE/2, x+SIZE+8, y+SIZE/2, fill=t_color, width=2, tag="snake")
-                    self.canvas.create_line(x+SIZE+8, y+SIZE/2, x+SIZE+11, y+SIZE/2-3, fill=t_color, width=2, tag="snake")
-                    self.canvas.create_line(x+SIZE+8, y+SIZE/2, x+SIZE+11, y+SIZE/2+3, fill=t_color, width=2, tag="snake")
-
-                eye_size = 4
-                self.canvas.create_oval(seg[0]+4, seg[1]+4, seg[0]+4+eye_size, seg[1]+4+eye_size, fill="black", tag="snake")
-                self.canvas.create_oval(seg[0]+SIZE-8, seg[1]+4, seg[0]+SIZE-8+eye_size, seg[1]+4+eye_size, fill="black", tag="snake")
-            
-            else: 
-                self.canvas.create_rectangle(
-                    seg[0], seg[1], seg[0]+SIZE, seg[1]+SIZE, 
-                    fill=self.snake_color.get(), outline="black", tag="snake"
-                )
+    def update_timing_display(self):
+        stats = self.ticker.stats
+        if stats.count:
+            self.timing_label.config(
+                text=f"Tick: target {self.ticker.period * 1000:.0f} ms, actual {stats.recent_mean * 1000:.1f} ms "
+                     f"(last {len(stats.recent)}), worst {stats.worst * 1000:.0f} ms"
+            )
 
     def toggle_pause(self):
         if not self.running: 
@@ -276,34 +399,27 @@ class SnakeGame:
         self.pause_btn.config(text="Resume" if self.is_paused else "Pause")
         
         if self.is_paused:
-            self.canvas.create_text(WIDTH/2, HEIGHT/2, text="PAUSED", fill="white", font=("Arial", 30), tag="paused_text")
+            self.stop_ticking()
+            x, y = self.viewport.center()
+            self.canvas.create_text(x, y, text="PAUSED", fill="white", font=("Arial", 30), tag="paused_text")
         else:
             self.canvas.delete("paused_text")
+            self.ticker.start()
+            self.play()
 
     def restart_game(self):
         self.running = False
         self.start_game()
 
-    def create_obstacles(self):
-        self.obstacles = []
-        count = self.difficulty_settings[self.difficulty.get()]["obstacles"]
-        for _ in range(count):
-            while True:
-                x = random.randint(0, (WIDTH-SIZE)//SIZE) * SIZE
-                y = random.randint(0, (HEIGHT-SIZE)//SIZE) * SIZE
-                if (x,y) not in self.snake and (x,y) not in self.obstacles:
-                    self.obstacles.append((x,y))
-                    self.canvas.create_rectangle(x, y, x+SIZE, y+SIZE, fill="gray40", outline="gray20", tag="obstacle")
-                    break
-
     def change_direction(self, event):
-        new_dir = event.keysym
-        all_dirs = {"Up", "Down", "Left", "Right"}
-        opposites = {"Up": "Down", "Down": "Up", "Left": "Right", "Right": "Left"}
-        
-        if new_dir in all_dirs:
-            if new_dir != opposites.get(self.direction):
-                self.next_direction = new_dir
+        if event.keysym in DIRECTIONS and self.running:
+            direction = DIRECTIONS.index(event.keysym)
+            # Each queued turn must make sense after the one before it.
+            last = self.turns[-1] if self.turns else self.core.direction
+            if direction != last and direction ^ 1 != last and len(self.turns) < MAX_QUEUED_TURNS:
+                self.turns.append(direction)
 
 if __name__ == "__main__":
-    SnakeGame()
\ No newline at end of file
+    root = tk.Tk()
+    SnakeGame(root)
+    root.mainloop()
@@ -0,0 +1,80 @@
+"""
+Fixed-timestep scheduling for the game loop, on the monotonic clock.
+
+Rescheduling with after(period) once a tick's work is done makes every tick
+last period + work, so the game slows down as drawing gets slower. Ticker
+instead keeps each tick due at a fixed period after the one before, and
+waits only for whatever part of the period the work left:
+
+    ticker.start()
+    def play():
+        ticker.tick()
+        ...                                   # the tick's work
+        root.after(ticker.delay_ms(), play)
+"""
+
+import time
+from collections import deque
+
+
+class IntervalStats:
+    """Actual intervals between ticks, against the target period."""
+
+    def __init__(self, recent=50):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def add(self, interval):
+        self.count += 1
+        self.total += interval
+        self.worst = max(self.worst, interval)
+        self.recent.append(interval)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def recent_mean(self):
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+
+class Ticker:
+    """
+    Ticks due every period seconds. A tick that starts late shortens the wait
+    for the next one, so late ticks do not add up. A tick more than a period
+    late (the window was dragged, the machine slept) resets the schedule from
+    then instead of running the missed ticks back to back, which would
+    make the snake dash several cells at once.
+    """
+
+    def __init__(self, period, clock=time.monotonic):
+        self.period = period
+        self.clock = clock
+        self.due = None
+        self.last = None
+        self.stats = IntervalStats()
+
+    def start(self):
+        """(Re)starts the schedule with a tick due now, e.g. after a pause."""
+        self.due = self.clock()
+        self.last = None
+
+    def tick(self):
+        """Call as a tick starts: measures the interval and sets when the next is due."""
+        now = self.clock()
+        if self.last is not None:
+            self.stats.add(now - self.last)
+        self.last = now
+        self.due += self.period
+        if self.due <= now:
+            self.due = now + self.period
+
+    def delay(self):
+        """Seconds from now until the next tick is due."""
+        return max(0.0, self.due - self.clock())
+
+    def delay_ms(self):
+        return round(self.delay() * 1000)
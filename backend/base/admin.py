@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Game, Player
+from .models import Game, Player, ScoreEntry
 
 @admin.register(Game)
 class GameAdmin(admin.ModelAdmin):
@@ -10,4 +10,10 @@ class GameAdmin(admin.ModelAdmin):
 @admin.register(Player)
 class PlayerAdmin(UserAdmin):
     list_display = ('username', 'email', 'id', 'is_staff')
-    ordering = ('email',)
\ No newline at end of file
+    ordering = ('email',)
+
+@admin.register(ScoreEntry)
+class ScoreEntryAdmin(admin.ModelAdmin):
+    list_display = ('game', 'player', 'score', 'created_at')
+    list_select_related = ('game', 'player')
+    raw_id_fields = ('player',)
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Native async versions of the hot, anonymous read endpoints, routed in place
+of their DRF counterparts when the API runs under ASGI (SERVER_MODE=asgi).
+They use the async ORM and cache so a slow client never holds a worker
+thread. Writes to the same URLs are handed to the regular DRF views.
+record_events streams high-score records as Server-Sent Events.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+from . import cache as api_cache
+from . import events
+from . import replicas
+from .models import Game, ScoreEntry
+from .pagination import KeysetPagination
+from .serializers import GameSerializer, ScoreEntrySerializer
+from .views import GameViewSet
+
+game_list_sync = GameViewSet.as_view({'get': 'list', 'post': 'create'})
+game_detail_sync = GameViewSet.as_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+})
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def not_found():
+    return JsonResponse({"detail": "No Game matches the given query."}, status=404)
+
+
+def games_queryset():
+    return GameViewSet.queryset.only(
+        'id', 'name', 'image', 'image_variants', 'high_score',
+        'high_score_player__id', 'high_score_player__username',
+    )
+
+
+async def get_game(pk):
+    try:
+        return await games_queryset().aget(pk=pk)
+    except (Game.DoesNotExist, DjangoValidationError):
+        return None
+
+
+async def health_check(request):
+    return JsonResponse({"status": "ok"})
+
+
+async def game_list(request):
+    if request.method not in READ_METHODS:
+        return await sync_to_async(game_list_sync)(request)
+
+    async def build():
+        games = [game async for game in games_queryset()]
+        return list(GameSerializer(games, many=True, context={'request': request}).data)
+    async with replicas.areplica_reads(replicas.request_user_id(request)):
+        return await api_cache.aconditional_json(api_cache.GAMES_SCOPE, request, build)
+
+
+async def game_detail(request, pk):
+    if request.method not in READ_METHODS:
+        return await sync_to_async(game_detail_sync)(request, pk=pk)
+
+    async with replicas.areplica_reads(replicas.request_user_id(request)):
+        game = await get_game(pk)
+    if game is None:
+        return not_found()
+    return JsonResponse(GameSerializer(game, context={'request': request}).data)
+
+
+async def game_leaderboard(request, pk):
+    if request.method not in READ_METHODS:
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+    async with replicas.areplica_reads(replicas.request_user_id(request)):
+        game = await get_game(pk)
+        if game is None:
+            return not_found()
+
+        async def build():
+            paginator = KeysetPagination(ordering=('score', True))
+            entries = (
+                ScoreEntry.objects.filter(game=game)
+                .select_related('player', 'game')
+                .only('id', 'score', 'created_at', 'player__username', 'game__name')
+            )
+            page = await paginator.apaginate_queryset(entries, request)
+            return paginator.get_paginated_data(list(ScoreEntrySerializer(page, many=True).data))
+
+        try:
+            return await api_cache.aconditional_json(api_cache.leaderboard_scope(game.pk), request, build)
+        except ValidationError as e:
+            return JsonResponse(e.detail, status=400)
+
+
+async def record_events(request):
+    """
+    Server-Sent Events stream of new high scores, one `record` event per
+    change, with a comment line every EVENTS_HEARTBEAT seconds to keep
+    proxies from closing an idle connection.
+    """
+    async def stream():
+        async with events.hub.subscribe(events.RECORDS_CHANNEL) as subscription:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await subscription.get(timeout=settings.EVENTS_HEARTBEAT)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message['game'])}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx not to buffer the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,51 @@
+"""
+JWT authentication without a Player lookup on every request.
+
+With JWT_AUTH_MODE=stateless (see settings) the default authentication builds
+a TokenUser from the access token's claims (user_id, username, is_staff) and
+never touches the database. Views that need the real Player row use
+CachedUserJWTAuthentication, which keeps recently seen players in a
+per-process, short-TTL cache.
+
+Both trade freshness for speed within bounds: a claims user keeps the
+is_staff it was issued with until the access token expires, and a cached
+player may be up to AUTH_USER_CACHE_TIMEOUT seconds stale in other processes
+(saves in this process drop the entry immediately).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class TokenUserAuthentication(JWTStatelessUserAuthentication):
+    """Authenticates from the token's claims alone; request.user is a TokenUser."""
+
+
+def user_cache_key(user_id):
+    # Claims hold the id as a string, which matches str() of the model's UUID.
+    return f"auth-user:{user_id}"
+
+
+def forget_user(user_id):
+    caches[settings.AUTH_USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves the Player row from a short-TTL in-memory cache."""
+
+    def get_user(self, validated_token):
+        try:
+            key = user_cache_key(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        user = cache.get(key)
+        if user is None:
+            # The parent also enforces is_active and token revocation checks.
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
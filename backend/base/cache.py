@@ -0,0 +1,161 @@
+"""
+Versioned response cache for the public read endpoints.
+
+Each scope ("games" or one game's leaderboard) has a stamp holding a random
+version and the time it last changed. Cached payloads are keyed by that
+version, so invalidating a scope is a single write of a fresh stamp: every
+variant (limit, cursor, host) of the old version simply stops being read and
+ages out. The stamp doubles as the ETag / Last-Modified source for
+conditional GETs.
+
+A response whose content also depends on the date, like the current day's
+leaderboard, names its period: a (label, start) pair. The label joins the
+variant and Last-Modified is never earlier than start, so the first request
+of a new day gets a new key and fresh validators even if nobody has
+submitted a score since.
+"""
+
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone
+
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from . import replicas
+
+GAMES_SCOPE = 'games'
+
+
+def leaderboard_scope(game_id):
+    try:
+        game_id = uuid.UUID(str(game_id))
+    except ValueError:
+        pass
+    return f'leaderboard:{game_id}'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_stamp(scope):
+    cache = get_cache()
+    stamp = cache.get(f'stamp:{scope}')
+    if stamp is None:
+        stamp = (uuid.uuid4().hex, time.time())
+        # add() keeps the first stamp if another worker raced us here.
+        if not cache.add(f'stamp:{scope}', stamp, timeout=None):
+            stamp = cache.get(f'stamp:{scope}', stamp)
+    return stamp
+
+
+def invalidate(*scopes):
+    get_cache().set_many(
+        {f'stamp:{scope}': (uuid.uuid4().hex, time.time()) for scope in scopes},
+        timeout=None,
+    )
+
+
+def variant(request, period=None):
+    """Distinguishes responses to the same scope that differ by host, path, query string or period."""
+    raw = f'{request.get_host()}{request.path}?{request.GET.urlencode()}'
+    if period:
+        raw += f'#{period[0]}'
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def etag_for(scope, request, period=None):
+    version, _ = get_stamp(scope)
+    return f'"{version}-{variant(request, period)}"'
+
+
+def last_modified_for(scope, period=None):
+    _, modified = get_stamp(scope)
+    modified = datetime.fromtimestamp(modified, tz=timezone.utc)
+    return max(modified, period[1]) if period else modified
+
+
+def get_or_build(scope, request, build, period=None):
+    """Return the cached payload for this request, calling build() on a miss."""
+    cache = get_cache()
+    version, modified = get_stamp(scope)
+    key = f'data:{scope}:{version}:{variant(request, period)}'
+    data = cache.get(key)
+    if data is None:
+        with replicas.primary_reads_since(modified):
+            data = build()
+        cache.set(key, data, timeout=settings.API_CACHE_TIMEOUT)
+    return data
+
+
+def conditional(scope_for, period_for=None):
+    """
+    View decorator answering If-None-Match / If-Modified-Since from the scope
+    stamp, so unchanged data costs a 304 and two cache reads. Responses carry
+    Cache-Control: no-cache, which lets browsers keep the body and revalidate
+    it on every request. scope_for receives the view's URL kwargs; period_for,
+    if given, the request and those kwargs, and returns the response's period
+    or None.
+    """
+    def period(request, kwargs):
+        return period_for(request, **kwargs) if period_for else None
+
+    def decorator(view):
+        conditioned = condition(
+            etag_func=lambda request, *args, **kwargs: etag_for(
+                scope_for(**kwargs), request, period(request, kwargs),
+            ),
+            last_modified_func=lambda request, *args, **kwargs: last_modified_for(
+                scope_for(**kwargs), period(request, kwargs),
+            ),
+        )(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = conditioned(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True)
+            return response
+        return wrapped
+    return decorator
+
+
+async def aget_stamp(scope):
+    cache = get_cache()
+    stamp = await cache.aget(f'stamp:{scope}')
+    if stamp is None:
+        stamp = (uuid.uuid4().hex, time.time())
+        if not await cache.aadd(f'stamp:{scope}', stamp, timeout=None):
+            stamp = await cache.aget(f'stamp:{scope}', stamp)
+    return stamp
+
+
+async def aconditional_json(scope, request, build):
+    """
+    Async counterpart of conditional() + get_or_build() for the ASGI read views:
+    answers conditional GETs from the stamp, otherwise returns the cached (or
+    freshly awaited build()) payload as JSON.
+    """
+    version, modified = await aget_stamp(scope)
+    etag = f'"{version}-{variant(request)}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified))
+    if response is None:
+        cache = get_cache()
+        key = f'data:{scope}:{version}:{variant(request)}'
+        data = await cache.aget(key)
+        if data is None:
+            with replicas.primary_reads_since(modified):
+                data = await build()
+            await cache.aset(key, data, timeout=settings.API_CACHE_TIMEOUT)
+        response = JsonResponse(data, safe=False)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,143 @@
+"""
+Streaming NDJSON/CSV serialization of players, games and score history for
+the export_scores / import_scores commands.
+
+Rows are read and written one at a time and applied in fixed-size chunks, so
+memory stays flat no matter how large the file is. An NDJSON file holds every
+model, one {"model": ..., <fields>} object per line, in dependency order
+(players, games, scores). A CSV file holds one model; the header names it.
+Paths ending in .gz are compressed transparently.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import sys
+import uuid
+from datetime import datetime
+
+from .models import Game, Player, ScoreEntry
+
+# Exported columns per model, in file order. FK columns hold the related id.
+SPECS = {
+    'players': (Player, [
+        'id', 'username', 'email', 'password', 'first_name', 'last_name',
+        'is_staff', 'is_superuser', 'is_active', 'date_joined', 'last_login',
+    ]),
+    'games': (Game, ['id', 'name', 'image', 'high_score', 'high_score_player']),
+    'scores': (ScoreEntry, ['id', 'player', 'game', 'score', 'created_at', 'client_timestamp', 'idempotency_key']),
+}
+MODELS = list(SPECS)
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'csv' if name.endswith('.csv') else 'ndjson'
+
+
+def open_text(path, mode):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdout.buffer if 'w' in mode else sys.stdin.buffer, encoding='utf-8', newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_value(value):
+    # Full isoformat, unlike DjangoJSONEncoder, so timestamps survive a round trip.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not serializable")
+
+
+def column_attnames(model, columns):
+    return [model._meta.get_field(c).attname for c in columns]
+
+
+def iter_rows(name, chunk_size):
+    """Yields each row of a model as a dict of exported columns, by primary key."""
+    model, columns = SPECS[name]
+    attnames = column_attnames(model, columns)
+    queryset = model.objects.order_by('pk').values_list(*attnames)
+    for values in queryset.iterator(chunk_size=chunk_size):
+        yield dict(zip(columns, values))
+
+
+def write_ndjson(stream, names, chunk_size):
+    count = 0
+    for name in names:
+        for row in iter_rows(name, chunk_size):
+            stream.write(json.dumps({'model': name, **row}, default=encode_value))
+            stream.write('\n')
+            count += 1
+    return count
+
+
+def write_csv(stream, name, chunk_size):
+    _, columns = SPECS[name]
+    writer = csv.writer(stream)
+    writer.writerow(columns)
+    count = 0
+    for row in iter_rows(name, chunk_size):
+        # CSV has no null: None becomes an empty cell and reads back as None.
+        writer.writerow([
+            '' if row[c] is None else encode_value(row[c]) if isinstance(row[c], (datetime, uuid.UUID)) else row[c]
+            for c in columns
+        ])
+        count += 1
+    return count
+
+
+def read_ndjson(stream):
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            name = row.pop('model')
+        except (ValueError, KeyError, AttributeError):
+            raise ValueError(f"line {number}: not a model record")
+        if name not in SPECS:
+            raise ValueError(f"line {number}: unknown model {name!r}")
+        yield name, row
+
+
+def read_csv(stream):
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    name = next((n for n, (_, columns) in SPECS.items() if columns == header), None)
+    if name is None:
+        raise ValueError(f"CSV header {header} does not match any of: {', '.join(MODELS)}")
+    for values in reader:
+        yield name, {c: (None if v == '' else v) for c, v in zip(header, values)}
+
+
+def build_instance(name, row):
+    """Turns a parsed row into an unsaved model instance, converting each value."""
+    model, columns = SPECS[name]
+    instance = model()
+    for column in columns:
+        field = model._meta.get_field(column)
+        value = row.get(column)
+        if field.is_relation:
+            value = field.target_field.to_python(value) if value is not None else None
+        elif value is not None:
+            value = field.to_python(value)
+        elif field.empty_strings_allowed and not field.null:
+            value = ''  # an empty CSV cell in a NOT NULL text column
+        setattr(instance, field.attname, value)
+    return instance
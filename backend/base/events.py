@@ -0,0 +1,200 @@
+"""
+Server push of high-score records to open GamesHub tabs.
+
+Views call publish() after a write. The configured broker (EVENTS_BROKER)
+carries the message to every server process, where the in-process Hub fans
+it out to that process's subscribers: Server-Sent Events streams
+(async_views.record_events) and WebSocket connections (websocket_app,
+mounted in myproj/asgi.py). Both only run under ASGI.
+
+LocalBroker hands messages straight to this process's hub. It is the
+stand-in for development, tests and single-worker deployments. With several
+workers, use PostgresBroker (LISTEN/NOTIFY on the existing database) or any
+Broker subclass backed by a shared store.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+RECORDS_CHANNEL = 'records'
+WEBSOCKET_PATH = '/api/ws/records/'
+
+
+class Broker:
+    """Carries published messages between processes."""
+
+    def publish(self, channel, message):
+        """Sends a JSON-serializable message to every process. Called from sync code."""
+        raise NotImplementedError
+
+    async def listen(self, channel, deliver):
+        """Runs in a subscribing process, calling deliver(message) for each message on channel."""
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    def publish(self, channel, message):
+        hub.deliver(channel, message)
+
+    async def listen(self, channel, deliver):
+        # Publishing already delivered to this process; there is nothing to receive.
+        return
+
+
+class PostgresBroker(Broker):
+    """LISTEN/NOTIFY on the default database. NOTIFY is sent when the publishing transaction commits."""
+    retry_delay = 5
+
+    def publish(self, channel, message):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [channel, json.dumps(message)])
+
+    async def listen(self, channel, deliver):
+        import psycopg
+        from psycopg import sql
+
+        params = connection.get_connection_params()
+        # Django's sync cursor class and adapters don't apply to an async connection.
+        params.pop('cursor_factory', None)
+        params.pop('context', None)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(**params, autocommit=True) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                    async for notify in conn.notifies():
+                        deliver(json.loads(notify.payload))
+            except (psycopg.Error, OSError, ValueError) as e:
+                logger.warning("Lost %s listener (%s); reconnecting.", channel, e)
+                await asyncio.sleep(self.retry_delay)
+
+
+class Subscription:
+    def __init__(self, hub, channel):
+        self.hub = hub
+        self.channel = channel
+        self.queue = asyncio.Queue(hub.queue_size)
+        self.loop = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.hub.add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.hub.remove(self)
+
+    async def get(self, timeout=None):
+        """Next message; raises TimeoutError when none arrives within timeout seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def offer(self, message):
+        # A subscriber that stops reading loses its oldest messages, never blocks publishers.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class Hub:
+    """In-process fan-out. deliver() is thread-safe; subscribers live on event loops."""
+    queue_size = 100
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+        self.listeners = {}
+
+    def subscribe(self, channel):
+        return Subscription(self, channel)
+
+    def add(self, subscription):
+        with self.lock:
+            self.subscribers[subscription.channel].add(subscription)
+            listener = self.listeners.get(subscription.channel)
+            if listener is None or listener.done() or listener.get_loop() is not subscription.loop:
+                self.listeners[subscription.channel] = subscription.loop.create_task(
+                    get_broker().listen(subscription.channel, partial(self.deliver, subscription.channel))
+                )
+
+    def remove(self, subscription):
+        with self.lock:
+            self.subscribers[subscription.channel].discard(subscription)
+
+    def deliver(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscribers[channel])
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # The subscriber's event loop has shut down.
+                self.remove(subscription)
+
+
+hub = Hub()
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.EVENTS_BROKER)()
+    return _broker
+
+
+def publish(channel, message):
+    try:
+        get_broker().publish(channel, message)
+    except Exception:
+        # Push is best effort; the write it announces has already succeeded.
+        logger.exception("Could not publish to %s", channel)
+
+
+def publish_record(game_id, game_name, high_score, player_id, player_username):
+    publish(RECORDS_CHANNEL, {
+        'type': 'record',
+        'game': {
+            'id': str(game_id),
+            'name': game_name,
+            'high_score': high_score,
+            'high_score_player': str(player_id),
+            'high_score_player_username': player_username,
+        },
+    })
+
+
+async def websocket_app(scope, receive, send):
+    """Raw ASGI WebSocket endpoint streaming the records channel as JSON text frames."""
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    if scope['path'] != WEBSOCKET_PATH:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    await send({'type': 'websocket.accept'})
+
+    async with hub.subscribe(RECORDS_CHANNEL) as subscription:
+        incoming = asyncio.ensure_future(receive())
+        try:
+            while True:
+                outgoing = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait({incoming, outgoing}, return_when=asyncio.FIRST_COMPLETED)
+                if outgoing in done:
+                    await send({'type': 'websocket.send', 'text': json.dumps(outgoing.result())})
+                else:
+                    outgoing.cancel()
+                if incoming in done:
+                    if incoming.result()['type'] == 'websocket.disconnect':
+                        return
+                    # Clients have nothing to say on this channel; ignore what they send.
+                    incoming = asyncio.ensure_future(receive())
+        finally:
+            incoming.cancel()
@@ -0,0 +1,160 @@
+"""
+Resized AVIF/WebP variants of Game cover art.
+
+Uploads are kept as they are, but GamesHub cards are a few hundred pixels
+wide, so after a game's image changes its variants are rendered with Pillow
+on a process pool of IMAGE_VARIANT_WORKERS (inline when that is 0) and their
+names saved in Game.image_variants:
+
+    {"source": "game_covers/x.jpg", "avif": [[200, "game_covers/variants/<hash>-200.avif"], ...], "webp": [...]}
+
+with each variant's actual width, ready for a srcset. Variant names carry a
+hash of the source's bytes, so a URL always serves the same content and
+nginx can cache them for good; a new upload gets new names. Rendering the
+same source again finds its files already stored and skips encoding them.
+"""
+
+import hashlib
+import io
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from PIL import Image, ImageOps, features
+
+from . import cache as api_cache
+from .models import Game
+from .workers import process_pool
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = 'game_covers/variants'
+HASH_LENGTH = 16
+SAVE_OPTIONS = {
+    'avif': {'quality': 50},
+    'webp': {'quality': 80, 'method': 4},
+}
+
+_pool = None
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = process_pool(settings.IMAGE_VARIANT_WORKERS)
+    return _pool
+
+
+def formats():
+    """The configured formats this Pillow build can encode."""
+    return [f for f in settings.IMAGE_VARIANT_FORMATS if features.check(f)]
+
+
+def render_variants(source):
+    """Renders and stores every variant of a stored image; returns the variants' names."""
+    with default_storage.open(source, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+
+    thumbs = []
+    for width in sorted(settings.IMAGE_VARIANT_WIDTHS):
+        thumb = image.copy()
+        # Never upscales, so a small source yields fewer, narrower variants.
+        thumb.thumbnail((width, width), Image.LANCZOS)
+        if not thumbs or thumb.width > thumbs[-1].width:
+            thumbs.append(thumb)
+
+    variants = {'source': source}
+    for fmt in formats():
+        variants[fmt] = []
+        for thumb in thumbs:
+            name = f'{VARIANT_DIR}/{digest}-{thumb.width}.{fmt}'
+            # Names follow from the content, so an existing file is already this variant.
+            if not default_storage.exists(name):
+                out = io.BytesIO()
+                thumb.save(out, fmt.upper(), **SAVE_OPTIONS.get(fmt, {}))
+                default_storage.save(name, ContentFile(out.getvalue()))
+            variants[fmt].append([thumb.width, name])
+    return variants
+
+
+def save_variants(game_id, variants):
+    """Records the variants, unless the game's image changed again meanwhile."""
+    updated = Game.objects.filter(pk=game_id, image=variants['source']).update(image_variants=variants)
+    if updated:
+        api_cache.invalidate(api_cache.GAMES_SCOPE)
+    return bool(updated)
+
+
+def schedule(game):
+    """Called once a save that changed the game's image has committed."""
+    source = game.image.name if game.image else ''
+    if not source:
+        if game.image_variants:
+            Game.objects.filter(pk=game.pk, image='').update(image_variants={})
+            api_cache.invalidate(api_cache.GAMES_SCOPE)
+        return
+    if settings.IMAGE_VARIANT_WORKERS < 1:
+        # Inline, in the request that saved the game, which has already committed.
+        try:
+            save_variants(game.pk, render_variants(source))
+        except Exception:
+            logger.exception("Could not render the variants of %s", source)
+        return
+    get_pool().submit(render_variants, source).add_done_callback(partial(_finish, game.pk, source))
+
+
+def _finish(game_id, source, future):
+    # Runs on the pool's result thread, which has database connections of its own.
+    try:
+        save_variants(game_id, future.result())
+    except Exception:
+        logger.exception("Could not render the variants of %s", source)
+    finally:
+        connections.close_all()
+
+
+def needs_variants(game):
+    return (game.image.name if game.image else '') != game.image_variants.get('source', '')
+
+
+def srcsets(game, request=None):
+    """{format: srcset} for the game's variants, widest last, as <picture> sources want them."""
+    result = {}
+    for fmt, sizes in game.image_variants.items():
+        if fmt == 'source':
+            continue
+        urls = []
+        for width, name in sizes:
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls.append(f'{url} {width}w')
+        result[fmt] = ', '.join(urls)
+    return result
+
+
+def remove_orphans(keep):
+    """Deletes stored variants no game refers to; returns how many were deleted."""
+    try:
+        _, files = default_storage.listdir(VARIANT_DIR)
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for filename in files:
+        name = f'{VARIANT_DIR}/{filename}'
+        if name not in keep:
+            default_storage.delete(name)
+            removed += 1
+    return removed
+
+
+def variant_names(variants):
+    return {name for fmt, sizes in variants.items() if fmt != 'source' for _, name in sizes}
+
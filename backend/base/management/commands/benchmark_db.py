@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from base.models import Game
+
+# Environment overrides for each connection strategy in the PostgreSQL profile.
+PROFILES = {
+    'direct': {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '0'},
+    'persistent': {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '60'},
+    'pool': {'DB_POOL': 'True'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare request throughput against PostgreSQL with a new connection per "
+        "request, persistent connections, and the psycopg pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--run-profile', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['run_profile']:
+            self.stdout.write(json.dumps(self.measure(options['threads'], options['duration'])))
+            return
+
+        if connection.vendor != 'postgresql':
+            raise CommandError("Set DB_ENGINE=django.db.backends.postgresql (e.g. against the compose db).")
+
+        self.stdout.write(f"{'profile':<11} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for profile in options['profiles']:
+            # Each profile needs its own settings, so it runs in a fresh process.
+            output = subprocess.run(
+                [
+                    sys.executable, 'manage.py', 'benchmark_db', '--run-profile', profile,
+                    '--threads', str(options['threads']), '--duration', str(options['duration']),
+                ],
+                cwd=settings.BASE_DIR,
+                env=dict(os.environ, DEBUG='False', **PROFILES[profile]),
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            self.stdout.write(f"{profile:<11} {stats['rps']:>9.1f} {stats['p50']:>8.2f} {stats['p99']:>8.2f}")
+
+    def measure(self, threads, duration):
+        game = Game.objects.first()
+        if game is None:
+            raise CommandError("No games found; load the fixture first.")
+        # Game detail is not response-cached, so every request reaches the database.
+        url = f'/api/games/{game.id}/'
+        connection.close()
+
+        latencies = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+
+        def worker():
+            # The test client fires request_started/finished, so Django opens,
+            # reuses or returns connections exactly as it would in production.
+            client = Client()
+            local = []
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                client.get(url)
+                local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.monotonic()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+        pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+        return {'rps': len(latencies) / elapsed, 'p50': pick(0.50), 'p99': pick(0.99)}
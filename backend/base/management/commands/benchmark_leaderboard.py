@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+
+from base.models import Game, Player, ScoreEntry
+
+
+class Command(BaseCommand):
+    help = "Measure leaderboard and score-history latency (p50/p95/p99) through the full API stack."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--pages', type=int, default=5, help="Cursor pages to walk per iteration.")
+
+    def handle(self, *args, **options):
+        game = Game.objects.order_by('name').first()
+        player = Player.objects.filter(scores__isnull=False).first()
+        if game is None or player is None:
+            self.stderr.write("No score history found; run generate_scores first.")
+            return
+
+        self.stdout.write(f"{ScoreEntry.objects.count()} score entries in history")
+
+        client = APIClient()
+        client.force_authenticate(player)
+        limit = options['limit']
+
+        self.report('leaderboard', self.sample(
+            client, f'/api/games/{game.id}/leaderboard/', limit, options['iterations'], options['pages'],
+        ))
+        self.report('players/me/scores', self.sample(
+            client, '/api/players/me/scores/', limit, options['iterations'], options['pages'],
+        ))
+
+    def sample(self, client, url, limit, iterations, pages):
+        timings = []
+        for _ in range(iterations):
+            cursor = None
+            for _ in range(pages):
+                params = {'limit': limit}
+                if cursor:
+                    params['cursor'] = cursor
+                start = time.perf_counter()
+                response = client.get(url, params)
+                timings.append((time.perf_counter() - start) * 1000)
+                cursor = response.data['next']
+                if not cursor:
+                    break
+        return timings
+
+    def report(self, name, timings):
+        timings.sort()
+        p = lambda q: timings[min(len(timings) - 1, int(len(timings) * q))]
+        self.stdout.write(
+            f"{name:<20} n={len(timings)}  mean={statistics.mean(timings):.2f}ms  "
+            f"p50={p(0.50):.2f}ms  p95={p(0.95):.2f}ms  p99={p(0.99):.2f}ms"
+        )
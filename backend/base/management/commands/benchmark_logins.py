@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from base.hashers import hash_passwords
+from base.models import Player
+
+HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2-tuned': 'base.hashers.TunedArgon2PasswordHasher',
+    'argon2-default': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins/sec on one core through /api/login/ for each password hasher, "
+        "and the time to register a class roster with and without the hashing pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hashers', nargs='+', default=list(HASHERS), choices=list(HASHERS))
+        parser.add_argument('--duration', type=float, default=5.0, help="Seconds of logins per hasher.")
+        parser.add_argument('--roster', type=int, default=30, help="Players in the roster test.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'hasher':<15} {'logins/s/core':>14} {'ms/login':>9}")
+        for name in options['hashers']:
+            rate = self.measure_logins(HASHERS[name], options['duration'])
+            self.stdout.write(f"{name:<15} {rate:>14.1f} {1000 / rate:>9.2f}")
+
+        passwords = [f'roster-pw-{i}' for i in range(options['roster'])]
+        self.stdout.write("")
+        self.stdout.write(f"roster of {len(passwords)} with {get_hasher().algorithm}:")
+        for label, workers in (('inline', 0), ('pool', settings.PASSWORD_HASH_WORKERS)):
+            with override_settings(PASSWORD_HASH_WORKERS=workers):
+                hash_passwords(passwords[:2])  # start the pool outside the timing
+                start = time.perf_counter()
+                hash_passwords(passwords)
+                elapsed = time.perf_counter() - start
+            self.stdout.write(f"  {label:<7} ({workers} workers) {elapsed * 1000:>9.1f} ms")
+
+    def measure_logins(self, hasher, duration):
+        client = APIClient()
+        logins = 0
+        try:
+            with transaction.atomic(), override_settings(PASSWORD_HASHERS=[hasher], THROTTLE_RATES={}):
+                Player.objects.create_user(username='benchmark_login', email='benchmark_login@example.com', password='pw')
+                deadline = time.monotonic() + duration
+                start = time.perf_counter()
+                while time.monotonic() < deadline:
+                    response = client.post('/api/login/', {'username': 'benchmark_login', 'password': 'pw'}, format='json')
+                    assert response.status_code == 200, response.data
+                    logins += 1
+                elapsed = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+        return logins / elapsed
@@ -0,0 +1,133 @@
+import http.client
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+CACHE_HITS = {'HIT', 'STALE', 'UPDATING', 'REVALIDATED'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the site through nginx, as a browser fetches it: the SPA shell, its "
+        "entry bundle, a Django static file and the anonymous games list. Pass the old and "
+        "new frontend containers as before=URL after=URL to compare them side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--targets', nargs='+', default=['http://localhost'],
+            help="URLs, optionally labelled as label=URL.",
+        )
+        parser.add_argument(
+            '--paths', nargs='+',
+            help="Defaults to /, the entry bundle index.html loads, /static/admin/css/base.css and /api/games/.",
+        )
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=15.0, help="Seconds of load per target and path.")
+
+    def handle(self, *args, **options):
+        results = []
+        for target in options['targets']:
+            label, _, url = target.rpartition('=')
+            parts = urlsplit(url)
+            if parts.scheme not in ('http', 'https') or not parts.hostname:
+                raise CommandError(f"Not an http(s) URL: {url}")
+            label = label or parts.netloc
+            paths = options['paths'] or self.default_paths(parts)
+            for path in paths:
+                stats = self.run_load(parts, path, options['concurrency'], options['duration'])
+                results.append((label, path, stats))
+                self.stdout.write(self.format_row(label, path, stats))
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'target':<10} {'path':<32} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'bytes':>8} {'gzip':>5} {'cached':>7} {'errors':>7}"
+        )
+        for label, path, stats in sorted(results, key=lambda r: r[1]):
+            self.stdout.write(self.format_row(label, path, stats))
+
+    def connect(self, parts):
+        cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        return cls(parts.hostname, parts.port, timeout=10)
+
+    def default_paths(self, parts):
+        paths = ['/']
+        conn = self.connect(parts)
+        try:
+            conn.request('GET', '/')
+            html = conn.getresponse().read().decode('utf-8', 'replace')
+        except (OSError, http.client.HTTPException) as e:
+            raise CommandError(f"Could not load {parts.geturl()}: {e}")
+        finally:
+            conn.close()
+        bundle = re.search(r'<script[^>]+src="(/assets/[^"]+\.js)"', html)
+        if bundle:
+            paths.append(bundle.group(1))
+        return paths + ['/static/admin/css/base.css', '/api/games/']
+
+    def run_load(self, parts, path, concurrency, duration):
+        latencies = []
+        totals = {'bytes': 0, 'gzip': 0, 'cached': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+        # Browsers offer compression and mostly arrive without a token.
+        headers = {'Accept-Encoding': 'gzip, br'}
+
+        def client():
+            conn = self.connect(parts)
+            local = []
+            counts = dict.fromkeys(totals, 0)
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    conn.request('GET', path, headers=headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                    if response.status != 200:
+                        counts['errors'] += 1
+                        continue
+                except (OSError, http.client.HTTPException):
+                    counts['errors'] += 1
+                    conn.close()
+                    conn = self.connect(parts)
+                    continue
+                local.append(time.perf_counter() - start)
+                counts['bytes'] += len(body)
+                counts['gzip'] += response.getheader('Content-Encoding', '') in ('gzip', 'br')
+                counts['cached'] += response.getheader('X-Cache-Status', '') in CACHE_HITS
+            conn.close()
+            with lock:
+                latencies.extend(local)
+                for key, value in counts.items():
+                    totals[key] += value
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+        done = len(latencies)
+        pick = lambda q: latencies[min(done - 1, int(done * q))] * 1000 if latencies else 0.0
+        return {
+            'rps': done / elapsed,
+            'p50': pick(0.50),
+            'p99': pick(0.99),
+            'bytes': totals['bytes'] / done if done else 0,
+            'gzip': totals['gzip'] / done if done else 0,
+            'cached': totals['cached'] / done if done else 0,
+            'errors': totals['errors'],
+        }
+
+    def format_row(self, label, path, stats):
+        return (
+            f"{label:<10} {path[:32]:<32} {stats['rps']:>9.1f} {stats['p50']:>8.2f} {stats['p99']:>8.2f} "
+            f"{stats['bytes']:>8.0f} {stats['gzip']:>5.0%} {stats['cached']:>7.0%} {stats['errors']:>7}"
+        )
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from base import replays
+from base.replays import bots
+
+PLAYERS = {
+    'Snaky-Snake': bots.play_snake,
+    'Beautiful-Balloon': bots.play_balloon,
+    'Pencil-Game': bots.play_pencil,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure replay verification throughput: genuine logs from simple bots, "
+        "checked one by one in this process and as a batch across the worker pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replays', type=int, default=500, help="Logs per game.")
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        count, workers = options['replays'], options['workers']
+        self.stdout.write(f"{count} replays per game, {workers} workers")
+        self.stdout.write(f"{'game':<20} {'avg bytes':>9} {'inline/min':>11} {'pool/min':>11}")
+        with override_settings(REPLAY_VERIFICATION='required', REPLAY_VERIFY_WORKERS=workers):
+            for game_name, play in PLAYERS.items():
+                submissions = [(game_name, score, log) for log, score in map(play, range(count))]
+                size = sum(len(log) for _, _, log in submissions) / count
+
+                start = time.perf_counter()
+                inline = [replays.check_score(*s) for s in submissions]
+                inline_rate = count / (time.perf_counter() - start) * 60
+
+                # Spawn the workers before timing them.
+                replays.check_scores(submissions[:workers * 2])
+                start = time.perf_counter()
+                pooled = replays.check_scores(submissions)
+                pool_rate = count / (time.perf_counter() - start) * 60
+
+                if any(inline) or any(pooled):
+                    self.stderr.write(f"{game_name}: a genuine replay was rejected")
+                self.stdout.write(f"{game_name:<20} {size:>9.0f} {inline_rate:>11.0f} {pool_rate:>11.0f}")
@@ -0,0 +1,62 @@
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import ScopedRateThrottle
+
+from base.throttling import TokenBucketThrottle, get_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost of one throttle check: the token bucket in the configured "
+        "THROTTLE_STORE, and DRF's history-list ScopedRateThrottle in the throttle cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=50_000)
+        parser.add_argument('--clients', type=int, default=1000, help="Distinct players the checks cycle through.")
+
+    def handle(self, *args, **options):
+        checks, clients = options['checks'], options['clients']
+        view = SimpleNamespace(throttle_scope='benchmark')
+        factory = APIRequestFactory()
+        requests = []
+        for i in range(clients):
+            request = Request(factory.post('/api/submit-score/', REMOTE_ADDR=f'10.0.{i // 256 % 256}.{i % 256}'))
+            request.user = SimpleNamespace(is_authenticated=True, pk=f'player-{i}')
+            requests.append(request)
+
+        alias = settings.THROTTLE_CACHE_ALIAS
+        store = get_store()
+        self.stdout.write(
+            f"{checks} checks over {clients} players; "
+            f"store {store.__class__.__name__}, cache {caches[alias].__class__.__name__}"
+        )
+        self.stdout.write(f"{'throttle':<20} {'case':<8} {'us/check':>9}")
+        # ScopedRateThrottle keeps one timestamp per request in the period; the bucket keeps two numbers.
+        rates = {'allowed': '1000/s', 'denied': '1/d'}
+        for case, rate in rates.items():
+            history = type('HistoryThrottle', (ScopedRateThrottle,), {
+                'THROTTLE_RATES': {'benchmark': rate}, 'cache': caches[alias],
+            })
+            for label, throttle_class in (('token bucket', TokenBucketThrottle), ('ScopedRateThrottle', history)):
+                store.clear()
+                caches[alias].clear()
+                with override_settings(THROTTLE_RATES={'benchmark': rate}):
+                    elapsed = self.measure(throttle_class, requests, view, checks)
+                self.stdout.write(f"{label:<20} {case:<8} {elapsed / checks * 1e6:>9.2f}")
+        store.clear()
+        caches[alias].clear()
+
+    def measure(self, throttle_class, requests, view, checks):
+        count = len(requests)
+        start = time.perf_counter()
+        for i in range(checks):
+            throttle_class().allow_request(requests[i % count], view)
+        return time.perf_counter() - start
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+# collectstatic's default ignore patterns.
+IGNORE_PATTERNS = ['CVS', '.*', '*~']
+STATIC_STAMP = '.collectstatic'
+
+
+def pending_migrations():
+    executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def static_fingerprint():
+    """Hash of every file collectstatic would copy: its destination name and its content."""
+    sources = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(IGNORE_PATTERNS):
+            prefix = getattr(storage, 'prefix', None)
+            name = os.path.join(prefix, path) if prefix else path
+            # The first finder to list a name wins, as in collectstatic.
+            sources.setdefault(name, (storage, path))
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        storage, path = sources[name]
+        digest.update(name.encode() + b'\0')
+        with storage.open(path) as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Container start-up in one process: migrate, import the seed file, render missing "
+        "cover art variants and collect static files, skipping each step that has nothing "
+        "to do, and print how long every phase took."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', default='seed.ndjson', help="import_scores file; '' skips the import.")
+        parser.add_argument('--variant-workers', type=int, default=2)
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        started = time.monotonic()
+        # entrypoint.sh exports BOOT_STARTED (epoch seconds) before starting Python.
+        if 'BOOT_STARTED' in os.environ:
+            self.report('django setup', time.time() - float(os.environ['BOOT_STARTED']), '')
+
+        self.phase('migrate', self.migrate)
+        if options['seed']:
+            self.phase('seed import', lambda: self.quiet('import_scores', options['seed']))
+        self.phase(
+            'cover art', lambda: self.quiet('render_image_variants', workers=options['variant_workers']),
+        )
+        self.phase('collectstatic', self.collectstatic)
+        self.report('boot total', time.monotonic() - started, '')
+
+    def phase(self, name, run):
+        start = time.monotonic()
+        note = run()
+        self.report(name, time.monotonic() - start, note or '')
+
+    def report(self, name, seconds, note):
+        self.stdout.write(f"boot: {name:<14} {seconds:6.2f}s  {note}".rstrip())
+
+    def quiet(self, command, *args, **options):
+        call_command(command, *args, verbosity=self.verbosity, stdout=self.stdout, stderr=self.stderr, **options)
+
+    def migrate(self):
+        plan = pending_migrations()
+        if not plan:
+            return "no pending migrations"
+        self.quiet('migrate', interactive=False)
+        return f"applied {len(plan)} migrations"
+
+    def collectstatic(self):
+        fingerprint = static_fingerprint()
+        stamp = os.path.join(settings.STATIC_ROOT, STATIC_STAMP)
+        try:
+            with open(stamp) as f:
+                if f.read().strip() == fingerprint:
+                    return "static files unchanged"
+        except FileNotFoundError:
+            pass
+        self.quiet('collectstatic', interactive=False)
+        with open(stamp, 'w') as f:
+            f.write(fingerprint)
+        return "collected"
@@ -0,0 +1,114 @@
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the API under gunicorn in WSGI and ASGI mode in turn and compare "
+        "throughput and latency of the hot read endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', default=['wsgi', 'asgi'], choices=['wsgi', 'asgi'])
+        parser.add_argument('--paths', nargs='+', default=['/api/games/', '/api/api/health/'])
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=15.0, help="Seconds of load per mode and path.")
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        results = []
+        for mode in options['modes']:
+            server = self.start_server(mode, options['port'], options['workers'])
+            try:
+                for path in options['paths']:
+                    stats = self.run_load(options['port'], path, options['concurrency'], options['duration'])
+                    results.append((mode, path, stats))
+                    self.stdout.write(self.format_row(mode, path, stats))
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+
+        self.stdout.write("")
+        self.stdout.write(f"{'mode':<6} {'path':<22} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for mode, path, stats in results:
+            self.stdout.write(self.format_row(mode, path, stats))
+
+    def start_server(self, mode, port, workers):
+        env = dict(os.environ, SERVER_MODE=mode, GUNICORN_BIND=f"127.0.0.1:{port}", DEBUG='False')
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--workers', str(workers)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+                conn.request('GET', '/api/api/health/')
+                if conn.getresponse().status == 200:
+                    return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"{mode} server did not become healthy on port {port}")
+
+    def run_load(self, port, path, concurrency, duration):
+        latencies = []
+        errors = [0]
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+
+        def client():
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            local, failed = [], 0
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    conn.request('GET', path)
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        failed += 1
+                        continue
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+                    continue
+                local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+        pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else 0.0
+        return {
+            'rps': len(latencies) / elapsed,
+            'p50': pick(0.50),
+            'p99': pick(0.99),
+            'errors': errors[0],
+        }
+
+    def format_row(self, mode, path, stats):
+        return (
+            f"{mode:<6} {path:<22} {stats['rps']:>9.1f} {stats['p50']:>8.2f} "
+            f"{stats['p99']:>8.2f} {stats['errors']:>7}"
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from base import dataio
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream players, games and score history to NDJSON (all models in one file) "
+        "or CSV (one model per file). Memory use does not grow with the data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file; .gz compresses, '-' writes to stdout.")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help="Defaults to the file extension.")
+        parser.add_argument('--models', nargs='+', choices=dataio.MODELS, default=dataio.MODELS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = dataio.detect_format(path, options['format'])
+        # Keep dependency order however the models were listed.
+        names = [name for name in dataio.MODELS if name in options['models']]
+        if fmt == 'csv' and len(names) != 1:
+            raise CommandError("A CSV file holds one model; pass exactly one of --models.")
+
+        stream = dataio.open_text(path, 'w')
+        try:
+            if fmt == 'csv':
+                count = dataio.write_csv(stream, names[0], options['chunk_size'])
+            else:
+                count = dataio.write_ndjson(stream, names, options['chunk_size'])
+        finally:
+            if path == '-':
+                stream.flush()
+                stream.detach()
+            else:
+                stream.close()
+
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f"Exported {count} rows to {path}."))
@@ -0,0 +1,76 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from base import cache as api_cache
+from base.models import Game, Player, ScoreEntry, ScoreRollup
+
+
+class Command(BaseCommand):
+    help = "Fill the ScoreEntry history and its leaderboard rollups with synthetic plays for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1_000_000, help="Number of score entries to create.")
+        parser.add_argument('--players', type=int, default=1000, help="Number of synthetic players to spread scores over.")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--max-score', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        games = list(Game.objects.values_list('id', flat=True))
+        if not games:
+            self.stderr.write("No games found; load the fixture or create a game first.")
+            return
+
+        players = self.ensure_players(options['players'])
+        batch_size = options['batch_size']
+        max_score = options['max_score']
+        remaining = options['count']
+
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            entries = [
+                ScoreEntry(
+                    player_id=rng.choice(players),
+                    game_id=rng.choice(games),
+                    # Scores come in steps of 10 like the real games, so ties are common.
+                    score=rng.randint(0, max_score // 10) * 10,
+                )
+                for _ in range(size)
+            ]
+            with transaction.atomic():
+                ScoreEntry.objects.bulk_create(entries, batch_size=batch_size)
+                ScoreRollup.objects.record_scores((e.game_id, e.player_id, e.score, e.created_at) for e in entries)
+            remaining -= size
+            self.stdout.write(f"{options['count'] - remaining} / {options['count']} entries")
+
+        self.sync_high_scores()
+        # Bulk writes skip the model signals, so drop the cached responses here.
+        api_cache.invalidate(api_cache.GAMES_SCOPE, *(api_cache.leaderboard_scope(g) for g in games))
+        self.stdout.write(self.style.SUCCESS(f"Created {options['count']} score entries."))
+
+    def ensure_players(self, count):
+        existing = list(Player.objects.filter(username__startswith='loadtest_').values_list('id', flat=True))
+        missing = count - len(existing)
+        if missing > 0:
+            # Hash once; these accounts only exist to own generated scores.
+            password = make_password(None)
+            start = len(existing)
+            Player.objects.bulk_create(
+                [
+                    Player(username=f'loadtest_{i}', email=f'loadtest_{i}@example.com', password=password)
+                    for i in range(start, start + missing)
+                ],
+                batch_size=1000,
+            )
+            existing = list(Player.objects.filter(username__startswith='loadtest_').values_list('id', flat=True))
+        return existing[:count]
+
+    def sync_high_scores(self):
+        for game_id, best in ScoreEntry.objects.values_list('game').annotate(best=Max('score')):
+            top = ScoreEntry.objects.filter(game_id=game_id, score=best).order_by('id').values_list('player_id', flat=True).first()
+            Game.objects.filter(pk=game_id, high_score__lt=best).update(high_score=best, high_score_player_id=top)
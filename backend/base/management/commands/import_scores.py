@@ -0,0 +1,117 @@
+import os
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, reset_queries, transaction
+
+from base import cache as api_cache
+from base import dataio
+from base.models import DataImport, ScoreRollup
+
+
+@contextmanager
+def keep_file_timestamps(model):
+    """
+    auto_now_add fields are stamped with "now" on every INSERT, including
+    bulk_create. Switch that off for the statement so the exported values are
+    kept, as loaddata does, instead of fixing them up with a bulk_update.
+    """
+    fields = [f for f in model._meta.concrete_fields if getattr(f, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "Upsert players, games and score history from an export_scores file in "
+        "fixed-size chunks, folding imported scores into the leaderboard rollups. "
+        "Re-importing a file is idempotent, and a file whose checksum matches the "
+        "last import is skipped without being read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--force', action='store_true', help="Import even if the file is unchanged.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f"{path} does not exist.")
+
+        source = os.path.basename(path)
+        checksum = dataio.file_checksum(path)
+        if not options['force'] and DataImport.objects.filter(source=source, checksum=checksum).exists():
+            self.stdout.write(f"{source} is unchanged since the last import; skipping.")
+            return
+
+        fmt = dataio.detect_format(path, options['format'])
+        read = dataio.read_csv if fmt == 'csv' else dataio.read_ndjson
+        chunk_size = options['chunk_size']
+        counts = Counter()
+        self.games = set()
+
+        try:
+            with dataio.open_text(path, 'r') as stream, transaction.atomic():
+                current, chunk = None, []
+                for name, row in read(stream):
+                    if chunk and (name != current or len(chunk) >= chunk_size):
+                        self.apply(current, chunk)
+                        chunk = []
+                    current = name
+                    chunk.append(dataio.build_instance(name, row))
+                    counts[name] += 1
+                if chunk:
+                    self.apply(current, chunk)
+
+                # Explicit ids were inserted, so move every imported model's sequence
+                # past them (no-op on SQLite, and for models keyed by UUID).
+                imported = [dataio.SPECS[name][0] for name in dataio.MODELS if counts[name]]
+                with connection.cursor() as cursor:
+                    for sql in connection.ops.sequence_reset_sql(no_style(), imported):
+                        cursor.execute(sql)
+
+                DataImport.objects.update_or_create(
+                    source=source, defaults={'checksum': checksum, 'rows': sum(counts.values())},
+                )
+        except ValueError as e:
+            raise CommandError(f"{path}: {e}")
+        except IntegrityError as e:
+            raise CommandError(f"{path} conflicts with existing rows: {e}")
+
+        if counts:
+            # Bulk writes skip the model signals, so drop the cached responses here.
+            api_cache.invalidate(api_cache.GAMES_SCOPE, *(api_cache.leaderboard_scope(g) for g in self.games))
+
+        summary = ", ".join(f"{counts[name]} {name}" for name in dataio.MODELS if counts[name])
+        self.stdout.write(self.style.SUCCESS(f"Imported {summary or 'nothing'} from {path}."))
+
+    def apply(self, name, instances):
+        model, columns = dataio.SPECS[name]
+        with keep_file_timestamps(model):
+            model.objects.bulk_create(
+                instances,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=[c for c in columns if c != 'id'],
+            )
+
+        # With DEBUG on, every statement is logged in memory; keep that flat too.
+        reset_queries()
+
+        if name == 'games':
+            self.games.update(i.id for i in instances)
+        elif name == 'scores':
+            # A max per bucket, so folding rows in again on a re-import changes nothing.
+            ScoreRollup.objects.record_scores(
+                (i.game_id, i.player_id, i.score, i.client_timestamp or i.created_at) for i in instances
+            )
+            self.games.update(i.game_id for i in instances)
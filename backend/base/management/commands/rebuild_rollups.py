@@ -0,0 +1,80 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.functions import Coalesce, TruncDate
+
+from base import cache as api_cache
+from base.models import Game, ScoreEntry, ScoreRollup
+from base.workers import process_pool
+
+
+def daily_bests(bounds):
+    """Each (game, player, day) best among entries with lo <= id < hi. Runs in a worker process."""
+    lo, hi = bounds
+    return list(
+        ScoreEntry.objects.filter(id__gte=lo, id__lt=hi)
+        .annotate(day=TruncDate(Coalesce('client_timestamp', 'created_at')))
+        .order_by()
+        .values('game_id', 'player_id', 'day')
+        .annotate(best=Max('score'))
+        .values_list('game_id', 'player_id', 'day', 'best')
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily/weekly/all-time leaderboard rollups from the score history. "
+        "Id ranges of the history are aggregated in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100_000, help="Score entries per worker task.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="1 aggregates in this process.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        bounds = ScoreEntry.objects.aggregate(lo=Min('id'), hi=Max('id'))
+        if bounds['lo'] is None:
+            bounds = {'lo': 1, 'hi': 0}
+        # Entries past this id arrive while we aggregate; they are folded in at the end.
+        snapshot = bounds['hi']
+        size = options['chunk_size']
+        chunks = [(lo, min(lo + size, snapshot + 1)) for lo in range(bounds['lo'], snapshot + 1, size)]
+
+        if options['workers'] > 1 and len(chunks) > 1:
+            with process_pool(options['workers']) as pool:
+                best = self.merge(pool.map(daily_bests, chunks))
+        else:
+            best = self.merge(map(daily_bests, chunks))
+        self.stdout.write(f"Aggregated {len(chunks)} chunks into {len(best)} rollup rows.")
+
+        with transaction.atomic():
+            ScoreRollup.objects.all().delete()
+            ScoreRollup.objects.bulk_create(
+                (ScoreRollup(game_id=g, player_id=p, window=w, bucket=b, best_score=s) for (g, p, w, b), s in best.items()),
+                batch_size=options['batch_size'],
+            )
+            # Submissions made since the snapshot were rolled up by the views,
+            # then removed by the delete above; fold them in again.
+            ScoreRollup.objects.record_scores(
+                (game_id, player_id, score, client_timestamp or created_at)
+                for game_id, player_id, score, client_timestamp, created_at in ScoreEntry.objects.filter(id__gt=snapshot)
+                .values_list('game_id', 'player_id', 'score', 'client_timestamp', 'created_at')
+                .iterator()
+            )
+
+        game_ids = Game.objects.values_list('id', flat=True)
+        api_cache.invalidate(*(api_cache.leaderboard_scope(g) for g in game_ids))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(best)} rollup rows."))
+
+    def merge(self, results):
+        best = {}
+        for rows in results:
+            for game_id, player_id, day, score in rows:
+                for window, _ in ScoreRollup.WINDOWS:
+                    key = (game_id, player_id, window, ScoreRollup.bucket_for(window, day))
+                    if score > best.get(key, score - 1):
+                        best[key] = score
+        return best
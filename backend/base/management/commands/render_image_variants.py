@@ -0,0 +1,58 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from base import images
+from base.models import Game
+from base.workers import process_pool
+
+
+def render(source):
+    """images.render_variants(), or why it failed. Runs in a worker process."""
+    try:
+        return images.render_variants(source)
+    except (OSError, ValueError) as e:
+        return str(e)
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the resized AVIF/WebP variants of every game's cover art that lacks them "
+        "(all of them with --force), rendering images in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="1 renders in this process.")
+        parser.add_argument('--force', action='store_true', help="Re-render games whose variants look current.")
+        parser.add_argument('--prune', action='store_true', help="Delete stored variants no game refers to.")
+
+    def handle(self, *args, **options):
+        games = [
+            game for game in Game.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image', 'image_variants')
+            if options['force'] or images.needs_variants(game)
+        ]
+        sources = [game.image.name for game in games]
+        self.stdout.write(f"Rendering variants of {len(sources)} images")
+
+        if options['workers'] > 1 and len(sources) > 1:
+            with process_pool(options['workers']) as pool:
+                results = pool.map(render, sources)
+                self.save(games, results)
+        else:
+            self.save(games, map(render, sources))
+
+        if options['prune']:
+            keep = set()
+            for variants in Game.objects.values_list('image_variants', flat=True):
+                keep |= images.variant_names(variants)
+            self.stdout.write(f"Deleted {images.remove_orphans(keep)} unused variants")
+
+    def save(self, games, results):
+        for game, variants in zip(games, results):
+            if isinstance(variants, str):
+                self.stderr.write(f"  {game.image.name}: {variants}")
+            elif images.save_variants(game.pk, variants):
+                sizes = ', '.join(f"{fmt} {len(names)}" for fmt, names in variants.items() if fmt != 'source')
+                self.stdout.write(f"  {game.image.name}: {sizes}")
+            else:
+                self.stdout.write(f"  {game.image.name}: image changed meanwhile, skipped")
@@ -0,0 +1,159 @@
+"""
+Per-view performance metrics, exposed in Prometheus format at /api/metrics/.
+
+MetricsMiddleware (first in MIDDLEWARE) times a sample of requests,
+METRICS_SAMPLE_RATE of them, and records per view: latency, number of
+database queries and their total time, time spent turning objects into
+primitives in the serializers, and response size. Views are labelled by URL
+name, so each route in base/urls.py gets its own series. With a sample rate
+of 0 the middleware removes itself from the stack.
+
+Histogram counts are of sampled requests; divide by the sample rate for
+totals. Metrics live in process memory. Under several gunicorn workers set
+PROMETHEUS_MULTIPROC_DIR so every worker writes to, and /api/metrics/ reads
+from, a shared directory (see gunicorn.conf.py and entrypoint.sh).
+"""
+
+import os
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest, multiprocess
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+REQUEST_LATENCY = Histogram(
+    'api_request_duration_seconds', "Time from the first middleware to the response.",
+    ['view', 'method', 'status'], buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'api_db_queries', "Database queries per request.", ['view'], buckets=QUERY_BUCKETS,
+)
+DB_TIME = Histogram(
+    'api_db_duration_seconds', "Total database time per request.", ['view'], buckets=LATENCY_BUCKETS,
+)
+SERIALIZE_TIME = Histogram(
+    'api_serialize_duration_seconds', "Serializer to_representation time per request.", ['view'],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'api_response_size_bytes', "Response body size; streamed responses are not counted.", ['view'],
+    buckets=SIZE_BUCKETS,
+)
+
+# The sampled request being served in this context. asgiref copies the
+# context into sync_to_async threads, so async views' queries are seen too.
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'serialize_time', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver; the wrapper list outlives reconnects, so add it once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedRepresentationMixin:
+    """Adds a serializer's to_representation time to the sampled request's stats."""
+
+    def to_representation(self, instance):
+        stats = _current.get()
+        if stats is None or stats.serializing:
+            # Nested serializers and list items are inside the outer call's time.
+            return super().to_representation(instance)
+        stats.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serialize_time += time.perf_counter() - start
+            stats.serializing = False
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.sample_rate = settings.METRICS_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+
+def observe(request, response, stats, elapsed):
+    match = getattr(request, 'resolver_match', None)
+    view = (match.view_name or match.route) if match else 'unmatched'
+    REQUEST_LATENCY.labels(view, request.method, str(response.status_code)).observe(elapsed)
+    DB_QUERIES.labels(view).observe(stats.queries)
+    DB_TIME.labels(view).observe(stats.db_time)
+    SERIALIZE_TIME.labels(view).observe(stats.serialize_time)
+    if not response.streaming:
+        RESPONSE_SIZE.labels(view).observe(len(response.content))
+
+
+def exposition():
+    """The current metrics in the Prometheus text format, with their content type."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 22:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('score', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='base.game')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Score Entry',
+                'verbose_name_plural': 'Score Entries',
+                'indexes': [models.Index(fields=['game', '-score', 'id'], name='score_game_rank_idx'), models.Index(fields=['player', 'game', '-id'], name='score_player_game_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_scoreentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoreentry',
+            name='client_timestamp',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scoreentry',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='scoreentry',
+            constraint=models.UniqueConstraint(fields=('player', 'idempotency_key'), name='score_player_idempotency_key_uniq'),
+        ),
+    ]
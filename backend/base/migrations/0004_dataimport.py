@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-17 14:05
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_scoreentry_offline_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataImport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source', models.CharField(max_length=255, unique=True)),
+                ('checksum', models.CharField(max_length=64)),
+                ('rows', models.PositiveBigIntegerField(default=0)),
+                ('imported_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
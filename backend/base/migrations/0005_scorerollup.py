@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 15:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_dataimport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('window', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('all-time', 'All time')], max_length=10)),
+                ('bucket', models.DateField()),
+                ('best_score', models.IntegerField()),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='base.game')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['game', 'window', 'bucket', '-best_score', 'id'], name='rollup_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('game', 'window', 'bucket', 'player'), name='rollup_bucket_player_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_scorerollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
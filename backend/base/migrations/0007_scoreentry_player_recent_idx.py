@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_game_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scoreentry',
+            index=models.Index(fields=['player', '-id'], name='score_player_recent_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
+import datetime
 import uuid
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 
@@ -12,10 +14,33 @@ class Player(AbstractUser):
         verbose_name = "Player"
         verbose_name_plural = "Players"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        player = super().from_db(db, field_names, values)
+        # The stored username, so saving a rename can drop the cached boards showing the old one.
+        player._loaded_username = player.__dict__.get('username')
+        return player
+
+class GameQuerySet(models.QuerySet):
+    def claim_high_score(self, game_id, score, player_id):
+        """
+        Compare-and-set the record in a single UPDATE ... WHERE high_score < score.
+        The database takes the row lock for the duration of the statement, so
+        concurrent submissions can never replace a record with a lower score.
+        Returns True when this call set the new record.
+        """
+        updated = self.filter(pk=game_id, high_score__lt=score).update(
+            high_score=score,
+            high_score_player_id=player_id,
+        )
+        return updated > 0
+
 class Game(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100, unique=True)
     image = models.ImageField(upload_to='game_covers/', null=True, blank=True)
+    # Resized copies of image, kept up to date by base/images.py.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     high_score = models.IntegerField(default=0) 
     high_score_player = models.ForeignKey(
@@ -26,5 +51,127 @@ class Game(models.Model):
         related_name='high_score_games'
     )
 
+    objects = GameQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
+class ScoreEntry(models.Model):
+    # Sequential ids keep inserts append-only and give keyset pagination a
+    # cheap, unique tiebreaker for equal scores.
+    id = models.BigAutoField(primary_key=True)
+    player = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='scores'
+    )
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='scores')
+    score = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set by offline clients that sync later: when the game was actually played,
+    # and a client-generated key so a retried upload is not counted twice.
+    client_timestamp = models.DateTimeField(null=True, blank=True)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Score Entry"
+        verbose_name_plural = "Score Entries"
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'idempotency_key'], name='score_player_idempotency_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['game', '-score', 'id'], name='score_game_rank_idx'),
+            models.Index(fields=['player', 'game', '-id'], name='score_player_game_idx'),
+            models.Index(fields=['player', '-id'], name='score_player_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} - {self.game_id}: {self.score}"
+
+class ScoreRollupQuerySet(models.QuerySet):
+    def record_scores(self, plays):
+        """
+        Folds (game_id, player_id, score, played_at) plays into the rollups.
+        Missing rows are inserted first (ON CONFLICT DO NOTHING), then raised
+        with a compare-and-set UPDATE ... WHERE best_score < score, so
+        concurrent submissions never lower a best. Buckets that end up with
+        the same best share one UPDATE.
+        """
+        best = {}
+        for game_id, player_id, score, played_at in plays:
+            for window, bucket in ScoreRollup.buckets(played_at):
+                key = (game_id, player_id, window, bucket)
+                best[key] = max(best.get(key, score), score)
+        if not best:
+            return
+
+        self.bulk_create(
+            [ScoreRollup(game_id=g, player_id=p, window=w, bucket=b, best_score=s) for (g, p, w, b), s in best.items()],
+            ignore_conflicts=True,
+        )
+        by_score = {}
+        for (game_id, player_id, window, bucket), score in best.items():
+            by_score.setdefault((game_id, player_id, score), []).append(models.Q(window=window, bucket=bucket))
+        for (game_id, player_id, score), buckets in by_score.items():
+            condition = buckets[0]
+            for q in buckets[1:]:
+                condition |= q
+            self.filter(condition, game_id=game_id, player_id=player_id, best_score__lt=score).update(best_score=score)
+
+class ScoreRollup(models.Model):
+    """
+    Each player's best score per game in each daily, weekly and all-time
+    bucket, kept up to date on submission, so a windowed leaderboard is an
+    index range scan instead of a GROUP BY over the history.
+    """
+    DAILY = 'daily'
+    WEEKLY = 'weekly'
+    ALL_TIME = 'all-time'
+    WINDOWS = [(DAILY, 'Daily'), (WEEKLY, 'Weekly'), (ALL_TIME, 'All time')]
+    # The single all-time bucket.
+    EPOCH = datetime.date(1970, 1, 1)
+
+    id = models.BigAutoField(primary_key=True)
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='rollups')
+    player = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='rollups')
+    window = models.CharField(max_length=10, choices=WINDOWS)
+    # First day of the window (a Monday for weekly) in TIME_ZONE.
+    bucket = models.DateField()
+    best_score = models.IntegerField()
+
+    objects = ScoreRollupQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'window', 'bucket', 'player'], name='rollup_bucket_player_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['game', 'window', 'bucket', '-best_score', 'id'], name='rollup_rank_idx'),
+        ]
+
+    @classmethod
+    def bucket_for(cls, window, day):
+        if window == cls.DAILY:
+            return day
+        if window == cls.WEEKLY:
+            return day - datetime.timedelta(days=day.weekday())
+        return cls.EPOCH
+
+    @classmethod
+    def buckets(cls, played_at):
+        day = timezone.localdate(played_at)
+        return [(window, cls.bucket_for(window, day)) for window, _ in cls.WINDOWS]
+
+    def __str__(self):
+        return f"{self.game_id} {self.window} {self.bucket}: {self.player_id} {self.best_score}"
+
+class DataImport(models.Model):
+    """Checksum of the last file applied by import_scores, so an unchanged file is skipped."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    source = models.CharField(max_length=255, unique=True)
+    checksum = models.CharField(max_length=64)
+    rows = models.PositiveBigIntegerField(default=0)
+    imported_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.source} ({self.checksum[:12]})"
@@ -0,0 +1,79 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+class KeysetPagination:
+    """
+    Seek-based pagination over an index instead of OFFSET, so page N costs the
+    same as page 1. The cursor is an opaque token holding the sort key of the
+    last row returned. `ordering` is a (field, descending) pair followed by the
+    unique `id` tiebreaker, e.g. ('score', True) pages by -score, id.
+    """
+    default_limit = 10
+    max_limit = 100
+
+    def __init__(self, ordering=None):
+        self.ordering = ordering
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.GET.get('limit', self.default_limit))
+        except (TypeError, ValueError):
+            raise ValidationError({"limit": "Must be an integer."})
+        return max(1, min(limit, self.max_limit))
+
+    def encode_cursor(self, row):
+        if self.ordering:
+            field, _ = self.ordering
+            raw = f"{getattr(row, field)}:{row.id}"
+        else:
+            raw = str(row.id)
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, token):
+        try:
+            parts = [int(p) for p in base64.urlsafe_b64decode(token.encode()).decode().split(':')]
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+        if len(parts) != (2 if self.ordering else 1):
+            raise ValidationError({"cursor": "Invalid cursor."})
+        return parts
+
+    def page_queryset(self, queryset, request):
+        """Applies ordering, the cursor filter and the limit, without running the query."""
+        self.limit = self.get_limit(request)
+        token = request.GET.get('cursor')
+
+        if self.ordering:
+            field, descending = self.ordering
+            queryset = queryset.order_by(f"-{field}" if descending else field, 'id')
+            if token:
+                value, last_id = self.decode_cursor(token)
+                past = f"{field}__lt" if descending else f"{field}__gt"
+                queryset = queryset.filter(Q(**{past: value}) | Q(**{field: value, 'id__gt': last_id}))
+        else:
+            queryset = queryset.order_by('-id')
+            if token:
+                (last_id,) = self.decode_cursor(token)
+                queryset = queryset.filter(id__lt=last_id)
+
+        # Fetch one extra row to learn whether another page exists without a COUNT.
+        return queryset[:self.limit + 1]
+
+    def finish_page(self, rows):
+        self.has_next = len(rows) > self.limit
+        rows = rows[:self.limit]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def paginate_queryset(self, queryset, request):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        return self.finish_page([row async for row in self.page_queryset(queryset, request)])
+
+    def get_paginated_data(self, data):
+        return {"next": self.next_cursor, "results": data}
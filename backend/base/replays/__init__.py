@@ -0,0 +1,75 @@
+"""
+Server-side score verification. Clients of replayable games upload, with
+each score, a compact log of the game's seed and the player's inputs (see
+log.py). The game's simulator replays it headlessly and deterministically,
+and the score is accepted only if the replay reaches exactly that score.
+
+REPLAY_VERIFICATION decides what happens to scores without a log: 'optional'
+accepts them, 'required' rejects them; 'off' skips verification altogether.
+A batch of logs is verified across a process pool of REPLAY_VERIFY_WORKERS.
+"""
+
+from django.conf import settings
+
+from ..workers import process_pool
+from . import balloon, pencil, snake
+from .log import BALLOON, PENCIL, SNAKE, ReplayError, decode
+
+GAMES = {
+    'Snaky-Snake': SNAKE,
+    'Beautiful-Balloon': BALLOON,
+    'Pencil-Game': PENCIL,
+}
+SIMULATORS = {
+    SNAKE: snake.simulate,
+    BALLOON: balloon.simulate,
+    PENCIL: pencil.simulate,
+}
+
+_pool = None
+
+
+def replay_score(replay):
+    """The score a decoded replay reaches."""
+    simulate = SIMULATORS.get(replay.game)
+    if simulate is None:
+        raise ReplayError(f"unknown game {replay.game}")
+    return simulate(replay)
+
+
+def check_score(game_name, score, log, policy=None):
+    """Returns why the score should be rejected, or None to accept it."""
+    policy = policy or settings.REPLAY_VERIFICATION
+    game = GAMES.get(game_name)
+    if game is None or policy == 'off':
+        return None
+    if not log:
+        return "A replay is required for this game" if policy == 'required' else None
+    try:
+        replay = decode(log)
+        if replay.game != game:
+            return "Replay is for a different game"
+        replayed = replay_score(replay)
+    except ReplayError as e:
+        return f"Invalid replay: {e}"
+    if replayed != score:
+        return f"Score does not match its replay ({replayed})"
+    return None
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = process_pool(settings.REPLAY_VERIFY_WORKERS)
+    return _pool
+
+
+def check_scores(submissions):
+    """check_score() of each (game_name, score, log), in order."""
+    logged = sum(1 for _, _, log in submissions if log)
+    if logged < 2 or settings.REPLAY_VERIFY_WORKERS < 2:
+        return [check_score(*s) for s in submissions]
+    # Workers load settings from scratch, so pass on this process's policy.
+    names, scores, logs = zip(*submissions)
+    policies = [settings.REPLAY_VERIFICATION] * len(submissions)
+    return list(get_pool().map(check_score, names, scores, logs, policies, chunksize=64))
@@ -0,0 +1,94 @@
+"""
+Beautiful Balloon rules, as played by frontend/src/games/Balloon.tsx and
+GUI/balloon/balloon.py.
+
+A tick is one frame of play, in which every balloon rises by its speed. An
+event (tick, slot) pops balloon `slot` (0-2, left to right) after `tick`
+frames. Where a balloon drifts sideways is cosmetic and not simulated.
+"""
+
+from .log import Random, ReplayError
+
+HEIGHT = 700
+RADIUS = 45
+ESCAPE_Y = -50
+LIVES = 3
+SLOTS = 3
+
+
+def new_question(rng, score):
+    """Returns the answer and the three balloons as [y, speed, number] per slot."""
+    ops = ['+']
+    range_max = 10 + score // 2
+    if score > 5:
+        ops.append('-')
+    if score > 15:
+        ops.append('*')
+    if score > 25:
+        ops.append('/')
+    op = ops[rng.below(len(ops))]
+    num1 = rng.below(range_max) + 1
+    num2 = rng.below(range_max) + 1
+    if op == '+':
+        answer = num1 + num2
+    elif op == '-':
+        answer = abs(num1 - num2)
+    elif op == '*':
+        answer = (rng.below(6 + score // 5) + 1) * (rng.below(6 + score // 5) + 1)
+    else:
+        rng.below(7)
+        answer = rng.below(9) + 2
+
+    answers = [answer]
+    while len(answers) < SLOTS:
+        fake = answer + rng.below(11) - 5
+        if fake != answer and fake >= 0 and fake not in answers:
+            answers.append(fake)
+    for i in range(SLOTS - 1, 0, -1):
+        j = rng.below(i + 1)
+        answers[i], answers[j] = answers[j], answers[i]
+
+    speed_mult = 1.0 + score * 0.05
+    balloons = []
+    for number in answers:
+        y = HEIGHT + 50 + rng.below(100)
+        balloons.append([y, (rng.random() + 1.0) * speed_mult, number])
+    return answer, balloons
+
+
+def simulate(replay):
+    rng = Random(replay.seed)
+    score, lives, frame = 0, LIVES, 0
+    answer, balloons = new_question(rng, score)
+
+    for tick, slot in replay.events:
+        if slot >= SLOTS:
+            raise ReplayError(f"unknown balloon slot {slot}")
+        while frame < tick:
+            frame += 1
+            for balloon in balloons:
+                if balloon is not None:
+                    balloon[0] -= balloon[1]
+            for i, balloon in enumerate(balloons):
+                if balloon is None or balloon[0] >= ESCAPE_Y:
+                    continue
+                if balloon[2] != answer:
+                    balloons[i] = None
+                    continue
+                lives -= 1
+                if lives <= 0:
+                    return score
+                answer, balloons = new_question(rng, score)
+                break
+
+        balloon = balloons[slot]
+        if balloon is None or balloon[0] - RADIUS >= HEIGHT:
+            raise ReplayError(f"popped balloon {slot} at frame {tick} while it was off screen")
+        if balloon[2] == answer:
+            score += 1
+        else:
+            lives -= 1
+            if lives <= 0:
+                return score
+        answer, balloons = new_question(rng, score)
+    return score
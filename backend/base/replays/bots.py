@@ -0,0 +1,93 @@
+"""
+Simple players that produce genuine replays, for the tests and the
+benchmark_replays command. Each returns (base64 log, score) for a seed.
+"""
+
+from . import balloon, pencil, snake
+from .log import BALLOON, PENCIL, SNAKE, WEB, Random, encode
+
+
+def play_snake(seed, level=1, variant=WEB):
+    """
+    Heads for the food by the shortest safe step until it boxes itself in. If
+    that only goes round in circles, it gives up and runs into a wall.
+    """
+    board = snake.Board(Random(seed), variant, level)
+    direction = snake.RIGHT
+    events = []
+    tick = score = fed = 0
+    while True:
+        x, y = board.body[0]
+        food = board.food
+        options = []
+        for turn, (dx, dy) in enumerate(snake.DIRECTIONS if tick - fed < 2 * snake.GRID ** 2 else ()):
+            head = (x + dx, y + dy)
+            if turn ^ 1 != direction and not board.blocked(head):
+                options.append((abs(head[0] - food[0]) + abs(head[1] - food[1]), turn))
+        if options:
+            turn = min(options)[1]
+            if turn != direction:
+                events.append((tick, turn))
+                direction = turn
+        dx, dy = snake.DIRECTIONS[direction]
+        head = (x + dx, y + dy)
+        if board.blocked(head):
+            break
+        if board.move(head):
+            score += snake.POINTS_PER_FOOD
+            fed = tick
+            if board.food is None:
+                break
+        tick += 1
+    return encode(SNAKE, variant, level, seed, events), score
+
+
+def play_balloon(seed, variant=WEB, max_score=40):
+    """Pops the right balloon once it is well on screen, but misreads every seventh question."""
+    rng = Random(seed)
+    score, lives, frame, asked = 0, balloon.LIVES, 0, 0
+    answer, balloons = balloon.new_question(rng, score)
+    events = []
+    while lives > 0 and score < max_score:
+        frame += 1
+        for b in balloons:
+            if b is not None:
+                b[0] -= b[1]
+        for i, b in enumerate(balloons):
+            if b is None or b[0] >= balloon.ESCAPE_Y:
+                continue
+            if b[2] != answer:
+                balloons[i] = None
+                continue
+            lives -= 1
+            answer, balloons = balloon.new_question(rng, score)
+            break
+        if lives <= 0:
+            break
+        target = next(i for i, b in enumerate(balloons) if b is not None and b[2] == answer)
+        if balloons[target][0] < balloon.HEIGHT / 2:
+            asked += 1
+            if asked % 7 == 0:
+                target = next((i for i, b in enumerate(balloons) if b is not None and b[2] != answer), target)
+            events.append((frame, target))
+            if balloons[target][2] == answer:
+                score += 1
+            else:
+                lives -= 1
+            answer, balloons = balloon.new_question(rng, score)
+    return encode(BALLOON, variant, 0, seed, events), score
+
+
+def play_pencil(seed, variant=WEB):
+    """Paints every tile in order, trying a wrong number first on every fifth."""
+    answers, palette = pencil.new_board(Random(seed), pencil.PATTERNS[variant])
+    wrong = max(palette)
+    events = []
+    score = 0
+    for tile, answer in enumerate(answers):
+        if tile % 5 == 0 and answer != wrong:
+            events.append((0, tile | wrong << 8))
+            score = max(0, score - pencil.WRONG)
+        events.append((0, tile | answer << 8))
+        score += pencil.CORRECT
+    return encode(PENCIL, variant, 0, seed, events), score
@@ -0,0 +1,138 @@
+"""
+The binary input log a client uploads with a score, and the seeded random
+number generator every client and simulator shares.
+
+Layout (integers little-endian, varints unsigned LEB128):
+
+    u8      format version, 1
+    u8      game: SNAKE, BALLOON or PENCIL
+    u8      variant: which client's rules, WEB, GUI or GUI_FREE_CELLS
+    u8      level: Snake difficulty (0 Easy, 1 Medium, 2 Hard), otherwise 0
+    u32     seed of the game's Random
+    varint  number of events
+    then per event:
+    varint  ticks since the previous event
+    varint  value
+
+What a tick and a value mean is up to each game's simulator.
+"""
+
+import base64
+import binascii
+import struct
+
+VERSION = 1
+SNAKE, BALLOON, PENCIL = 1, 2, 3
+WEB, GUI = 0, 1
+# GUI/snake since it places food from its free-cell index (see snake.py).
+GUI_FREE_CELLS = 2
+VARIANTS = (WEB, GUI, GUI_FREE_CELLS)
+
+MAX_BYTES = 64 * 1024
+MAX_EVENTS = 20_000
+MASK = 0xFFFFFFFF
+
+HEADER = struct.Struct('<BBBBI')
+
+
+class ReplayError(ValueError):
+    pass
+
+
+class Random:
+    """
+    mulberry32, bit for bit as the clients run it: frontend/src/services/replay.ts
+    and GUI/common/replay.py. Floats are a uint32 over 2**32, so they are exact
+    and identical in JavaScript and Python.
+    """
+
+    def __init__(self, seed):
+        self.state = seed & MASK
+
+    def next_uint32(self):
+        self.state = state = (self.state + 0x6D2B79F5) & MASK
+        t = ((state ^ (state >> 15)) * (state | 1)) & MASK
+        t ^= (t + ((t ^ (t >> 7)) * (t | 61))) & MASK
+        return t ^ (t >> 14)
+
+    def random(self):
+        """A float in [0, 1), like Math.random()."""
+        return self.next_uint32() / 4294967296
+
+    def below(self, n):
+        """An int in [0, n), like Math.floor(Math.random() * n)."""
+        return int(self.next_uint32() / 4294967296 * n)
+
+
+class Replay:
+    def __init__(self, game, variant, level, seed, events):
+        self.game = game
+        self.variant = variant
+        self.level = level
+        self.seed = seed
+        # (tick, value) pairs with absolute, non-decreasing ticks.
+        self.events = events
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("truncated log")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+        if shift > 35:
+            raise ReplayError("varint too long")
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode(text):
+    """Parses a base64 log as uploaded. Raises ReplayError if it is malformed."""
+    if len(text) > MAX_BYTES * 4 // 3 + 4:
+        raise ReplayError("log too large")
+    try:
+        data = base64.b64decode(text, validate=True)
+    except (binascii.Error, ValueError):
+        raise ReplayError("log is not base64")
+    if len(data) < HEADER.size:
+        raise ReplayError("truncated log")
+    version, game, variant, level, seed = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ReplayError(f"unsupported log version {version}")
+    if variant not in VARIANTS:
+        raise ReplayError(f"unknown variant {variant}")
+    count, pos = read_varint(data, HEADER.size)
+    if count > MAX_EVENTS:
+        raise ReplayError("too many events")
+    events = []
+    tick = 0
+    for _ in range(count):
+        delta, pos = read_varint(data, pos)
+        value, pos = read_varint(data, pos)
+        tick += delta
+        events.append((tick, value))
+    if pos != len(data):
+        raise ReplayError("trailing bytes after the last event")
+    return Replay(game, variant, level, seed, events)
+
+
+def encode(game, variant, level, seed, events):
+    """The base64 log for (tick, value) events; used by tests and benchmarks."""
+    out = bytearray(HEADER.pack(VERSION, game, variant, level, seed))
+    write_varint(out, len(events))
+    previous = 0
+    for tick, value in events:
+        write_varint(out, tick - previous)
+        write_varint(out, value)
+        previous = tick
+    return base64.b64encode(bytes(out)).decode('ascii')
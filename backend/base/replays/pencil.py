@@ -0,0 +1,68 @@
+"""
+Pencil (pixel math) rules, as played by frontend/src/games/Pencil.tsx and
+GUI/pencil/pencil.py. The variant picks the client's set of pictures.
+
+Ticks carry no meaning. An event's value is tile | answer << 8: the player
+clicked tile `tile` (row-major) with palette number `answer` selected.
+"""
+
+from .log import GUI, WEB, Random, ReplayError
+from .pencil_patterns import COLORS, GUI_PATTERNS, WEB_PATTERNS
+
+PATTERNS = {WEB: WEB_PATTERNS, GUI: GUI_PATTERNS}
+POOL_SIZE = 50
+CORRECT, WRONG = 10, 5
+
+
+def new_board(rng, patterns):
+    """Returns each tile's answer and the set of numbers on the palette."""
+    pattern = patterns[rng.below(len(patterns))]
+    cells = [char if char in COLORS else '.' for row in pattern for char in row]
+
+    pool = list(range(1, POOL_SIZE + 1))
+    for i in range(POOL_SIZE - 1, 0, -1):
+        j = rng.below(i + 1)
+        pool[i], pool[j] = pool[j], pool[i]
+    numbers = iter(pool)
+    choices = {}
+    for char in dict.fromkeys(cells):
+        choices[char] = [next(numbers)]
+        if rng.random() > 0.6:
+            choices[char].append(next(numbers))
+
+    answers = []
+    for char in cells:
+        options = choices[char]
+        answer = options[rng.below(len(options))]
+        # The tile's sum or difference is cosmetic, but it takes its draws.
+        if rng.random() > 0.5:
+            if answer > 1:
+                rng.below(answer - 1)
+        else:
+            rng.below(10)
+        answers.append(answer)
+    return answers, {n for options in choices.values() for n in options}
+
+
+def simulate(replay):
+    if replay.variant not in PATTERNS:
+        raise ReplayError(f"unknown variant {replay.variant}")
+    answers, palette = new_board(Random(replay.seed), PATTERNS[replay.variant])
+    painted = [False] * len(answers)
+    remaining = len(answers)
+    score = 0
+    for _, value in replay.events:
+        tile, selected = value & 0xFF, value >> 8
+        if tile >= len(answers) or selected not in palette:
+            raise ReplayError(f"no tile {tile} or palette number {selected} on this board")
+        if painted[tile]:
+            continue
+        if answers[tile] == selected:
+            painted[tile] = True
+            score += CORRECT
+            remaining -= 1
+            if not remaining:
+                break
+        else:
+            score = max(0, score - WRONG)
+    return score
@@ -0,0 +1,419 @@
+"""
+Pencil pictures, in the order each client picks them from. Copied from
+frontend/src/games/Pencil.tsx (WEB, 12x12) and GUI/pencil/pencil.py (GUI,
+15x15); keep them in step with the clients.
+"""
+
+# Characters with a paint colour; anything else in a picture is blank ('.').
+COLORS = frozenset('.RGBYOPKSNLA')
+
+WEB_PATTERNS = (
+    # Heart
+    (
+        "............",
+        "..RR....RR..",
+        ".RRRR..RRRR.",
+        "RRRRRRRRRRRR",
+        "RRRRRRRRRRRR",
+        ".RRRRRRRRRR.",
+        "..RRRRRRRR..",
+        "...RRRRRR...",
+        "....RRRR....",
+        ".....RR.....",
+        "............",
+        "............",
+    ),
+    # Sailboat
+    (
+        "......K.....",
+        ".....RK.....",
+        "....RRK.....",
+        "...RRRK..Y..",
+        "..RRRRK.....",
+        "KKKKKKKKKKKK",
+        ".NNNNNNNNNN.",
+        "..SSSSSSSS..",
+        "..SSSSSSSS..",
+        "..SSSSSSSS..",
+        "..SSSSSSSS..",
+        "............",
+    ),
+    # Space Invader
+    (
+        "............",
+        "...G.....G..",
+        "....G...G...",
+        "...GGGGGGG..",
+        "..GG.GGG.GG.",
+        ".GGGGGGGGGGG",
+        ".G.GGGGGGG.G",
+        ".G.G.....G.G",
+        "....GG.GG...",
+        "............",
+        "............",
+        "............",
+    ),
+    # Rubber Duck
+    (
+        "............",
+        ".....YY.....",
+        "...YYYYY....",
+        "..YYKYYO....",
+        "..YYYYOO....",
+        "...YYYYY....",
+        ".YYYYYYYY...",
+        "YYYYYYYYYY..",
+        "YYYYYYYYYY..",
+        ".SSSSSSSS...",
+        "..SSSSSSSS..",
+        "............",
+    ),
+    # Mushroom
+    (
+        "....RRRR....",
+        "..RRRRRRRR..",
+        ".RR..RR..RR.",
+        ".RRRRRRRRRR.",
+        "..RRRRRRRR..",
+        "....KKKK....",
+        "...K....K...",
+        "...K....K...",
+        "...KKKKKK...",
+        "............",
+        "............",
+        "............",
+    ),
+    # Sword
+    (
+        "..........A.",
+        ".........A..",
+        "........A...",
+        ".......A....",
+        "......A.....",
+        ".....A......",
+        "....AK......",
+        "...B.K......",
+        "..B..K......",
+        ".B...K......",
+        "B....K......",
+        "............",
+    ),
+    # Creeper Face
+    (
+        "LLLLLLLLLLLL",
+        "LLLLLLLLLLLL",
+        "LLLKKLLKKLLL",
+        "LLLKKLLKKLLL",
+        "LLLLLLLLLLLL",
+        "LLLLLKKLLLLL",
+        "LLLLKKKKLLLL",
+        "LLLLKKKKLLLL",
+        "LLLKKLLKKLLL",
+        "LLLLLLLLLLLL",
+        "LLLLLLLLLLLL",
+        "LLLLLLLLLLLL",
+    ),
+    # Butterfly
+    (
+        "S..........S",
+        "SP...K...PPS",
+        "SPP..K..PPPS",
+        "SSPP.K.PPPSS",
+        "SSPPPKPPPSSS",
+        "SSSSPKPSSSSS",
+        "SSPPPKPPPSSS",
+        "SSPP.K.PPPSS",
+        "SPP..K..PPPS",
+        "SP...K...PPS",
+        "S..........S",
+        "S..........S",
+    ),
+    # Watermelon
+    (
+        "............",
+        ".....R......",
+        "...RRKRR....",
+        "..RRKRKRR...",
+        ".RRRRRRRRR..",
+        ".RRKRKRRKR..",
+        ".RRRRRRRRR..",
+        "..LLLLLLL...",
+        "...GGGGG....",
+        "............",
+        "............",
+        "............",
+    ),
+    # Sunny House
+    (
+        "SSSSSSSSSYYY",
+        "SSSSSSSSSYYY",
+        "SSSSRSSSSSSS",
+        "SSSRRRSSSSSS",
+        "SSRRRRRSSSSS",
+        "SRRRRRRRSSSS",
+        "SRRRRRRRSSSS",
+        "SOOOOOOOOSSS",
+        "SOBBBOBBOSSS",
+        "SOBBBOBBOSSS",
+        "SOOOONOOOSSS",
+        "GGGGNGGGGGGG",
+    ),
+    # Pizza Slice
+    (
+        "............",
+        ".....NN.....",
+        "....NYYN....",
+        "...NYRYYN...",
+        "..NYYRYYYN..",
+        ".NYYYYRYYYN.",
+        "NYYRYYYYYRYN",
+        ".NNNNNNNNNN.",
+        "............",
+        "............",
+        "............",
+        "............",
+    ),
+    # Smiley Face
+    (
+        "....YYYY....",
+        "..YYYYYYYY..",
+        ".YYYYYYYYYY.",
+        ".YYKYYYYKYY.",
+        ".YYKYYYYKYY.",
+        "YYYYYYYYYYYY",
+        "YYYYKYYKYYYY",
+        ".YYYKYYKYYY.",
+        ".YYYYKKYYYY.",
+        "..YYYYYYYY..",
+        "....YYYY....",
+        "............",
+    ),
+    # Tree
+    (
+        ".....G......",
+        "....GGG.....",
+        "...GGGGG....",
+        "..GGGGGGG...",
+        ".GGGGGGGGG..",
+        "GGGGGGGGGGGG",
+        "....NNN.....",
+        "....NNN.....",
+        "....NNN.....",
+        "GGGGNNNGGGGG",
+        "GGGGGGGGGGGG",
+        "GGGGGGGGGGGG",
+    ),
+    # Clown Fish
+    (
+        "............",
+        "............",
+        "......OO....",
+        "...OOOWOO...",
+        "..OOWOOOWO..",
+        ".KOWOOOWOOK.",
+        ".KOWOOOWOOK.",
+        "..OOWOOOWO..",
+        "...OOOWOO...",
+        "......OO....",
+        "............",
+        "............",
+    ),
+    # Crewmate
+    (
+        "............",
+        "...RRRR.....",
+        "..RRRRRR....",
+        ".RRSSSRR....",
+        ".RRSSSRR....",
+        ".RRRRRRR....",
+        ".RRRRRRR....",
+        ".RRRRRRR.R..",
+        ".RRRRRRRRR..",
+        ".RR...RR....",
+        ".RR...RR....",
+        "............",
+    ),
+)
+
+GUI_PATTERNS = (
+    # Heart
+    (
+        "...............",
+        "...RR.....RR...",
+        ".RRRRR...RRRRR.",
+        "RRRRRRR.RRRRRRR",
+        "RRRRRRRRRRRRRRR",
+        "RRRRRRRRRRRRRRR",
+        ".RRRRRRRRRRRRR.",
+        "..RRRRRRRRRRR..",
+        "...RRRRRRRRR...",
+        "....RRRRRRR....",
+        ".....RRRRR.....",
+        "......RRR......",
+        ".......R.......",
+        "...............",
+        "...............",
+    ),
+    # Sailboat
+    (
+        ".......K.......",
+        ".......K.......",
+        "......RK.......",
+        ".....RRK.......",
+        "....RRRK.......",
+        "...RRRRK...Y...",
+        "..RRRRRK.......",
+        ".RRRRRRK.......",
+        "KKKKKKKKKKKKKKK",
+        ".NNNNNNNNNNNNN.",
+        "..NNNNNNNNNNN..",
+        "SSSSSSSSSSSSSSS",
+        "SSSSSSSSSSSSSSS",
+        "SSSSSSSSSSSSSSS",
+        "SSSSSSSSSSSSSSS",
+    ),
+    # Space Invader
+    (
+        "...............",
+        ".....G.....G...",
+        "......G...G....",
+        ".....GGGGGGG...",
+        "....GG.GGG.GG..",
+        "...GGGGGGGGGGG.",
+        "...G.GGGGGGG.G.",
+        "...G.G.....G.G.",
+        "......GG.GG....",
+        "...............",
+        "...............",
+        "...P.......P...",
+        "....P.....P....",
+        "...PPPPPPPPP...",
+        "..P.P.....P.P..",
+    ),
+    # Rubber Duck
+    (
+        "...............",
+        "......YYY......",
+        "....YYYYYY.....",
+        "...YYKYYOYY....",
+        "...YYYYOOO.....",
+        "....YYYYYY.....",
+        "..YYYYYYYY.....",
+        ".YYYYYYYYYYY...",
+        "YYYYYYYYYYYYY..",
+        "YYYYYYYYYYYYY..",
+        ".YYYYYYYYYYY...",
+        "..SSSSSSSSSS...",
+        ".SSSSSSSSSSSS..",
+        "SSSSSSSSSSSSSS.",
+        "SSSSSSSSSSSSSSS",
+    ),
+    # Mushroom
+    (
+        ".....KKKKK.....",
+        "...KKRRRRRKK...",
+        "..KRRRRRRRRRK..",
+        ".KRRRRRRRRRRRK.",
+        ".KRR..RRR..RRK.",
+        ".KRR..RRR..RRK.",
+        ".KRRRRRRRRRRRK.",
+        "..KRRRRRRRRRK..",
+        "...KKKKKKKKK...",
+        "....K.....K....",
+        "....K..K..K....",
+        "....K..K..K....",
+        "....K.....K....",
+        "....KKKKKKK....",
+        "...............",
+    ),
+    # Sword
+    (
+        "..............A",
+        ".............A.",
+        "............A..",
+        "...........A...",
+        "..........A....",
+        ".........A.....",
+        "........A......",
+        ".......A.......",
+        "......A........",
+        ".....A.........",
+        "....AK.........",
+        "...B.K.........",
+        "..B..K.........",
+        ".B...K.........",
+        "B....K.........",
+    ),
+    # Creeper Face
+    (
+        "LLLLLLLLLLLLLLL",
+        "LLLLLLLLLLLLLLL",
+        "LLLLLLLLLLLLLLL",
+        "LLLLKKKLLKKKLLL",
+        "LLLLKKKLLKKKLLL",
+        "LLLLKKKLLKKKLLL",
+        "LLLLLLLLLLLLLLL",
+        "LLLLLLKKKLLLLLL",
+        "LLLLLLKKKLLLLLL",
+        "LLLLKKKKKKKLLLL",
+        "LLLLKKKKKKKLLLL",
+        "LLLLKKKLLKKKLLL",
+        "LLLLKKKLLKKKLLL",
+        "LLLLLLLLLLLLLLL",
+        "LLLLLLLLLLLLLLL",
+    ),
+    # Butterfly
+    (
+        "S.............S",
+        "SP.....K.....PS",
+        "SPP....K....PPS",
+        "SPPP...K...PPPS",
+        "SSPPPP.K.PPPPSS",
+        "SSSPPPPKPPPPSSS",
+        "SSSSPPPPPPPSSSS",
+        "SSSSSPPKPPSSSSS",
+        "SSSSPPPPPPPSSSS",
+        "SSSPPPPKPPPPSSS",
+        "SSPPPP.K.PPPPSS",
+        "SPPP...K...PPPS",
+        "SPP....K....PPS",
+        "SP.....K.....PS",
+        "S.............S",
+    ),
+    # Watermelon
+    (
+        "...............",
+        "...............",
+        "......RRR......",
+        "....RRKRKRR....",
+        "...RRRKRKRRR...",
+        "..RRRRRRRRRRR..",
+        "..RRRRRRRRRRR..",
+        ".RRRKRKRRRKRRR.",
+        ".RRRRRRRRRRRRR.",
+        ".LLLLLLLLLLLLL.",
+        "..LLLLLLLLLLL..",
+        "...GGGGGGGGG...",
+        "...............",
+        "...............",
+        "...............",
+    ),
+    # Sunny House
+    (
+        "SSSSSSSSSSSSYYY",
+        "SSSSSSSSSSSSYYY",
+        "SSSSSSRSSSSSSSS",
+        "SSSSSSRRRSSSSSS",
+        "SSSSSRRRRRSSSSS",
+        "SSSSRRRRRRRSSSS",
+        "SSSRRRRRRRRRSSS",
+        "SSSRRRRRRRRRSSS",
+        "SSSOOOOOOOOOSSS",
+        "SSSOBBBOBBBOSSS",
+        "SSSOBBBOBBBOSSS",
+        "SSSOOOOOOOOOSSS",
+        "SSSOOOONNOOOSSS",
+        "GGGGGGGNNGGGGGG",
+        "GGGGGGGNNGGGGGG",
+    ),
+)
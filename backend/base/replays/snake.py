@@ -0,0 +1,140 @@
+"""
+Snake rules, as played by frontend/src/games/SnakeGame.tsx and GUI/snake/core.py.
+
+A tick is one move of the snake. An event (tick, direction) is a key press
+after `tick` moves: it turns the snake on its next move unless it points
+straight back. Directions are 0 up, 1 down, 2 left, 3 right.
+
+Obstacles and food go on random free cells. WEB and GUI logs draw x then y
+until the cell is free; GUI_FREE_CELLS logs draw one index into the list of
+free cells that FreeCells keeps, in the same order the client keeps it.
+"""
+
+from collections import deque
+
+from .log import GUI, GUI_FREE_CELLS, WEB, Random, ReplayError
+
+GRID = 30
+POINTS_PER_FOOD = 10
+OBSTACLES = (0, 8, 15)
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+RIGHT = 3
+STARTS = {
+    WEB: ((10, 10), (9, 10), (8, 10)),
+    GUI: ((15, 15), (14, 15), (13, 15)),
+    GUI_FREE_CELLS: ((15, 15), (14, 15), (13, 15)),
+}
+
+
+def free_cell(rng, snake, obstacles):
+    """Rejection-samples a cell, drawing x then y, as the clients do."""
+    if len(snake) + len(obstacles) >= GRID * GRID:
+        return None
+    while True:
+        cell = (rng.below(GRID), rng.below(GRID))
+        if cell not in snake and cell not in obstacles:
+            return cell
+
+
+class FreeCells:
+    """
+    The cells neither the snake nor an obstacle covers, row by row to start
+    with. Removing a cell moves the last one into its slot, so removing,
+    adding and drawing a cell are O(1). Which cell a draw picks depends on
+    the order of every earlier add and remove.
+    """
+
+    def __init__(self, grid):
+        self.cells = [(x, y) for y in range(grid) for x in range(grid)]
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+
+    def remove(self, cell):
+        i = self.index.pop(cell)
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.index[last] = i
+
+    def add(self, cell):
+        self.index[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def sample(self, rng):
+        return self.cells[rng.below(len(self.cells))] if self.cells else None
+
+
+class Board:
+    """A game's snake, obstacles and food, set up from its seed as the client sets them up."""
+
+    def __init__(self, rng, variant, level):
+        self.rng = rng
+        self.body = deque(STARTS[variant])
+        self.occupied = set(self.body)
+        self.obstacles = set()
+        self.free = None
+        if variant == GUI_FREE_CELLS:
+            self.free = FreeCells(GRID)
+            for cell in self.body:
+                self.free.remove(cell)
+        for _ in range(OBSTACLES[level]):
+            cell = self.place()
+            self.obstacles.add(cell)
+            if self.free:
+                self.free.remove(cell)
+        self.food = self.place()
+
+    def place(self):
+        if self.free:
+            return self.free.sample(self.rng)
+        return free_cell(self.rng, self.occupied, self.obstacles)
+
+    def blocked(self, cell):
+        x, y = cell
+        return not (0 <= x < GRID and 0 <= y < GRID) or cell in self.occupied or cell in self.obstacles
+
+    def move(self, head):
+        """Moves the head onto an unblocked cell; returns whether it ate."""
+        self.body.appendleft(head)
+        self.occupied.add(head)
+        if self.free:
+            self.free.remove(head)
+        if head == self.food:
+            self.food = self.place()
+            return True
+        tail = self.body.pop()
+        self.occupied.discard(tail)
+        if self.free:
+            self.free.add(tail)
+        return False
+
+
+def simulate(replay):
+    if replay.level >= len(OBSTACLES):
+        raise ReplayError(f"unknown difficulty {replay.level}")
+    board = Board(Random(replay.seed), replay.variant, replay.level)
+
+    direction = next_direction = RIGHT
+    events = replay.events
+    index, count = 0, len(events)
+    tick = score = 0
+    while True:
+        while index < count and events[index][0] <= tick:
+            turn = events[index][1]
+            if turn > 3:
+                raise ReplayError(f"unknown direction {turn}")
+            if turn ^ 1 != direction:
+                next_direction = turn
+            index += 1
+        direction = next_direction
+        dx, dy = DIRECTIONS[direction]
+        x, y = board.body[0]
+        head = (x + dx, y + dy)
+        if board.blocked(head):
+            # Moving straight, the snake reaches a wall within GRID moves of
+            # its last turn, so this loop ends; later key presses are ignored.
+            return score
+        if board.move(head):
+            score += POINTS_PER_FOOD
+            if board.food is None:
+                return score
+        tick += 1
@@ -0,0 +1,132 @@
+"""
+Read replicas for the read-only API views.
+
+With DB_REPLICA_HOSTS set, settings adds a database alias per streaming
+replica and lists them in DATABASE_REPLICAS. ReplicaRouter sends every write,
+and by default every read, to 'default'. Only code running under
+replica_reads() reads from a replica, picked once per request. The views
+opt in with the use_replica decorator: the games list and details, the
+leaderboards and the player's score history. The async views use
+areplica_reads(), which awaits the pin lookup instead of blocking the event
+loop on the shared cache.
+
+Replicas lag the primary by a little, so a player who just wrote (submitted a
+score, registered, edited their profile) is pinned to the primary for
+REPLICA_PIN_SECONDS. Pins live in REPLICA_PIN_CACHE_ALIAS, which has to be
+shared by every worker. Cached API payloads are also rebuilt from the primary
+for that long after their scope was invalidated, so a lagging replica
+cannot refill a fresh cache version with the data it replaced.
+"""
+
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .authentication import TokenUserAuthentication
+
+# The replica alias reads go to in this context; None means the primary.
+# asgiref copies the context into sync_to_async threads, so it covers the
+# async views' queries too.
+_replica = ContextVar('replica', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, so saving an object read from a replica still writes to the primary.
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in settings.DATABASE_REPLICAS else None
+
+
+def pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin(user_id):
+    """Sends the user's reads to the primary until replicas have their write."""
+    if settings.DATABASE_REPLICAS and user_id is not None:
+        caches[settings.REPLICA_PIN_CACHE_ALIAS].set(pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return user_id is not None and caches[settings.REPLICA_PIN_CACHE_ALIAS].get(pin_key(user_id), False)
+
+
+async def ais_pinned(user_id):
+    return user_id is not None and await caches[settings.REPLICA_PIN_CACHE_ALIAS].aget(pin_key(user_id), False)
+
+
+@contextmanager
+def replica_reads(user_id=None):
+    """Reads in this block go to a replica, unless there is none or the user is pinned."""
+    alias = None
+    if settings.DATABASE_REPLICAS and not is_pinned(user_id):
+        alias = random.choice(settings.DATABASE_REPLICAS)
+    token = _replica.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica.reset(token)
+
+
+@asynccontextmanager
+async def areplica_reads(user_id=None):
+    """replica_reads() for async views."""
+    alias = None
+    if settings.DATABASE_REPLICAS and not await ais_pinned(user_id):
+        alias = random.choice(settings.DATABASE_REPLICAS)
+    token = _replica.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def primary_reads_since(changed_at):
+    """Reads in this block go to the primary if changed_at is less than REPLICA_PIN_SECONDS ago."""
+    if _replica.get() is None or time.time() - changed_at >= settings.REPLICA_PIN_SECONDS:
+        yield
+        return
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def request_user_id(request):
+    if isinstance(request, Request):
+        return request.user.pk
+    # Plain Django requests (the async views) carry the token but were never
+    # authenticated; reading the claims costs no query.
+    try:
+        result = TokenUserAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0].pk if result else None
+
+
+def use_replica(view):
+    """Decorator running a read-only view under replica_reads() for its user."""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        with replica_reads(request_user_id(request)):
+            return view(request, *args, **kwargs)
+    return wrapped
@@ -1,17 +1,54 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers
-from .models import Game, Player
+from . import images
+from .metrics import TimedRepresentationMixin
+from .models import Game, Player, ScoreEntry, ScoreRollup
 
-class GameSerializer(serializers.ModelSerializer):
+class GameSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     high_score_player_username = serializers.ReadOnlyField(source='high_score_player.username')
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Game
         fields = [
-            'id', 'name', 'image', 
+            'id', 'name', 'image', 'image_srcset',
             'high_score', 'high_score_player', 'high_score_player_username'
         ]
 
-class PlayerSerializer(serializers.ModelSerializer):
+    def get_image_srcset(self, game):
+        return images.srcsets(game, self.context.get('request'))
+
+class ScoreEntrySerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    player_username = serializers.ReadOnlyField(source='player.username')
+    game_name = serializers.ReadOnlyField(source='game.name')
+
+    class Meta:
+        model = ScoreEntry
+        fields = ['id', 'game', 'game_name', 'player', 'player_username', 'score', 'created_at']
+
+class ScoreRollupSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    player_username = serializers.ReadOnlyField(source='player.username')
+    score = serializers.ReadOnlyField(source='best_score')
+
+    class Meta:
+        model = ScoreRollup
+        fields = ['player', 'player_username', 'score']
+
+class ScoreSubmissionSerializer(serializers.Serializer):
+    game_name = serializers.CharField(max_length=100)
+    score = serializers.IntegerField()
+    client_timestamp = serializers.DateTimeField(required=False, allow_null=True)
+    idempotency_key = serializers.CharField(max_length=64)
+    replay = serializers.CharField(required=False, allow_blank=True, max_length=90_000)
+
+class RosterEntrySerializer(serializers.Serializer):
+    # Uniqueness is checked for the whole roster at once by the view, rather
+    # than with two queries per row as ModelSerializer's validators would.
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True)
+
+class PlayerSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
 
     class Meta:
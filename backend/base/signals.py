@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import cache as api_cache
+from . import images
+from .authentication import forget_user
+from .models import Game, Player, ScoreEntry
+
+
+@receiver([post_save, post_delete], sender=Game)
+def invalidate_game_caches(sender, instance, **kwargs):
+    """Admin/API edits to a game change both the games list and its leaderboard labels."""
+    scopes = (api_cache.GAMES_SCOPE, api_cache.leaderboard_scope(instance.pk))
+    transaction.on_commit(lambda: api_cache.invalidate(*scopes))
+
+
+@receiver(post_save, sender=Game)
+def render_image_variants(sender, instance, **kwargs):
+    if images.needs_variants(instance):
+        transaction.on_commit(lambda: images.schedule(instance))
+
+
+@receiver([post_save, post_delete], sender=Player)
+def forget_cached_player(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+def player_scopes(player_id):
+    """The cached payloads that show the player's username: the games list and their leaderboards."""
+    game_ids = ScoreEntry.objects.filter(player_id=player_id).values_list('game_id', flat=True).distinct()
+    return [api_cache.GAMES_SCOPE, *(api_cache.leaderboard_scope(game_id) for game_id in game_ids)]
+
+
+@receiver(post_save, sender=Player)
+def invalidate_renamed_player(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    if getattr(instance, '_loaded_username', None) == instance.username:
+        return
+    instance._loaded_username = instance.username
+    scopes = player_scopes(instance.pk)
+    transaction.on_commit(lambda: api_cache.invalidate(*scopes))
+
+
+@receiver(pre_delete, sender=Player)
+def invalidate_deleted_player(sender, instance, **kwargs):
+    # Before the delete cascades to the scores that say where the player appears.
+    scopes = player_scopes(instance.pk)
+    transaction.on_commit(lambda: api_cache.invalidate(*scopes))
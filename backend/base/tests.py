@@ -1,2 +1,1189 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
+from asgiref.sync import sync_to_async
+
+from django.db import connection
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Max
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from . import async_views, events, replicas, throttling
+from .authentication import TokenUserAuthentication
+from .replays import bots as replay_bots, log as replay_log, snake as replay_snake
+from .models import DataImport, Game, Player, ScoreEntry, ScoreRollup
+from .views import PlayerScoresView, SubmitScoreView
+
+
+class SubmitScoreTests(TestCase):
+    def setUp(self):
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake', high_score=50)
+        self.client = APIClient()
+        self.client.force_authenticate(self.player)
+
+    def test_higher_score_sets_record(self):
+        response = self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 80}, format='json')
+        self.assertEqual(response.data['message'], 'New High Score!')
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.high_score, 80)
+        self.assertEqual(self.game.high_score_player, self.player)
+
+    def test_every_submission_is_recorded(self):
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 10}, format='json')
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 90}, format='json')
+        self.assertEqual(
+            list(ScoreEntry.objects.filter(player=self.player).values_list('score', flat=True).order_by('id')),
+            [10, 90],
+        )
+
+    def test_lower_score_keeps_record(self):
+        response = self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 10}, format='json')
+        self.assertEqual(response.data['message'], 'Score submitted')
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.high_score, 50)
+
+    def test_unknown_game(self):
+        response = self.client.post('/api/submit-score/', {'game_name': 'Nope', 'score': 10}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_score(self):
+        response = self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 'lots'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BatchSubmitScoreTests(TestCase):
+    def setUp(self):
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.snake = Game.objects.create(name='Snake', high_score=50)
+        self.mole = Game.objects.create(name='Mole', high_score=500)
+        self.client = APIClient()
+        self.client.force_authenticate(self.player)
+
+    def post(self, records):
+        return self.client.post('/api/submit-scores/batch/', records, format='json')
+
+    def test_applies_history_and_one_record_per_game(self):
+        earlier = timezone.now() - timedelta(hours=2)
+        response = self.post([
+            {'game_name': 'Snake', 'score': 70, 'client_timestamp': earlier.isoformat(), 'idempotency_key': 'a'},
+            {'game_name': 'Snake', 'score': 90, 'client_timestamp': earlier.isoformat(), 'idempotency_key': 'b'},
+            {'game_name': 'Mole', 'score': 20, 'idempotency_key': 'c'},
+            {'game_name': 'Chess', 'score': 1, 'idempotency_key': 'd'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['accepted'], 3)
+        self.assertEqual(response.data['unknown_games'], ['Chess'])
+        self.assertEqual(response.data['new_high_scores'], ['Snake'])
+        self.snake.refresh_from_db()
+        self.assertEqual(self.snake.high_score, 90)
+        self.assertEqual(ScoreEntry.objects.filter(player=self.player).count(), 3)
+
+    def test_retried_batch_is_idempotent(self):
+        records = [
+            {'game_name': 'Snake', 'score': 10, 'idempotency_key': 'a'},
+            {'game_name': 'Snake', 'score': 10, 'idempotency_key': 'a'},
+        ]
+        self.assertEqual(self.post(records).data['accepted'], 1)
+        response = self.post(records)
+        self.assertEqual(response.data['accepted'], 0)
+        self.assertEqual(response.data['duplicates'], 2)
+        self.assertEqual(ScoreEntry.objects.count(), 1)
+
+    @override_settings(SCORE_OFFLINE_WINDOW_DAYS=7, SCORE_CLOCK_SKEW_SECONDS=60)
+    def test_rejects_timestamps_outside_offline_window(self):
+        now = timezone.now()
+        stamps = {
+            'old': now - timedelta(days=7, minutes=1),
+            'oldest': now - timedelta(days=7) + timedelta(minutes=1),
+            'future': now + timedelta(seconds=120),
+            'skewed': now + timedelta(seconds=30),
+        }
+        response = self.post([
+            {'game_name': 'Snake', 'score': 10, 'client_timestamp': at.isoformat(), 'idempotency_key': key}
+            for key, at in stamps.items()
+        ])
+        self.assertEqual(response.data['accepted'], 2)
+        self.assertEqual(sorted(r['idempotency_key'] for r in response.data['rejected']), ['future', 'old'])
+        self.assertEqual(
+            sorted(ScoreEntry.objects.values_list('idempotency_key', flat=True)), ['oldest', 'skewed'],
+        )
+        self.assertEqual(ScoreRollup.objects.filter(window=ScoreRollup.DAILY).count(), 2)
+
+    def test_counts_what_was_inserted(self):
+        records = [{'game_name': 'Snake', 'score': 10, 'idempotency_key': key} for key in 'ab']
+        # A concurrent retry of the same batch commits 'a' between the first
+        # key lookup and the locked one before the insert.
+        filter_ = ScoreEntry.objects.filter
+        calls = []
+
+        def filter_after_race(*args, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                ScoreEntry.objects.create(player=self.player, game=self.snake, score=10, idempotency_key='a')
+            return filter_(*args, **kwargs)
+
+        with mock.patch.object(ScoreEntry.objects, 'filter', side_effect=filter_after_race):
+            response = self.post(records)
+        self.assertEqual((response.data['accepted'], response.data['duplicates']), (1, 1))
+        self.assertEqual(ScoreEntry.objects.filter(player=self.player).count(), 2)
+
+    def test_rejects_malformed_batch(self):
+        self.assertEqual(self.post({'game_name': 'Snake'}).status_code, 400)
+        self.assertEqual(self.post([{'game_name': 'Snake', 'score': 'x', 'idempotency_key': 'a'}]).status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BatchRegisterTests(TestCase):
+    def setUp(self):
+        throttling.get_store().clear()
+        self.teacher = Player.objects.create_user(
+            username='teacher', email='teacher@example.com', password='pw', is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def post(self, players):
+        return self.client.post('/api/register/batch/', players, format='json')
+
+    def roster(self, count):
+        return [{'username': f'kid{i}', 'email': f'kid{i}@example.com', 'password': f'pw{i}'} for i in range(count)]
+
+    def test_creates_players_that_can_log_in(self):
+        response = self.post(self.roster(3))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 3)
+        self.assertFalse(Player.objects.get(username='kid2').is_staff)
+        login = self.client.post('/api/login/', {'username': 'kid2', 'password': 'pw2'}, format='json')
+        self.assertEqual(login.status_code, 200)
+
+    @override_settings(PASSWORD_HASH_WORKERS=2)
+    def test_hashes_in_process_pool(self):
+        self.assertEqual(self.post(self.roster(4)).status_code, 201)
+        self.assertTrue(Player.objects.get(username='kid3').check_password('pw3'))
+
+    def test_rejects_whole_roster_on_conflict(self):
+        roster = self.roster(3)
+        roster[1]['username'] = 'teacher'
+        roster[2]['email'] = roster[0]['email']
+        response = self.post(roster)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['usernames'], ['teacher'])
+        self.assertEqual(response.data['emails'], ['kid0@example.com'])
+        self.assertEqual(Player.objects.count(), 1)
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(Player.objects.create_user(username='kid', email='kid@example.com', password='pw'))
+        self.assertEqual(self.post(self.roster(1)).status_code, 403)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.alice = Player.objects.create_user(username='alice', email='alice@example.com', password='pw')
+        self.bob = Player.objects.create_user(username='bob', email='bob@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake')
+        self.other = Game.objects.create(name='Mole')
+        for player, score in [(self.alice, 30), (self.bob, 50), (self.alice, 50), (self.bob, 10), (self.alice, 40)]:
+            ScoreEntry.objects.create(player=player, game=self.game, score=score)
+        ScoreEntry.objects.create(player=self.alice, game=self.other, score=99)
+        self.client = APIClient()
+
+    def walk(self, url, limit):
+        rows, cursor = [], None
+        while True:
+            params = {'limit': limit}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            rows.extend(response.data['results'])
+            cursor = response.data['next']
+            if not cursor:
+                return rows
+
+    def test_leaderboard_is_ordered_and_paged_without_gaps(self):
+        rows = self.walk(f'/api/games/{self.game.id}/leaderboard/', limit=2)
+        self.assertEqual([r['score'] for r in rows], [50, 50, 40, 30, 10])
+        self.assertEqual([r['player_username'] for r in rows[:2]], ['bob', 'alice'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'/api/games/{self.game.id}/leaderboard/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_my_scores_newest_first(self):
+        self.client.force_authenticate(self.alice)
+        rows = self.walk('/api/players/me/scores/', limit=2)
+        self.assertEqual([r['score'] for r in rows], [99, 40, 50, 30])
+
+        response = self.client.get('/api/players/me/scores/', {'game': self.other.id})
+        self.assertEqual([r['game_name'] for r in response.data['results']], ['Mole'])
+
+    def test_my_scores_rejects_malformed_game(self):
+        self.client.force_authenticate(self.alice)
+        response = self.client.get('/api/players/me/scores/', {'game': 'snake'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_my_scores_requires_auth(self):
+        self.assertEqual(self.client.get('/api/players/me/scores/').status_code, 401)
+
+
+class WindowedLeaderboardTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.alice = Player.objects.create_user(username='alice', email='alice@example.com', password='pw')
+        self.bob = Player.objects.create_user(username='bob', email='bob@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake')
+        self.client = APIClient()
+        self.today = timezone.localdate()
+        self.monday = self.today - timedelta(days=self.today.weekday())
+
+    def play(self, player, *plays):
+        """Uploads (score, days_ago) plays through the batch endpoint."""
+        self.client.force_authenticate(player)
+        now = timezone.now()
+        response = self.client.post('/api/submit-scores/batch/', [
+            {'game_name': 'Snake', 'score': score, 'client_timestamp': (now - timedelta(days=ago)).isoformat(),
+             'idempotency_key': f'{player.username}-{score}-{ago}'}
+            for score, ago in plays
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def board(self, window, **params):
+        response = self.client.get(f'/api/games/{self.game.id}/leaderboard/{window}/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(r['player_username'], r['score']) for r in response.data['results']]
+
+    # Wide enough to backdate a play into last year's buckets.
+    @override_settings(SCORE_OFFLINE_WINDOW_DAYS=500)
+    def test_windows_keep_each_players_best(self):
+        self.play(self.alice, (30, 0), (10, 0), (90, 400))
+        self.play(self.bob, (20, 0), (50, 0))
+        self.assertEqual(self.board('daily'), [('bob', 50), ('alice', 30)])
+        self.assertEqual(self.board('all-time'), [('alice', 90), ('bob', 50)])
+        self.assertEqual(self.board('daily', date=(self.today - timedelta(days=400)).isoformat()), [('alice', 90)])
+
+    def test_weekly_bucket_starts_on_monday(self):
+        self.play(self.alice, (40, self.today.weekday()), (70, self.today.weekday() + 1))
+        response = self.client.get(f'/api/games/{self.game.id}/leaderboard/weekly/')
+        self.assertEqual(response.data['bucket'], self.monday.isoformat())
+        self.assertEqual(self.board('weekly'), [('alice', 40)])
+
+    def test_single_submissions_are_rolled_up(self):
+        self.client.force_authenticate(self.alice)
+        for score in (10, 60, 20):
+            self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': score}, format='json')
+        self.assertEqual(self.board('daily'), [('alice', 60)])
+        self.assertEqual(ScoreRollup.objects.count(), 3)
+
+    def test_new_day_gets_new_validators(self):
+        self.play(self.alice, (30, 0))
+        url = f'/api/games/{self.game.id}/leaderboard/daily/'
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        tomorrow = self.today + timedelta(days=1)
+        with mock.patch('django.utils.timezone.localdate', return_value=tomorrow):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response.data['bucket'], response.data['results']), (tomorrow.isoformat(), []))
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            self.assertEqual(response.status_code, 200)
+
+    def test_bad_window_or_date(self):
+        self.assertEqual(self.client.get(f'/api/games/{self.game.id}/leaderboard/monthly/').status_code, 404)
+        response = self.client.get(f'/api/games/{self.game.id}/leaderboard/daily/', {'date': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.play(self.alice, (30, 0), (10, 3), (90, 9), (15, 9))
+        self.play(self.bob, (20, 1), (50, 8))
+        rows = lambda: sorted(ScoreRollup.objects.values_list('game', 'player', 'window', 'bucket', 'best_score'))
+        incremental = rows()
+        ScoreRollup.objects.update(best_score=0)
+        # Workers would connect to the real database, not the test one.
+        call_command('rebuild_rollups', '--workers', '1', '--chunk-size', '2', stdout=io.StringIO())
+        self.assertEqual(rows(), incremental)
+
+
+class GamesCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake', high_score=50)
+        self.client = APIClient()
+
+    def test_unchanged_list_revalidates_to_304(self):
+        first = self.client.get('/api/games/')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        again = self.client.get('/api/games/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_cached_list_skips_database(self):
+        self.client.get('/api/games/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/games/')
+
+    def test_new_record_invalidates_list(self):
+        etag = self.client.get('/api/games/')['ETag']
+        self.client.force_authenticate(self.player)
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 70}, format='json')
+
+        response = self.client.get('/api/games/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['high_score'], 70)
+
+    def test_game_edit_invalidates_list(self):
+        self.client.get('/api/games/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game.name = 'Snaky'
+            self.game.save()
+        self.assertEqual(self.client.get('/api/games/').data[0]['name'], 'Snaky')
+
+    def test_renamed_record_holder_invalidates_list_and_leaderboard(self):
+        self.client.force_authenticate(self.player)
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 70}, format='json')
+        self.client.force_authenticate(None)
+        board = f'/api/games/{self.game.id}/leaderboard/'
+        etags = {url: self.client.get(url)['ETag'] for url in ('/api/games/', board)}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            player = Player.objects.get(pk=self.player.pk)
+            player.username = 'champ'
+            player.save()
+
+        games = self.client.get('/api/games/', HTTP_IF_NONE_MATCH=etags['/api/games/'])
+        self.assertEqual(games.status_code, 200)
+        self.assertEqual(games.data[0]['high_score_player_username'], 'champ')
+        leaderboard = self.client.get(board, HTTP_IF_NONE_MATCH=etags[board])
+        self.assertEqual(leaderboard.status_code, 200)
+        self.assertEqual(leaderboard.data['results'][0]['player_username'], 'champ')
+
+    def test_deleted_player_invalidates_leaderboard(self):
+        self.client.force_authenticate(self.player)
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 10}, format='json')
+        self.client.force_authenticate(None)
+        board = f'/api/games/{self.game.id}/leaderboard/'
+        etag = self.client.get(board)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.player.delete()
+
+        response = self.client.get(board, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+    def test_login_does_not_invalidate_list(self):
+        etag = self.client.get('/api/games/')['ETag']
+        self.client.post('/api/login/', {'username': 'kid', 'password': 'pw'}, format='json')
+        self.assertEqual(self.client.get('/api/games/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_any_submission_invalidates_leaderboard(self):
+        url = f'/api/games/{self.game.id}/leaderboard/'
+        etag = self.client.get(url)['ETag']
+        self.client.force_authenticate(self.player)
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 10}, format='json')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['score'] for r in response.data['results']], [10])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+@override_settings(IMAGE_VARIANT_WORKERS=0, IMAGE_VARIANT_WIDTHS=[100, 200, 400], IMAGE_VARIANT_FORMATS=['webp'])
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def upload(self, name, size):
+        out = io.BytesIO()
+        Image.new('RGB', size, 'red').save(out, 'PNG')
+        return SimpleUploadedFile(name, out.getvalue(), content_type='image/png')
+
+    def test_upload_renders_variants_into_srcset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.create(name='Snake', image=self.upload('snake.png', (300, 150)))
+        game.refresh_from_db()
+        self.assertEqual(game.image_variants['source'], game.image.name)
+        # No upscaling: the 400 variant would be the source's own width.
+        self.assertEqual([width for width, _ in game.image_variants['webp']], [100, 200, 300])
+        for _, name in game.image_variants['webp']:
+            self.assertTrue(default_storage.exists(name))
+
+        srcset = self.client.get('/api/games/').data[0]['image_srcset']
+        self.assertEqual(list(srcset), ['webp'])
+        self.assertRegex(srcset['webp'], r'^http://testserver/media/game_covers/variants/[0-9a-f]{16}-100\.webp 100w, ')
+
+    def test_variants_follow_image_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.create(name='Snake', image=self.upload('snake.png', (300, 150)))
+        first = Game.objects.get(pk=game.pk).image_variants
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            game = Game.objects.get(pk=game.pk)
+            game.high_score = 5
+            game.save()
+        self.assertEqual(len(callbacks), 1)  # the cache invalidation, no re-render
+
+        with self.captureOnCommitCallbacks(execute=True):
+            game.image = self.upload('snake.png', (120, 120))
+            game.save()
+        game.refresh_from_db()
+        self.assertNotEqual(game.image_variants, first)
+        self.assertEqual([width for width, _ in game.image_variants['webp']], [100, 120])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            game.image = None
+            game.save()
+        game.refresh_from_db()
+        self.assertEqual(game.image_variants, {})
+
+    def test_unreadable_image_is_logged_not_raised(self):
+        with self.assertLogs('base.images', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.create(name='Snake', image=SimpleUploadedFile('snake.png', b'not a png'))
+        game.refresh_from_db()
+        self.assertEqual(game.image_variants, {})
+
+    def test_backfill_command(self):
+        game = Game.objects.create(name='Snake', image=self.upload('snake.png', (250, 100)))
+        default_storage.save('game_covers/variants/stale-100.webp', ContentFile(b'old'))
+        out = io.StringIO()
+        call_command('render_image_variants', '--workers', '1', '--prune', stdout=out)
+        game.refresh_from_db()
+        self.assertEqual([width for width, _ in game.image_variants['webp']], [100, 200, 250])
+        self.assertFalse(default_storage.exists('game_covers/variants/stale-100.webp'))
+        self.assertIn("Deleted 1 unused variants", out.getvalue())
+
+        call_command('render_image_variants', '--workers', '1', stdout=out)
+        self.assertIn("Rendering variants of 0 images", out.getvalue())
+
+
+class QueryCountTests(TestCase):
+    """
+    Pins the number of queries each route in base/urls.py issues, so an N+1
+    or an extra round trip shows up as a test failure. List endpoints are
+    measured with several rows to prove their cost does not grow with N.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        throttling.get_store().clear()
+        self.admin = Player.objects.create_user(username='admin', email='admin@example.com', password='pw', is_staff=True)
+        self.players = [
+            Player.objects.create_user(username=f'kid{i}', email=f'kid{i}@example.com', password='pw')
+            for i in range(3)
+        ]
+        self.games = [
+            Game.objects.create(name=f'Game{i}', high_score=10 * i, high_score_player=self.players[i])
+            for i in range(3)
+        ]
+        for player in self.players:
+            for game in self.games:
+                ScoreEntry.objects.create(player=player, game=game, score=5)
+        self.player = self.players[0]
+        self.game = self.games[0]
+        self.client = APIClient()
+
+    def assertQueries(self, expected, method, url, user=None, data=None):
+        if user:
+            self.client.force_authenticate(user)
+        with self.assertNumQueries(expected):
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, response.data if hasattr(response, 'data') else response)
+        return response
+
+    def test_api_root(self):
+        self.assertQueries(0, 'get', '/api/')
+
+    def test_health_check(self):
+        self.assertQueries(0, 'get', '/api/api/health/')
+
+    def test_login(self):
+        self.assertQueries(1, 'post', '/api/login/', data={'username': 'kid0', 'password': 'pw'})
+
+    def test_register(self):
+        # Uniqueness checks for username and email, then one INSERT.
+        self.assertQueries(3, 'post', '/api/register/', data={
+            'username': 'newkid', 'email': 'newkid@example.com', 'password': 'pw',
+        })
+
+    def test_register_batch(self):
+        # Username and email lookups for the whole roster, then one bulk INSERT.
+        self.assertQueries(3, 'post', '/api/register/batch/', user=self.admin, data=[
+            {'username': f'new{i}', 'email': f'new{i}@example.com', 'password': 'pw'} for i in range(5)
+        ])
+
+    def test_token(self):
+        self.assertQueries(1, 'post', '/api/token/', data={'username': 'kid0', 'password': 'pw'})
+
+    def test_token_refresh(self):
+        refresh = self.client.post('/api/token/', {'username': 'kid0', 'password': 'pw'}, format='json').data['refresh']
+        self.assertQueries(1, 'post', '/api/token/refresh/', data={'refresh': refresh})
+
+    def test_jwt_authenticated_request(self):
+        token = self.client.post('/api/token/', {'username': 'kid0', 'password': 'pw'}, format='json').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # One lookup for the token's user plus the history page.
+        self.assertQueries(2, 'get', '/api/players/me/scores/')
+
+    def test_stateless_jwt_request(self):
+        token = self.client.post('/api/token/', {'username': 'kid0', 'password': 'pw'}, format='json').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with mock.patch.object(PlayerScoresView, 'authentication_classes', [TokenUserAuthentication]):
+            self.assertQueries(1, 'get', '/api/players/me/scores/')
+
+    def test_cached_user_request(self):
+        token = self.client.post('/api/token/', {'username': 'kid0', 'password': 'pw'}, format='json').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertQueries(1, 'get', '/api/profile/update/')
+        self.assertQueries(0, 'get', '/api/profile/update/')
+
+    def test_submit_score(self):
+        # Game lookup, savepoint, INSERT, rollup INSERT and UPDATE, record UPDATE, release.
+        self.assertQueries(7, 'post', '/api/submit-score/', self.player, {'game_name': 'Game0', 'score': 1})
+
+    def test_batch_submit_is_constant(self):
+        # Game names, known keys, savepoint, player lock, keys again under the lock,
+        # one bulk INSERT, rollup INSERT, then one rollup UPDATE and one record
+        # UPDATE per game, release.
+        records = [
+            {'game_name': game.name, 'score': 100 + i, 'idempotency_key': f'{game.name}-{i}'}
+            for game in self.games for i in range(20)
+        ]
+        self.assertQueries(14, 'post', '/api/submit-scores/batch/', self.player, records)
+
+    def test_profile(self):
+        self.assertQueries(0, 'get', '/api/profile/update/', self.player)
+        # Fresh row for the write, email uniqueness check, UPDATE.
+        self.assertQueries(3, 'patch', '/api/profile/update/', self.player, {'email': 'kid0@new.example.com'})
+
+    def test_my_scores(self):
+        self.assertQueries(1, 'get', '/api/players/me/scores/', self.player)
+
+    def test_games_list_is_constant(self):
+        self.assertQueries(1, 'get', '/api/games/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Game.objects.create(name='Extra', high_score=1, high_score_player=self.players[1])
+        self.assertQueries(1, 'get', '/api/games/')
+
+    def test_games_retrieve(self):
+        self.assertQueries(1, 'get', f'/api/games/{self.game.id}/')
+
+    def test_leaderboard(self):
+        self.assertQueries(2, 'get', f'/api/games/{self.game.id}/leaderboard/')
+
+    def test_windowed_leaderboard(self):
+        self.assertQueries(2, 'get', f'/api/games/{self.game.id}/leaderboard/weekly/')
+
+    def test_games_write(self):
+        self.assertQueries(2, 'post', '/api/games/', self.admin, {'name': 'New', 'high_score': 0})
+        self.assertQueries(2, 'patch', f'/api/games/{self.game.id}/', self.admin, {'high_score': 99})
+        # Lookup, then cascades to scores and rollups alongside the DELETE.
+        self.assertQueries(4, 'delete', f'/api/games/{self.game.id}/', self.admin)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+@override_settings(THROTTLE_RATES={'login': '3/min', 'submit': '2/s'})
+class ThrottleTests(TestCase):
+    def setUp(self):
+        throttling.get_store().clear()
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.other = Player.objects.create_user(username='kid2', email='kid2@example.com', password='pw')
+        Game.objects.create(name='Snake')
+        self.client = APIClient()
+
+    def submit(self, player):
+        self.client.force_authenticate(player)
+        return self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 1}, format='json')
+
+    def test_login_routes_share_a_bucket_per_ip(self):
+        credentials = {'username': 'kid', 'password': 'wrong'}
+        self.client.post('/api/login/', credentials, format='json')
+        self.client.post('/api/token/', credentials, format='json')
+        self.client.post('/api/login/', credentials, format='json')
+        response = self.client.post('/api/token/', credentials, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        other_ip = self.client.post('/api/login/', credentials, format='json', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_ip.status_code, 400)
+
+    def test_players_have_separate_buckets(self):
+        self.assertEqual([self.submit(self.player).status_code for _ in range(3)], [200, 200, 429])
+        self.assertEqual(self.submit(self.other).status_code, 200)
+
+    @override_settings(THROTTLE_IP_FACTOR=2)
+    def test_players_behind_one_ip_share_its_bucket(self):
+        players = [self.player, self.other] + [
+            Player.objects.create_user(username=f'pupil{i}', email=f'pupil{i}@example.com', password='pw') for i in range(3)
+        ]
+        # 2/s per player, and 4/s for the address, however many accounts it uses.
+        codes = [self.submit(player).status_code for player in players]
+        self.assertEqual(codes, [200, 200, 200, 200, 429])
+        self.client.force_authenticate(players[4])
+        response = self.client.post(
+            '/api/submit-score/', {'game_name': 'Snake', 'score': 1}, format='json', REMOTE_ADDR='10.0.0.2',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_bucket_refills_over_time(self):
+        now = 1000.0
+        with mock.patch('base.throttling.time.time', lambda: now):
+            self.assertEqual([self.submit(self.player).status_code for _ in range(3)], [200, 200, 429])
+            now += 0.5
+            self.assertEqual([self.submit(self.player).status_code for _ in range(2)], [200, 429])
+
+    def test_unlisted_scopes_are_not_throttled(self):
+        with override_settings(THROTTLE_RATES={}):
+            self.assertEqual({self.submit(self.player).status_code for _ in range(5)}, {200})
+
+    def test_local_store_sweeps_refilled_buckets(self):
+        store = throttling.LocalBucketStore()
+        bucket = lambda name: [(('test', name), 2, 1)]
+        self.assertEqual([store.consume(bucket('a'), 0) for _ in range(3)], [(True, None), (True, None), (False, 0.5)])
+        store.consume(bucket('b'), 0.9)
+        self.assertEqual(list(store.scopes['test']), [('test', 'a'), ('test', 'b')])
+        store.consume(bucket('c'), 1.2)
+        self.assertEqual(list(store.scopes['test']), [('test', 'b'), ('test', 'c')])
+
+    def test_cache_store_keeps_partial_buckets_until_refilled(self):
+        caches['throttle'].clear()
+        store = throttling.CacheBucketStore()
+        bucket = [(('test', 'a'), 2, 1)]
+        self.assertEqual([store.consume(bucket, 0) for _ in range(3)], [(True, None), (True, None), (False, 0.5)])
+        self.assertEqual(caches['throttle'].get('throttle:test:a'), (0, 0))
+        self.assertEqual(store.consume(bucket, 10), (True, None))
+        self.assertEqual(caches['throttle'].get('throttle:test:a'), (1, 10))
+
+    def test_stores_take_from_every_bucket_or_none(self):
+        caches['throttle'].clear()
+        for store in (throttling.LocalBucketStore(), throttling.CacheBucketStore()):
+            player, shared = (('test', 'player'), 1, 1), (('test', 'ip'), 3, 3)
+            self.assertEqual(store.consume([player, shared], 0), (True, None))
+            # The player's bucket is empty, so the shared one keeps its tokens.
+            self.assertEqual(store.consume([player, shared], 0.5), (False, 0.5))
+            self.assertEqual(store.consume([shared], 0.5), (True, None))
+            self.assertEqual(store.consume([shared], 0.5), (True, None))
+            self.assertEqual(store.consume([shared], 0.5), (False, 0.5))
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.game = Game.objects.create(name='Snake')
+        self.client = APIClient()
+
+    def sample(self, name, view, **labels):
+        return REGISTRY.get_sample_value(name, {'view': view, **labels}) or 0
+
+    def test_sampled_request_is_recorded_per_view(self):
+        before = {
+            name: self.sample(name, 'games-list')
+            for name in ('api_db_queries_sum', 'api_db_queries_count', 'api_response_size_bytes_count')
+        }
+        latency = self.sample('api_request_duration_seconds_count', 'games-list', method='GET', status='200')
+        serialize = self.sample('api_serialize_duration_seconds_sum', 'games-list')
+        with override_settings(METRICS_SAMPLE_RATE=1):
+            self.client.get('/api/games/')
+
+        self.assertEqual(self.sample('api_request_duration_seconds_count', 'games-list', method='GET', status='200'), latency + 1)
+        self.assertEqual(self.sample('api_db_queries_count', 'games-list'), before['api_db_queries_count'] + 1)
+        self.assertEqual(self.sample('api_db_queries_sum', 'games-list'), before['api_db_queries_sum'] + 1)
+        self.assertEqual(self.sample('api_response_size_bytes_count', 'games-list'), before['api_response_size_bytes_count'] + 1)
+        self.assertGreater(self.sample('api_serialize_duration_seconds_sum', 'games-list'), serialize)
+
+    def test_sampling_off_removes_the_middleware(self):
+        before = self.sample('api_request_duration_seconds_count', 'health_check', method='GET', status='200')
+        self.client.get('/api/api/health/')
+        self.assertEqual(self.sample('api_request_duration_seconds_count', 'health_check', method='GET', status='200'), before)
+
+    def test_exposition(self):
+        with override_settings(METRICS_SAMPLE_RATE=1):
+            self.client.get('/api/api/health/')
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'api_request_duration_seconds_bucket{', response.content)
+        self.assertIn(b'view="health_check"', response.content)
+
+
+class ReplayTests(TestCase):
+    def setUp(self):
+        throttling.get_store().clear()
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        for name in ('Snaky-Snake', 'Beautiful-Balloon', 'Pencil-Game'):
+            Game.objects.create(name=name)
+        self.client = APIClient()
+        self.client.force_authenticate(self.player)
+
+    def submit(self, game_name, score, log=None):
+        data = {'game_name': game_name, 'score': score}
+        if log is not None:
+            data['replay'] = log
+        return self.client.post('/api/submit-score/', data, format='json')
+
+    def test_random_matches_clients(self):
+        # mulberry32(42) as the web client computes it.
+        rng = replay_log.Random(42)
+        self.assertEqual([rng.next_uint32() for _ in range(3)], [2581720956, 1925393290, 3661312704])
+
+    def test_genuine_replays_are_accepted(self):
+        plays = [
+            ('Snaky-Snake', replay_bots.play_snake(3)),
+            ('Snaky-Snake', replay_bots.play_snake(4, level=2, variant=replay_log.GUI)),
+            ('Snaky-Snake', replay_bots.play_snake(5, level=2, variant=replay_log.GUI_FREE_CELLS)),
+            ('Beautiful-Balloon', replay_bots.play_balloon(5)),
+            ('Pencil-Game', replay_bots.play_pencil(6, variant=replay_log.GUI)),
+        ]
+        for game_name, (log, score) in plays:
+            self.assertGreater(score, 0)
+            response = self.submit(game_name, score, log)
+            self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(ScoreEntry.objects.count(), 5)
+
+    def test_free_cell_snake_fills_the_board(self):
+        # Food drawn from FreeCells lands in the last gap left; nothing is retried.
+        board = replay_snake.Board(replay_log.Random(1), replay_log.GUI_FREE_CELLS, 2)
+        self.assertEqual(len(board.free.cells), replay_snake.GRID ** 2 - 3 - 15)
+        while len(board.free.cells) > 1:
+            board.free.remove(board.free.sample(board.rng))
+        last = board.free.cells[0]
+        self.assertEqual(board.free.sample(board.rng), last)
+        board.free.remove(last)
+        self.assertIsNone(board.free.sample(board.rng))
+
+    def test_inflated_score_is_rejected(self):
+        log, score = replay_bots.play_pencil(7)
+        response = self.submit('Pencil-Game', score + 10, log)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], f"Score does not match its replay ({score})")
+        self.assertFalse(ScoreEntry.objects.exists())
+
+    def test_malformed_or_foreign_replay_is_rejected(self):
+        log, score = replay_bots.play_snake(8)
+        self.assertEqual(self.submit('Pencil-Game', score, log).data['error'], "Replay is for a different game")
+        self.assertTrue(self.submit('Snaky-Snake', score, 'not base64!').data['error'].startswith("Invalid replay"))
+        self.assertTrue(self.submit('Snaky-Snake', score, log[:-8]).data['error'].startswith("Invalid replay"))
+
+    def test_impossible_pop_is_rejected(self):
+        # No balloon has risen into view on the first frame.
+        log = replay_log.encode(replay_log.BALLOON, replay_log.WEB, 0, 9, [(1, 0)])
+        self.assertEqual(self.submit('Beautiful-Balloon', 1, log).status_code, 400)
+
+    def test_policy_for_scores_without_replay(self):
+        self.assertEqual(self.submit('Snaky-Snake', 500).status_code, 200)
+        with override_settings(REPLAY_VERIFICATION='required'):
+            response = self.submit('Snaky-Snake', 500)
+            self.assertEqual(response.data['error'], "A replay is required for this game")
+        with override_settings(REPLAY_VERIFICATION='off'):
+            self.assertEqual(self.submit('Snaky-Snake', 500, 'garbage').status_code, 200)
+
+    def test_batch_skips_rejected_records(self):
+        log, score = replay_bots.play_balloon(10)
+        response = self.client.post('/api/submit-scores/batch/', [
+            {'game_name': 'Beautiful-Balloon', 'score': score, 'idempotency_key': 'a', 'replay': log},
+            {'game_name': 'Beautiful-Balloon', 'score': score + 5, 'idempotency_key': 'b', 'replay': log},
+        ], format='json')
+        self.assertEqual(response.data['accepted'], 1)
+        self.assertEqual(response.data['rejected'], [
+            {'idempotency_key': 'b', 'error': f"Score does not match its replay ({score})"},
+        ])
+        self.assertEqual(list(ScoreEntry.objects.values_list('idempotency_key', flat=True)), ['a'])
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        caches['auth'].clear()
+        throttling.get_store().clear()
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake', high_score=50)
+        self.client = APIClient()
+        token = self.client.post('/api/token/', {'username': 'kid', 'password': 'pw'}, format='json').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_submit_with_claims_user(self):
+        with mock.patch.object(SubmitScoreView, 'authentication_classes', [TokenUserAuthentication]):
+            response = self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 80}, format='json')
+        self.assertEqual(response.data['message'], 'New High Score!')
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.high_score_player, self.player)
+        self.assertEqual(ScoreEntry.objects.get().player, self.player)
+
+    def test_saving_player_drops_cached_copy(self):
+        self.assertEqual(self.client.get('/api/profile/update/').data['email'], 'kid@example.com')
+        self.player.email = 'kid@new.example.com'
+        self.player.save()
+        self.assertEqual(self.client.get('/api/profile/update/').data['email'], 'kid@new.example.com')
+
+    def test_profile_update_writes_current_row(self):
+        self.client.get('/api/profile/update/')
+        Player.objects.filter(pk=self.player.pk).update(first_name='Ada')  # bypasses signals
+        self.client.patch('/api/profile/update/', {'email': 'kid@new.example.com'}, format='json')
+        self.player.refresh_from_db()
+        self.assertEqual((self.player.first_name, self.player.email), ('Ada', 'kid@new.example.com'))
+
+
+class BootCommandTests(TestCase):
+    def test_second_boot_skips_finished_steps(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with override_settings(STATIC_ROOT=tmp.name):
+            first, second = io.StringIO(), io.StringIO()
+            call_command('boot', '--seed', '', stdout=first)
+            call_command('boot', '--seed', '', stdout=second)
+        self.assertIn("no pending migrations", first.getvalue())
+        self.assertIn("collected", first.getvalue())
+        self.assertIn("static files unchanged", second.getvalue())
+        self.assertTrue(os.path.isfile(os.path.join(tmp.name, 'admin', 'css', 'base.css')))
+
+
+class ScoreExportImportTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake', high_score=50, high_score_player=self.player)
+        ScoreEntry.objects.create(player=self.player, game=self.game, score=50, idempotency_key='a')
+        ScoreEntry.objects.create(
+            player=self.player, game=self.game, score=20, client_timestamp=timezone.now() - timedelta(days=1),
+        )
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def snapshot(self):
+        return (
+            list(Player.objects.values_list('id', 'username', 'password', 'date_joined')),
+            list(Game.objects.values_list('id', 'name', 'high_score', 'high_score_player')),
+            list(ScoreEntry.objects.order_by('id').values_list(
+                'id', 'player', 'game', 'score', 'created_at', 'client_timestamp', 'idempotency_key',
+            )),
+        )
+
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command(*args, stdout=out)
+        return out.getvalue()
+
+    def test_ndjson_round_trip_restores_rows_exactly(self):
+        before = self.snapshot()
+        self.run_command('export_scores', self.path('dump.ndjson.gz'))
+        ScoreEntry.objects.all().delete()
+        Game.objects.all().delete()
+        Player.objects.all().delete()
+        self.run_command('import_scores', self.path('dump.ndjson.gz'), '--chunk-size', '1')
+        self.assertEqual(self.snapshot(), before)
+
+    def test_new_rows_follow_imported_ids(self):
+        self.run_command('export_scores', self.path('dump.ndjson'))
+        ScoreEntry.objects.all().delete()
+        Game.objects.all().delete()
+        Player.objects.all().delete()
+        with mock.patch.object(connection.ops, 'sequence_reset_sql', wraps=connection.ops.sequence_reset_sql) as reset:
+            self.run_command('import_scores', self.path('dump.ndjson'))
+        self.assertEqual(reset.call_args.args[1], [Player, Game, ScoreEntry])
+
+        response = APIClient().post('/api/register/', {
+            'username': 'newkid', 'email': 'newkid@example.com', 'password': 'pw',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        Game.objects.create(name='Mole')
+        ScoreEntry.objects.create(player=self.player, game=self.game, score=5)
+
+    def test_csv_round_trip_per_model(self):
+        before = self.snapshot()
+        for name in ('players', 'games', 'scores'):
+            self.run_command('export_scores', self.path(f'{name}.csv'), '--models', name)
+        ScoreEntry.objects.all().delete()
+        for name in ('players', 'games', 'scores'):
+            self.run_command('import_scores', self.path(f'{name}.csv'))
+        self.assertEqual(self.snapshot(), before)
+
+    def test_reimport_upserts_and_skips_unchanged_file(self):
+        path = self.path('dump.ndjson')
+        self.run_command('export_scores', path)
+        Game.objects.filter(pk=self.game.pk).update(high_score=999)
+        self.assertIn('Imported', self.run_command('import_scores', path))
+        self.assertIn('unchanged', self.run_command('import_scores', path))
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.high_score, 50)
+        self.assertEqual(ScoreEntry.objects.count(), 2)
+        self.assertEqual(DataImport.objects.get().rows, 4)
+
+    def test_imported_scores_reach_windowed_boards(self):
+        caches['default'].clear()
+        path = self.path('dump.ndjson')
+        self.run_command('export_scores', path)
+        ScoreEntry.objects.all().delete()
+        self.assertFalse(ScoreRollup.objects.exists())
+        board = lambda **params: [
+            (r['player_username'], r['score'])
+            for r in self.client.get(f'/api/games/{self.game.id}/leaderboard/daily/', params).data['results']
+        ]
+        self.assertEqual(board(), [])
+
+        self.run_command('import_scores', path)
+        self.assertEqual(board(), [('kid', 50)])
+        yesterday = timezone.localdate() - timedelta(days=1)
+        self.assertEqual(board(date=yesterday.isoformat()), [('kid', 20)])
+
+    def test_generated_scores_are_rolled_up(self):
+        ScoreEntry.objects.all().delete()
+        self.run_command('generate_scores', '--count', '30', '--players', '3', '--seed', '1')
+        best = dict(
+            ScoreEntry.objects.filter(game=self.game).values_list('player__username')
+            .annotate(best=Max('score')).values_list('player__username', 'best')
+        )
+        response = self.client.get(f'/api/games/{self.game.id}/leaderboard/all-time/')
+        self.assertEqual({r['player_username']: r['score'] for r in response.data['results']}, best)
+
+    def test_rejects_unrecognized_csv(self):
+        path = self.path('bad.csv')
+        with open(path, 'w') as f:
+            f.write('id,colour\n1,red\n')
+        with self.assertRaises(CommandError):
+            self.run_command('import_scores', path)
+
+
+# 'default' stands in for the replica, so routed reads still reach the test
+# database; the router's answers tell the two apart (None is the primary).
+@override_settings(DATABASE_REPLICAS=['default'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        caches['throttle'].clear()
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake', high_score=50)
+        self.client = APIClient()
+        self.client.force_authenticate(self.player)
+
+        self.reads = []
+        db_for_read = replicas.ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            self.reads.append(alias)
+            return alias
+        patcher = mock.patch.object(replicas.ReplicaRouter, 'db_for_read', record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_views_use_replica_and_writes_primary(self):
+        self.client.get('/api/players/me/scores/')
+        self.assertEqual(set(self.reads), {'default'})
+
+        router = replicas.ReplicaRouter()
+        with replicas.replica_reads():
+            self.assertEqual(router.db_for_write(Game, instance=self.game), 'default')
+        self.assertFalse(router.allow_migrate('default', 'base'))
+
+    def test_writer_reads_primary_until_pin_expires(self):
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 80}, format='json')
+        self.reads.clear()
+        self.assertEqual(self.client.get('/api/players/me/scores/').data['results'][0]['score'], 80)
+        self.assertEqual(set(self.reads), {None})
+
+        caches['throttle'].delete(replicas.pin_key(self.player.pk))
+        self.reads.clear()
+        self.client.get('/api/players/me/scores/')
+        self.assertEqual(set(self.reads), {'default'})
+
+    def test_invalidated_payload_rebuilt_from_primary(self):
+        self.client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 80}, format='json')
+        self.reads.clear()
+        url = f'/api/games/{self.game.id}/leaderboard/'
+        self.assertEqual(APIClient().get(url).data['results'][0]['score'], 80)
+        # The game lookup may use a replica; the page built after the invalidation may not.
+        self.assertEqual(self.reads, ['default', None])
+
+        self.reads.clear()
+        with mock.patch('base.replicas.time.time', return_value=time.time() + 60):
+            APIClient().get(url, {'limit': 5})
+        self.assertEqual(set(self.reads), {'default'})
+
+
+    async def test_async_reads_await_the_pin_lookup(self):
+        await caches['throttle'].aset(replicas.pin_key(self.player.pk), True)
+        async with replicas.areplica_reads(self.player.pk) as alias:
+            self.assertIsNone(alias)
+        async with replicas.areplica_reads(None) as alias:
+            self.assertEqual(alias, 'default')
+
+        # The async views never make the blocking lookup on the event loop.
+        with mock.patch.object(replicas, 'is_pinned', side_effect=AssertionError("blocking pin lookup")):
+            response = await async_views.game_list(AsyncRequestFactory().get('/api/games/'))
+        self.assertEqual(response.status_code, 200)
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake', high_score=50, high_score_player=self.player)
+        ScoreEntry.objects.create(player=self.player, game=self.game, score=50)
+        self.factory = AsyncRequestFactory()
+
+    async def test_game_list_matches_sync_payload(self):
+        response = await async_views.game_list(self.factory.get('/api/games/'))
+        self.assertEqual(response.status_code, 200)
+        sync_data = await sync_to_async(lambda: APIClient().get('/api/games/').json())()
+        self.assertEqual(json.loads(response.content), sync_data)
+
+        again = await async_views.game_list(self.factory.get('/api/games/', headers={'If-None-Match': response['ETag']}))
+        self.assertEqual(again.status_code, 304)
+
+    async def test_game_detail(self):
+        response = await async_views.game_detail(self.factory.get('/'), pk=str(self.game.id))
+        self.assertEqual(json.loads(response.content)['high_score_player_username'], 'kid')
+        missing = await async_views.game_detail(self.factory.get('/'), pk='not-a-uuid')
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_leaderboard(self):
+        response = await async_views.game_leaderboard(self.factory.get('/', {'limit': 5}), pk=str(self.game.id))
+        self.assertEqual([r['score'] for r in json.loads(response.content)['results']], [50])
+        bad = await async_views.game_leaderboard(self.factory.get('/', {'cursor': 'x'}), pk=str(self.game.id))
+        self.assertEqual(bad.status_code, 400)
+
+
+class RecordEventsTests(TestCase):
+    def setUp(self):
+        self.player = Player.objects.create_user(username='kid', email='kid@example.com', password='pw')
+        self.game = Game.objects.create(name='Snake', high_score=50)
+
+    def test_submit_publishes_only_new_records(self):
+        client = APIClient()
+        client.force_authenticate(self.player)
+        with mock.patch('base.views.events.publish') as publish:
+            client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 10}, format='json')
+            publish.assert_not_called()
+            client.post('/api/submit-score/', {'game_name': 'Snake', 'score': 80}, format='json')
+        publish.assert_called_once_with(events.RECORDS_CHANNEL, {'type': 'record', 'game': {
+            'id': str(self.game.id), 'name': 'Snake', 'high_score': 80,
+            'high_score_player': str(self.player.id), 'high_score_player_username': 'kid',
+        }})
+
+    def test_batch_submit_publishes_best_score(self):
+        client = APIClient()
+        client.force_authenticate(self.player)
+        with mock.patch('base.views.events.publish') as publish:
+            client.post('/api/submit-scores/batch/', [
+                {'game_name': 'Snake', 'score': 70, 'idempotency_key': 'a'},
+                {'game_name': 'Snake', 'score': 90, 'idempotency_key': 'b'},
+            ], format='json')
+        self.assertEqual(publish.call_count, 1)
+        self.assertEqual(publish.call_args.args[1]['game']['high_score'], 90)
+
+    async def test_server_sent_events_stream(self):
+        response = await async_views.record_events(AsyncRequestFactory().get('/api/events/records/'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = asyncio.Queue()
+
+        async def read():
+            async for chunk in response.streaming_content:
+                await chunks.put(chunk.decode())
+
+        # Django's ASGI handler cancels the response task when the client disconnects.
+        reader = asyncio.create_task(read())
+        self.assertEqual(await asyncio.wait_for(chunks.get(), 1), 'retry: 3000\n\n')
+        events.publish_record(self.game.id, 'Snake', 99, self.player.id, 'kid')
+        chunk = await asyncio.wait_for(chunks.get(), 1)
+        self.assertTrue(chunk.startswith('event: record\ndata: '))
+        self.assertEqual(json.loads(chunk.split('data: ')[1])['high_score'], 99)
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+        self.assertFalse(events.hub.subscribers[events.RECORDS_CHANNEL])
+
+    async def test_websocket_stream(self):
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        await inbox.put({'type': 'websocket.connect'})
+        task = asyncio.create_task(events.websocket_app({'type': 'websocket', 'path': events.WEBSOCKET_PATH}, inbox.get, outbox.put))
+        self.assertEqual(await asyncio.wait_for(outbox.get(), 1), {'type': 'websocket.accept'})
+        await inbox.put({'type': 'websocket.receive', 'text': 'hello'})
+        events.publish_record(self.game.id, 'Snake', 99, self.player.id, 'kid')
+        frame = await asyncio.wait_for(outbox.get(), 1)
+        self.assertEqual(json.loads(frame['text'])['game']['high_score_player_username'], 'kid')
+        await inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(task, 1)
+        self.assertFalse(events.hub.subscribers[events.RECORDS_CHANNEL])
+
+    def test_slow_subscriber_keeps_newest_messages(self):
+        async def run():
+            async with events.hub.subscribe('test') as subscription:
+                for n in range(events.Hub.queue_size + 5):
+                    events.hub.deliver('test', n)
+                await asyncio.sleep(0)
+                return await subscription.get(timeout=1)
+        self.assertEqual(asyncio.run(run()), 5)
+
+
+class SubmitScoreConcurrencyTests(TransactionTestCase):
+    """
+    Fires parallel submissions at the endpoint. Runs against whichever backend
+    settings.DATABASES selects, so run it once with the default SQLite config and
+    once with DB_ENGINE=django.db.backends.postgresql to cover both.
+    """
+    THREADS = 8
+    SUBMITS_PER_THREAD = 25
+
+    def setUp(self):
+        self.players = [
+            Player.objects.create_user(username=f'kid{i}', email=f'kid{i}@example.com', password='pw')
+            for i in range(self.THREADS)
+        ]
+        self.game = Game.objects.create(name='Snake')
+
+    def test_parallel_submits_never_regress_record(self):
+        errors = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(index):
+            client = APIClient()
+            client.force_authenticate(self.players[index])
+            barrier.wait()
+            try:
+                for n in range(self.SUBMITS_PER_THREAD):
+                    # Threads interleave rising and falling scores so stale, lower
+                    # writes would overwrite the record if the update were not atomic.
+                    score = n * self.THREADS + index if index % 2 else (self.SUBMITS_PER_THREAD - n) * self.THREADS
+                    response = client.post('/api/submit-score/', {'game_name': 'Snake', 'score': score}, format='json')
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.game.refresh_from_db()
+        expected = max(
+            max(n * self.THREADS + i if i % 2 else (self.SUBMITS_PER_THREAD - n) * self.THREADS
+                for n in range(self.SUBMITS_PER_THREAD))
+            for i in range(self.THREADS)
+        )
+        self.assertEqual(self.game.high_score, expected)
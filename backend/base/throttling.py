@@ -0,0 +1,246 @@
+"""
+Token-bucket throttling for the score and auth endpoints.
+
+Each (scope, client) pair has a bucket of N tokens that refills at N per
+period, from THROTTLE_RATES = {scope: 'N/period'}. A request spends one
+token from each of its buckets, and is answered 429 with Retry-After when
+any of them is empty (spending none). An anonymous request has one bucket,
+for its IP address. An authenticated one draws on its player's bucket and
+on one its IP address shares between all the players behind it, which
+holds THROTTLE_IP_FACTOR times as many tokens so a classroom behind one
+NAT is not limited to a single player's rate, while cycling through
+accounts from one address still is limited.
+
+A bucket is one (tokens, timestamp) pair, dropped once it would have
+refilled: a missing bucket is a full one, so idle clients cost nothing.
+THROTTLE_STORE picks where buckets live. LocalBucketStore keeps them in a
+dict in this process. With several gunicorn workers use CacheBucketStore,
+which keeps them in the THROTTLE_CACHE_ALIAS cache (Redis in
+docker-compose.yaml) so every worker draws on the same buckets.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache
+def parse_rate(rate):
+    """'10/min' -> (10, 60): bucket size and seconds to refill it."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def take(state, capacity, period, now):
+    """
+    Spends a token from a bucket in state (None when full). Returns
+    (allowed, retry_after, new state, seconds until the new state is full).
+    """
+    refill = capacity / period
+    if state is None:
+        tokens = capacity
+    else:
+        tokens, stamp = state
+        tokens = min(capacity, tokens + (now - stamp) * refill)
+    if tokens < 1:
+        return False, (1 - tokens) / refill, None, None
+    tokens -= 1
+    return True, None, (tokens, now), (capacity - tokens) / refill
+
+
+def take_all(states, buckets, now):
+    """
+    take() for every (key, capacity, period) bucket, all or none. Returns
+    (allowed, retry_after, [(new state, seconds until full)] when allowed).
+    """
+    taken, waits = [], []
+    for state, (_, capacity, period) in zip(states, buckets):
+        allowed, retry_after, state, full_in = take(state, capacity, period, now)
+        if allowed:
+            taken.append((state, full_in))
+        else:
+            waits.append(retry_after)
+    if waits:
+        return False, max(waits), None
+    return True, None, taken
+
+
+class BucketStore:
+    def consume(self, buckets, now):
+        """
+        Takes a token from each (key, capacity, period) bucket if all have
+        one. Returns (allowed, seconds until they all do).
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LocalBucketStore(BucketStore):
+    """
+    Buckets in one dict per scope, ordered by last use. Expired buckets are
+    swept from the front, so none outlives its last use by more than the
+    scope's period.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.scopes = {}
+
+    def consume(self, buckets, now):
+        with self.lock:
+            entries = [self.sweep(key[0], now).get(key) for key, _, _ in buckets]
+            allowed, retry_after, taken = take_all([e[:2] if e else None for e in entries], buckets, now)
+            if allowed:
+                for (key, _, _), (state, full_in) in zip(buckets, taken):
+                    scope = self.scopes[key[0]]
+                    scope[key] = (*state, now + full_in)
+                    scope.move_to_end(key)
+        return allowed, retry_after
+
+    def sweep(self, scope, now):
+        """The scope's buckets, without those that have refilled by now."""
+        buckets = self.scopes.get(scope)
+        if buckets is None:
+            buckets = self.scopes[scope] = OrderedDict()
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if oldest[2] > now:
+                break
+            buckets.popitem(last=False)
+        return buckets
+
+    def clear(self):
+        with self.lock:
+            self.scopes.clear()
+
+
+# take_all() as one Redis script, so workers spending from the same buckets
+# never overwrite each other. KEYS are the buckets (hashes of tokens and
+# stamp); ARGV is now, then capacity and period per key.
+TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local tokens = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'stamp')
+    local t = capacity
+    if state[1] then
+        t = math.min(capacity, tonumber(state[1]) + (now - tonumber(state[2])) * capacity / period)
+    end
+    if t < 1 then
+        wait = math.max(wait, (1 - t) * period / capacity)
+    end
+    tokens[i] = t
+end
+if wait > 0 then
+    return {0, tostring(wait)}
+end
+for i, key in ipairs(KEYS) do
+    local capacity, period = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    local t = tokens[i] - 1
+    redis.call('HSET', key, 'tokens', tostring(t), 'stamp', ARGV[1])
+    redis.call('EXPIRE', key, math.ceil((capacity - t) * period / capacity))
+end
+return {1, ''}
+"""
+
+
+class CacheBucketStore(BucketStore):
+    """
+    Buckets in a Django cache, expiring with the cache timeout. On Django's
+    RedisCache a token is taken by one atomic script, so concurrent workers
+    never spend more than a bucket holds. Other backends read and write
+    under a lock that only covers this process: workers racing on the same
+    bucket there can occasionally get an extra token.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        self.lock = threading.Lock()
+        self.script = None
+        client = getattr(self.cache, '_cache', None)
+        if hasattr(client, 'get_client'):
+            self.script = client.get_client(write=True).register_script(TAKE_SCRIPT)
+
+    def consume(self, buckets, now):
+        keys = ['throttle:' + ':'.join(key) for key, _, _ in buckets]
+        if self.script is not None:
+            allowed, retry_after = self.script(
+                keys=[self.cache.make_and_validate_key(key) for key in keys], args=[repr(now), *(str(n) for _, capacity, period in buckets for n in (capacity, period))],
+            )
+            return bool(allowed), float(retry_after) if not allowed else None
+
+        with self.lock:
+            states = self.cache.get_many(keys)
+            allowed, retry_after, taken = take_all([states.get(key) for key in keys], buckets, now)
+            if allowed:
+                for key, (state, full_in) in zip(keys, taken):
+                    self.cache.set(key, state, timeout=math.ceil(full_in))
+        return allowed, retry_after
+
+    def clear(self):
+        self.cache.clear()
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = import_string(settings.THROTTLE_STORE)()
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttles views by their throttle_scope, or by the subclass's scope."""
+    scope = None
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None) or self.scope
+
+    def get_buckets(self, request, scope, capacity, period):
+        ip = self.get_ident(request)
+        if request.user and request.user.is_authenticated:
+            return [
+                ((scope, f'user:{request.user.pk}'), capacity, period),
+                ((scope, f'players-ip:{ip}'), capacity * settings.THROTTLE_IP_FACTOR, period),
+            ]
+        return [((scope, f'ip:{ip}'), capacity, period)]
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        rate = settings.THROTTLE_RATES.get(scope) if scope else None
+        if rate is None:
+            return True
+        capacity, period = parse_rate(rate)
+        allowed, self.retry_after = get_store().consume(
+            self.get_buckets(request, scope, capacity, period), time.time(),
+        )
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginThrottle(TokenBucketThrottle):
+    scope = 'login'
+
+
+class RegisterThrottle(TokenBucketThrottle):
+    scope = 'register'
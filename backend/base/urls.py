@@ -1,10 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
-    GameViewSet, PlayerUpdateView, SubmitScoreView, 
-    login_view, register_user, MyTokenObtainPairView
+    GameViewSet, PlayerUpdateView, PlayerScoresView, SubmitScoreView, BatchSubmitScoreView,
+    BatchRegisterView, login_view, register_user, MyTokenObtainPairView
 )
-from . import views 
+from . import views, async_views
 
 router = DefaultRouter()
 router.register(r'games', GameViewSet, basename='games')
@@ -12,9 +14,23 @@ router.register(r'games', GameViewSet, basename='games')
 urlpatterns = [
     path('login/', login_view, name='login'),
     path('register/', register_user, name='register'),
+    path('register/batch/', BatchRegisterView.as_view(), name='register_batch'),
     path('token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('submit-score/', SubmitScoreView.as_view(), name='submit_score'),
+    path('submit-scores/batch/', BatchSubmitScoreView.as_view(), name='submit_scores_batch'),
     path('profile/update/', PlayerUpdateView.as_view(), name='player-update'),
+    path('players/me/scores/', PlayerScoresView.as_view(), name='player-scores'),
     path('api/health/', views.health_check, name='health_check'),
+    path('metrics/', views.metrics_view, name='metrics'),
     path('', include(router.urls)), 
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path('api/health/', async_views.health_check, name='health_check'),
+        path('games/', async_views.game_list, name='games-list'),
+        path('games/<str:pk>/', async_views.game_detail, name='games-detail'),
+        path('games/<str:pk>/leaderboard/', async_views.game_leaderboard, name='games-leaderboard'),
+        path('events/records/', async_views.record_events, name='record-events'),
+    ] + urlpatterns
@@ -1,14 +1,52 @@
+import datetime
+import uuid
+from collections import Counter
+
 from rest_framework import viewsets, status, generics
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.conf import settings
 from django.contrib.auth import authenticate
-from .models import Game, Player
-from .serializers import GameSerializer, PlayerSerializer
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from .models import Game, Player, ScoreEntry, ScoreRollup
+from .serializers import (
+    GameSerializer, PlayerSerializer, RosterEntrySerializer, ScoreEntrySerializer, ScoreRollupSerializer,
+    ScoreSubmissionSerializer,
+)
 from .permissions import IsAdminOrReadOnly
+from .pagination import KeysetPagination
+from .authentication import CachedUserJWTAuthentication
+from .hashers import hash_passwords
+from .throttling import LoginThrottle, RegisterThrottle
+from . import cache as api_cache
+from . import events
+from . import metrics
+from . import replays
+from . import replicas
+
+def leaderboard_bucket(request, window):
+    """The bucket a windowed leaderboard shows: ?date's, or today's. None if ?date is malformed."""
+    day = timezone.localdate()
+    if 'date' in request.GET:
+        try:
+            day = datetime.date.fromisoformat(request.GET['date'])
+        except ValueError:
+            return None
+    return ScoreRollup.bucket_for(window, day)
+
+def leaderboard_period(request, window=None, **kwargs):
+    """Cache period of a windowed leaderboard: its bucket, which starts at local midnight."""
+    bucket = leaderboard_bucket(request, window)
+    if bucket is None:
+        return None
+    return bucket.isoformat(), timezone.make_aware(datetime.datetime.combine(bucket, datetime.time.min))
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
@@ -20,6 +58,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    throttle_scope = 'login'
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -29,19 +68,75 @@ def health_check(request):
     """
     return Response({"status": "ok"}, status=status.HTTP_200_OK)
 
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint for the MetricsMiddleware histograms
+    """
+    body, content_type = metrics.exposition()
+    return HttpResponse(body, content_type=content_type)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 def register_user(request):
     serializer = PlayerSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
-        user.is_staff = False 
-        user.save()
+        user = serializer.save(is_staff=False)
+        replicas.pin(user.id)
         return Response({"success": "User created", "id": user.id}, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class BatchRegisterView(APIView):
+    """
+    Creates a class roster in one request for a teacher (staff) account.
+    Accepts a list of {username, email, password}; either every player is
+    created or none is. Passwords are hashed in a process pool, so a roster
+    of thirty costs roughly one hash per core instead of thirty in a row.
+    """
+    permission_classes = [IsAdminUser]
+    max_players = 200
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response({"error": "Expected a list of players"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.max_players:
+            return Response(
+                {"error": f"At most {self.max_players} players per roster"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = RosterEntrySerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        rows = serializer.validated_data
+
+        usernames = [r['username'] for r in rows]
+        emails = [r['email'] for r in rows]
+        taken_usernames = set(Player.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(Player.objects.filter(email__in=emails).values_list('email', flat=True))
+        taken_usernames.update(u for u, n in Counter(usernames).items() if n > 1)
+        taken_emails.update(e for e, n in Counter(emails).items() if n > 1)
+        if taken_usernames or taken_emails:
+            return Response({
+                "error": "Usernames or emails already in use",
+                "usernames": sorted(taken_usernames),
+                "emails": sorted(taken_emails),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        hashes = hash_passwords([r['password'] for r in rows])
+        players = [
+            Player(username=r['username'], email=r['email'], password=password_hash, is_staff=False)
+            for r, password_hash in zip(rows, hashes)
+        ]
+        Player.objects.bulk_create(players)
+        return Response({
+            "created": len(players),
+            "players": [{"id": p.id, "username": p.username} for p in players],
+        }, status=status.HTTP_201_CREATED)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def login_view(request):
     username = request.data.get('username')
     password = request.data.get('password')
@@ -52,32 +147,274 @@ def login_view(request):
     return Response({"error": "Invalid Credentials"}, status=status.HTTP_400_BAD_REQUEST)
 
 class GameViewSet(viewsets.ModelViewSet):
-    queryset = Game.objects.all()
+    queryset = Game.objects.select_related('high_score_player')
     serializer_class = GameSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # Load only what GameSerializer renders; the joined player row is
+            # trimmed to its username.
+            queryset = queryset.only(
+                'id', 'name', 'image', 'image_variants', 'high_score',
+                'high_score_player__id', 'high_score_player__username',
+            )
+        return queryset
+
+    @method_decorator(replicas.use_replica)
+    @method_decorator(api_cache.conditional(lambda **kwargs: api_cache.GAMES_SCOPE))
+    def list(self, request, *args, **kwargs):
+        def build():
+            serializer = self.get_serializer(self.filter_queryset(self.get_queryset()), many=True)
+            return list(serializer.data)
+        return Response(api_cache.get_or_build(api_cache.GAMES_SCOPE, request, build))
+
+    @method_decorator(replicas.use_replica)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=True, methods=['get'])
+    @method_decorator(replicas.use_replica)
+    @method_decorator(api_cache.conditional(lambda pk=None, **kwargs: api_cache.leaderboard_scope(pk)))
+    def leaderboard(self, request, pk=None):
+        """
+        Top scores for one game, best first. Served from the (game, -score, id)
+        index; pass the returned `next` cursor to read further down the board.
+        """
+        game = self.get_object()
+
+        def build():
+            paginator = KeysetPagination(ordering=('score', True))
+            entries = (
+                ScoreEntry.objects.filter(game=game)
+                .select_related('player', 'game')
+                .only('id', 'score', 'created_at', 'player__username', 'game__name')
+            )
+            page = paginator.paginate_queryset(entries, request)
+            serializer = ScoreEntrySerializer(page, many=True)
+            return paginator.get_paginated_data(list(serializer.data))
+        return Response(api_cache.get_or_build(api_cache.leaderboard_scope(game.pk), request, build))
+
+    @action(detail=True, methods=['get'], url_path=r'leaderboard/(?P<window>daily|weekly|all-time)')
+    @method_decorator(replicas.use_replica)
+    @method_decorator(api_cache.conditional(
+        lambda pk=None, **kwargs: api_cache.leaderboard_scope(pk), period_for=leaderboard_period,
+    ))
+    def windowed_leaderboard(self, request, pk=None, window=None):
+        """
+        Each player's best score for the current day, week or all time, best
+        first. ?date=YYYY-MM-DD picks the window containing that day instead.
+        Read from the ScoreRollup (game, window, bucket, -best_score, id) index.
+        """
+        game = self.get_object()
+        bucket = leaderboard_bucket(request, window)
+        if bucket is None:
+            return Response({"error": "date must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            paginator = KeysetPagination(ordering=('best_score', True))
+            rows = (
+                ScoreRollup.objects.filter(game=game, window=window, bucket=bucket)
+                .select_related('player')
+                .only('id', 'best_score', 'player__username')
+            )
+            page = paginator.paginate_queryset(rows, request)
+            data = paginator.get_paginated_data(list(ScoreRollupSerializer(page, many=True).data))
+            return {"window": window, "bucket": bucket.isoformat(), **data}
+        return Response(api_cache.get_or_build(
+            api_cache.leaderboard_scope(game.pk), request, build, leaderboard_period(request, window),
+        ))
+
+class PlayerScoresView(APIView):
+    """
+    The authenticated player's score history, newest first, read in index order
+    from (player, -id). Optional ?game=<id> narrows it to one game using the
+    (player, game, -id) index.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @method_decorator(replicas.use_replica)
+    def get(self, request):
+        paginator = KeysetPagination()
+        entries = (
+            ScoreEntry.objects.filter(player_id=request.user.pk)
+            .select_related('player', 'game')
+            .only('id', 'score', 'created_at', 'player__username', 'game__name')
+        )
+        game_id = request.query_params.get('game')
+        if game_id:
+            try:
+                entries = entries.filter(game_id=uuid.UUID(game_id))
+            except ValueError:
+                return Response({"error": "Invalid game id"}, status=status.HTTP_400_BAD_REQUEST)
+        page = paginator.paginate_queryset(entries, request)
+        serializer = ScoreEntrySerializer(page, many=True)
+        return Response(paginator.get_paginated_data(serializer.data))
+
 class PlayerUpdateView(generics.RetrieveUpdateAPIView):
     queryset = Player.objects.all()
     serializer_class = PlayerSerializer
     permission_classes = [IsAuthenticated]
+    # Needs the real Player row, so it never authenticates from token claims alone.
+    authentication_classes = [CachedUserJWTAuthentication]
 
     def get_object(self):
-        return self.request.user
+        if self.request.method in SAFE_METHODS:
+            return self.request.user
+        # Writes save every field, so start from the current row, not a cached copy.
+        return Player.objects.get(pk=self.request.user.pk)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        replicas.pin(self.request.user.pk)
     
 class SubmitScoreView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'submit'
 
     def post(self, request):
         game_name = request.data.get('game_name')
-        new_score = request.data.get('score')
-        
         try:
-            game = Game.objects.get(name=game_name)
-            if new_score > game.high_score:
-                game.high_score = new_score
-                game.high_score_player = request.user
-                game.save()
-                return Response({"message": "New High Score!"}, status=status.HTTP_200_OK)
-            return Response({"message": "Score submitted"}, status=status.HTTP_200_OK)
-        except Game.DoesNotExist:
-            return Response({"error": "Game not found"}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            new_score = int(request.data.get('score'))
+        except (TypeError, ValueError):
+            return Response({"error": "Score must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        game_id = Game.objects.filter(name=game_name).values_list('id', flat=True).first()
+        if game_id is None:
+            return Response({"error": "Game not found"}, status=status.HTTP_404_NOT_FOUND)
+        error = replays.check_score(game_name, new_score, request.data.get('replay'))
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            entry = ScoreEntry.objects.create(player_id=request.user.pk, game_id=game_id, score=new_score)
+            ScoreRollup.objects.record_scores([(game_id, request.user.pk, new_score, entry.created_at)])
+            is_record = Game.objects.claim_high_score(game_id, new_score, request.user.pk)
+
+        replicas.pin(request.user.pk)
+        if is_record:
+            api_cache.invalidate(api_cache.GAMES_SCOPE, api_cache.leaderboard_scope(game_id))
+            events.publish_record(game_id, game_name, new_score, request.user.pk, request.user.username)
+            return Response({"message": "New High Score!"}, status=status.HTTP_200_OK)
+        api_cache.invalidate(api_cache.leaderboard_scope(game_id))
+        return Response({"message": "Score submitted"}, status=status.HTTP_200_OK)
+
+class BatchSubmitScoreView(APIView):
+    """
+    Sync endpoint for clients that played offline. Accepts a list of
+    {game_name, score, client_timestamp, idempotency_key, replay} records and
+    applies them in one transaction: one bulk INSERT for the history and at
+    most one record compare-and-set per game. Records whose idempotency_key was
+    already uploaded by this player are skipped, so a retried sync is harmless.
+    Records whose replay does not check out, or whose client_timestamp falls
+    outside the offline window, are reported back and skipped.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'submit-batch'
+    max_records = 5000
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response({"error": "Expected a list of score records"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.max_records:
+            return Response(
+                {"error": f"At most {self.max_records} records per batch"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = ScoreSubmissionSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        records = serializer.validated_data
+
+        names = {r['game_name'] for r in records}
+        game_ids = dict(Game.objects.filter(name__in=names).values_list('name', 'id'))
+        keys = {r['idempotency_key'] for r in records}
+        seen = set(
+            ScoreEntry.objects.filter(player_id=request.user.pk, idempotency_key__in=keys)
+            .values_list('idempotency_key', flat=True)
+        )
+
+        # Plays are bucketed into windowed leaderboards by client_timestamp, so
+        # it may only date them within the offline window, give or take skew.
+        now = timezone.now()
+        earliest = now - datetime.timedelta(days=settings.SCORE_OFFLINE_WINDOW_DAYS)
+        latest = now + datetime.timedelta(seconds=settings.SCORE_CLOCK_SKEW_SECONDS)
+
+        fresh = []
+        unknown = set()
+        duplicates = 0
+        rejected = []
+        for r in records:
+            if r['game_name'] not in game_ids:
+                unknown.add(r['game_name'])
+                continue
+            if r['idempotency_key'] in seen:
+                duplicates += 1
+                continue
+            seen.add(r['idempotency_key'])
+            played_at = r.get('client_timestamp')
+            if played_at is not None and not earliest <= played_at <= latest:
+                rejected.append({"idempotency_key": r['idempotency_key'], "error": "client_timestamp is out of range"})
+                continue
+            fresh.append(r)
+        errors = replays.check_scores([(r['game_name'], r['score'], r.get('replay')) for r in fresh])
+
+        entries = []
+        for r, error in zip(fresh, errors):
+            if error:
+                rejected.append({"idempotency_key": r['idempotency_key'], "error": error})
+                continue
+            entries.append(ScoreEntry(
+                player_id=request.user.pk,
+                game_id=game_ids[r['game_name']],
+                score=r['score'],
+                client_timestamp=r.get('client_timestamp'),
+                idempotency_key=r['idempotency_key'],
+            ))
+
+        with transaction.atomic():
+            # Serialises this player's batches, so a concurrent retry of the same
+            # batch has either committed (and its keys are found here) or waits.
+            Player.objects.select_for_update().filter(pk=request.user.pk).exists()
+            raced = set(
+                ScoreEntry.objects.filter(
+                    player_id=request.user.pk, idempotency_key__in=[e.idempotency_key for e in entries],
+                ).values_list('idempotency_key', flat=True)
+            )
+            if raced:
+                duplicates += len(raced)
+                entries = [e for e in entries if e.idempotency_key not in raced]
+            best = {}
+            for e in entries:
+                best[e.game_id] = max(best.get(e.game_id, e.score), e.score)
+
+            ScoreEntry.objects.bulk_create(entries)
+            ScoreRollup.objects.record_scores(
+                (e.game_id, e.player_id, e.score, e.client_timestamp or e.created_at) for e in entries
+            )
+            records_set = [
+                game_id for game_id, score in best.items()
+                if Game.objects.claim_high_score(game_id, score, request.user.pk)
+            ]
+
+        if best:
+            replicas.pin(request.user.pk)
+            scopes = [api_cache.leaderboard_scope(game_id) for game_id in best]
+            if records_set:
+                scopes.append(api_cache.GAMES_SCOPE)
+            api_cache.invalidate(*scopes)
+
+        names_by_id = {game_id: name for name, game_id in game_ids.items()}
+        for game_id in records_set:
+            events.publish_record(
+                game_id, names_by_id[game_id], best[game_id], request.user.pk, request.user.username,
+            )
+        return Response({
+            "accepted": len(entries),
+            "duplicates": duplicates,
+            "unknown_games": sorted(unknown),
+            "rejected": rejected,
+            "new_high_scores": sorted(names_by_id[game_id] for game_id in records_set),
+        }, status=status.HTTP_200_OK)
\ No newline at end of file
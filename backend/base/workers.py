@@ -0,0 +1,21 @@
+"""Process pools for CPU-bound or parallel database work outside the request thread."""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def setup_django():
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproj.settings')
+    django.setup()
+
+
+def process_pool(workers):
+    # spawn, not fork: the web server process runs threads, and forking it
+    # could copy a held lock into the child.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=setup_django,
+    )
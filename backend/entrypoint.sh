@@ -1,13 +1,18 @@
 #!/bin/sh
 set -e
 
-echo "Applying database migrations..."
-python manage.py migrate
+# Start of the boot, for the phase timings `boot` and gunicorn print.
+BOOT_STARTED=$(date +%s.%N)
+export BOOT_STARTED
 
-echo "Loading data dump..."
-python manage.py loaddata datadump.json
+# One Python process for every start-up step: migrations, the seed import,
+# cover art variants and collectstatic, each skipped when it has nothing to do.
+python manage.py boot
 
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    # Metric files from a previous run would be merged into this one's.
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
 
-exec "$@"
\ No newline at end of file
+exec "$@"
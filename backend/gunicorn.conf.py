@@ -0,0 +1,57 @@
+import os
+import time
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+
+def available_cpus():
+    """CPUs this container may use: its cgroup quota if it has one, else the host's count."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, round(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return os.cpu_count() or 1
+
+
+cpus = available_cpus()
+
+# SERVER_MODE=asgi serves myproj.asgi under uvicorn workers so slow clients
+# don't pin a worker; the default serves WSGI from threaded workers.
+if os.environ.get("SERVER_MODE", "wsgi") == "asgi":
+    wsgi_app = "myproj.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    # One event loop per core.
+    workers = int(os.environ.get("GUNICORN_WORKERS", cpus))
+else:
+    wsgi_app = "myproj.wsgi:application"
+    # Requests mostly wait on Postgres and Redis, so a few threads per worker
+    # keep the cores busy. Capped so every worker's DB pool (DB_POOL_MAX_SIZE)
+    # fits in Postgres' max_connections.
+    workers = int(os.environ.get("GUNICORN_WORKERS", min(cpus + 1, 8)))
+    threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+# Import Django once in the master and fork workers from it: workers are up
+# in milliseconds and share the loaded code's memory pages. Nothing connects
+# to the database or starts a pool at import, so no handle is shared.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") != "False"
+
+# Longer than nginx's upstream keepalive_timeout, so nginx is the side that
+# closes idle connections. Only threaded and uvicorn workers keep them open.
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "75"))
+
+
+def post_worker_init(worker):
+    # entrypoint.sh exports BOOT_STARTED, so this is the container's time to serve.
+    if "BOOT_STARTED" in os.environ:
+        worker.log.info("boot: worker serving %.2fs after start", time.time() - float(os.environ["BOOT_STARTED"]))
+
+
+def child_exit(server, worker):
+    # With PROMETHEUS_MULTIPROC_DIR set, drop the exited worker's live series.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -4,6 +4,11 @@ import sys
 
 def main():
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproj.settings')
+    # DB_STATEMENT_TIMEOUT_MS is meant for web requests (gunicorn loads
+    # myproj.wsgi/asgi, never this file). migrate, import_scores, rebuild_rollups
+    # and generate_scores can legitimately run longer, so commands get their own
+    # limit, none by default.
+    os.environ['DB_STATEMENT_TIMEOUT_MS'] = os.environ.get('DB_COMMAND_STATEMENT_TIMEOUT_MS', '0')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -4,4 +4,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproj.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after the app registry is ready.
+from base.events import websocket_app  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Django has no WebSocket handling of its own; the records channel is served directly.
+    if scope['type'] == 'websocket':
+        await websocket_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -1,3 +1,4 @@
+import copy
 from pathlib import Path
 from datetime import timedelta
 import os
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'base.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -36,11 +38,41 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Share of requests timed by base.metrics.MetricsMiddleware (0 disables it).
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '0'))
+
+# JWT_AUTH_MODE=stateless authenticates from the access token's claims
+# without loading the Player row (see base/authentication.py).
+JWT_AUTH_MODE = os.environ.get('JWT_AUTH_MODE', 'db')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'base.authentication.TokenUserAuthentication'
+        if JWT_AUTH_MODE == 'stateless'
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': ('base.throttling.TokenBucketThrottle',),
+    # Behind nginx, the client address is the last X-Forwarded-For hop.
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if 'NUM_PROXIES' in os.environ else None,
+}
+
+# Token buckets per route (base/throttling.py): 'N/period' allows bursts of N
+# and N per period sustained. Override as THROTTLE_RATES="login=5/min,submit=60/min".
+THROTTLE_RATES = {
+    'login': '10/min',
+    'register': '5/min',
+    'submit': '120/min',
+    'submit-batch': '30/min',
 }
+THROTTLE_RATES.update(
+    item.split('=', 1) for item in os.environ.get('THROTTLE_RATES', '').split(',') if item
+)
+# Authenticated requests also draw on a bucket per IP address, shared by the
+# players behind it and THROTTLE_IP_FACTOR times the size of a player's.
+THROTTLE_IP_FACTOR = int(os.environ.get('THROTTLE_IP_FACTOR', '5'))
+# LocalBucketStore is per process; CacheBucketStore shares buckets through
+# the 'throttle' cache, which must then be a shared store such as Redis.
+THROTTLE_STORE = os.environ.get('THROTTLE_STORE', 'base.throttling.LocalBucketStore')
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
@@ -96,10 +128,48 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'myproj.wsgi.application'
+ASGI_APPLICATION = 'myproj.asgi.application'
+
+# 'wsgi' runs sync gunicorn workers; 'asgi' runs uvicorn workers and routes the
+# hot read endpoints to the async views in base/async_views.py.
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+ASYNC_READ_VIEWS = SERVER_MODE == 'asgi'
+
+# Cover art variants (base/images.py), rendered after an upload on a pool of
+# IMAGE_VARIANT_WORKERS processes, or inline when that is 0.
+IMAGE_VARIANT_WIDTHS = [200, 400, 800]
+IMAGE_VARIANT_FORMATS = ['avif', 'webp']
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', '1'))
+
+# Score replays (base/replays): 'optional' verifies the logs clients send,
+# 'required' also rejects scores of replayable games sent without one, 'off'
+# accepts every score as claimed.
+REPLAY_VERIFICATION = os.environ.get('REPLAY_VERIFICATION', 'optional')
+REPLAY_VERIFY_WORKERS = int(os.environ.get('REPLAY_VERIFY_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Batch uploads date plays by their client_timestamp, which must fall within
+# the last SCORE_OFFLINE_WINDOW_DAYS and at most SCORE_CLOCK_SKEW_SECONDS ahead.
+SCORE_OFFLINE_WINDOW_DAYS = int(os.environ.get('SCORE_OFFLINE_WINDOW_DAYS', '14'))
+SCORE_CLOCK_SKEW_SECONDS = int(os.environ.get('SCORE_CLOCK_SKEW_SECONDS', '300'))
+
+# Record push (base/events.py). LocalBroker only reaches this process; use
+# base.events.PostgresBroker when running several ASGI workers on Postgres.
+EVENTS_BROKER = os.environ.get('EVENTS_BROKER', 'base.events.LocalBroker')
+EVENTS_HEARTBEAT = int(os.environ.get('EVENTS_HEARTBEAT', '15'))
 
 DB_ENGINE = os.environ.get('DB_ENGINE')
 
 if DB_ENGINE == 'django.db.backends.postgresql':
+    # Production profile: a psycopg connection pool per worker process (or, with
+    # DB_POOL=False, persistent connections with health checks) so requests
+    # don't pay a TCP + auth handshake, plus server-side timeouts so a runaway
+    # query or an abandoned transaction can't hold locks indefinitely. The
+    # statement timeout is for web requests only: manage.py replaces it with
+    # DB_COMMAND_STATEMENT_TIMEOUT_MS (0, no limit, by default) for commands.
+    DB_POOL = os.environ.get('DB_POOL', 'True') != 'False'
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '5000'))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.environ.get('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', '10000'))
+
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
@@ -108,16 +178,86 @@ if DB_ENGINE == 'django.db.backends.postgresql':
             'PASSWORD': os.environ.get('DB_PASSWORD'),
             'HOST': os.environ.get('DB_HOST'),
             'PORT': os.environ.get('DB_PORT', '5432'),
+            # Pooled connections are returned to the pool instead of being kept
+            # open by Django, so CONN_MAX_AGE must stay 0 when the pool is on.
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'options': (
+                    f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} '
+                    f'-c idle_in_transaction_session_timeout={DB_IDLE_IN_TRANSACTION_TIMEOUT_MS}'
+                ),
+            },
         }
     }
+
+    if DB_POOL:
+        from psycopg_pool import ConnectionPool
+
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            # Validate a connection before handing it out, so a restarted db
+            # container doesn't surface as errors on the first requests.
+            'check': ConnectionPool.check_connection,
+        }
+
+    # Streaming replicas (base/replicas.py): DB_REPLICA_HOSTS=host[:port],...
+    # adds a replica_N alias per host, same database and credentials as default.
+    for i, replica in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+        host, _, port = replica.strip().partition(':')
+        DATABASES[f'replica_{i}'] = copy.deepcopy(DATABASES['default'])
+        DATABASES[f'replica_{i}'].update(HOST=host, PORT=port or DATABASES['default']['PORT'], TEST={'MIRROR': 'default'})
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # A file-backed test database lets concurrent test threads wait on
+            # SQLite's busy timeout instead of failing on shared-cache table locks.
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
         }
     }
 
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['base.replicas.ReplicaRouter']
+# How long a player's reads stay on the primary after they write. Pins are
+# kept in the throttle cache, which is shared between workers in compose.
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+REPLICA_PIN_CACHE_ALIAS = 'throttle'
+
+# Local memory is per process, which only suits a single worker (runserver,
+# tests). Gunicorn runs several, so docker-compose points CACHE_BACKEND at
+# Redis (django.core.cache.backends.redis.RedisCache): otherwise a score's
+# invalidation would only reach the worker that took it.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'game-hub'),
+    },
+    # Throttle buckets for base.throttling.CacheBucketStore.
+    'throttle': {
+        'BACKEND': os.environ.get('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('THROTTLE_CACHE_LOCATION', 'throttle'),
+    },
+    # Per-process on purpose: authenticated players are read on every request.
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-users',
+    },
+}
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', '300'))
+
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+AUTH_USER_CACHE_ALIAS = 'auth'
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', '30'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -133,6 +273,27 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PASSWORD_HASHER=argon2 hashes new passwords with tuned Argon2id. PBKDF2
+# stays in the list so existing hashes still verify and are upgraded on login.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', '2'))
+ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', '19456'))  # KiB
+ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', '1'))
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'base.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if PASSWORD_HASHER == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(2))
+
+# Processes used to hash a batch of roster passwords (0 or 1 hashes inline).
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import api, { API_URL } from "../services/api";
+import api, { API_URL, LIVE_RECORDS } from "../services/api";
 import type { Game } from "../models/types";
 import SnakeGame from "../games/SnakeGame";
 import PixelMathGame from "../games/Pencil";
@@ -11,6 +11,9 @@ import BlackjackGame from "../games/Blackjack";
 import MoleGame from "../games/Mole";
 import KangarooGame from "../games/Kangaroo";
 
+// Cards fill the row on phones and are a few hundred pixels wide otherwise.
+const CARD_IMAGE_SIZES = "(max-width: 640px) 100vw, 400px";
+
 export default function GamesHub() {
   const [games, setGames] = useState<Game[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
@@ -33,6 +36,27 @@ export default function GamesHub() {
       });
   }, []);
 
+  useEffect(() => {
+    // Record changes are pushed by the server in ASGI deployments only; without
+    // the stream the list simply stays as fetched.
+    if (!LIVE_RECORDS) return;
+    const source = new EventSource(`${API_URL}/events/records/`);
+    // EventSource would retry forever on its own; after a failure the list
+    // stays as fetched, as it does without the stream.
+    source.onerror = () => source.close();
+    source.addEventListener("record", (event) => {
+      const record: Game = JSON.parse((event as MessageEvent).data);
+      setGames((prevGames) =>
+        prevGames.map((g) =>
+          g.id === record.id && (g.high_score ?? 0) < (record.high_score ?? 0)
+            ? { ...g, ...record }
+            : g
+        )
+      );
+    });
+    return () => source.close();
+  }, []);
+
   const getImageUrl = (imagePath?: string | null) => {
     if (!imagePath) return "https://via.placeholder.com/300x200?text=No+Image";
     if (imagePath.startsWith("http")) return imagePath;
@@ -41,11 +65,16 @@ export default function GamesHub() {
     return `${cleanBase}${cleanPath}`;
   };
 
-  const handleSubmitScore = async (gameName: string, score: number) => {
+  const handleSubmitScore = async (
+    gameName: string,
+    score: number,
+    replay?: string
+  ) => {
     try {
       await api.post("/submit-score/", {
         game_name: gameName,
         score: score,
+        replay: replay,
       });
 
       setGames((prevGames) =>
@@ -133,8 +162,8 @@ export default function GamesHub() {
           gameName={activeGame.name}
           currentHighScore={activeGame.high_score ?? 0}
           onClose={handleCloseGame}
-          onUpdateHighScore={(newScore) =>
-            handleSubmitScore(activeGame.name, newScore)
+          onUpdateHighScore={(newScore, replay) =>
+            handleSubmitScore(activeGame.name, newScore, replay)
           }
         />
       );
@@ -146,8 +175,8 @@ export default function GamesHub() {
           gameName={activeGame.name}
           currentHighScore={activeGame.high_score ?? 0}
           onClose={handleCloseGame}
-          onUpdateHighScore={(newScore: number) =>
-            handleSubmitScore(activeGame.name, newScore)
+          onUpdateHighScore={(newScore: number, replay?: string) =>
+            handleSubmitScore(activeGame.name, newScore, replay)
           }
         />
       );
@@ -256,11 +285,23 @@ export default function GamesHub() {
                   e.currentTarget.style.boxShadow = "0 4px 6px rgba(0,0,0,0.05)";
                 }}
               >
-                <img
-                  src={getImageUrl(game.image)}
-                  alt={game.name}
-                  style={imageStyle}
-                />
+                <picture>
+                  {Object.entries(game.image_srcset ?? {}).map(([format, srcSet]) => (
+                    <source
+                      key={format}
+                      type={`image/${format}`}
+                      srcSet={srcSet}
+                      sizes={CARD_IMAGE_SIZES}
+                    />
+                  ))}
+                  <img
+                    src={getImageUrl(game.image)}
+                    alt={game.name}
+                    style={imageStyle}
+                    loading="lazy"
+                    decoding="async"
+                  />
+                </picture>
 
                 <h3 style={titleStyle}>{game.name}</h3>
 
@@ -1,12 +1,13 @@
 /* eslint-disable react-hooks/exhaustive-deps */
 /* eslint-disable @typescript-eslint/no-explicit-any */
 import React, { useEffect, useRef } from "react";
+import { BALLOON, ReplayRecorder } from "../services/replay";
 
 interface BalloonGameProps {
   gameName: string;
   currentHighScore: number;
   onClose: () => void;
-  onUpdateHighScore: (score: number) => void;
+  onUpdateHighScore: (score: number, replay?: string) => void;
 }
 
 interface Point {
@@ -112,13 +113,13 @@ class Balloon {
   frameOffset: number;
   startTime: number;
 
-  constructor(x: number, y: number, number: number, speedMultiplier: number) {
+  constructor(x: number, y: number, number: number, speed: number) {
     this.startX = x;
     this.x = x;
     this.y = y;
     this.radius = 45;
     this.number = number;
-    this.baseSpeed = (Math.random() + 1.0) * speedMultiplier;
+    this.baseSpeed = speed;
     this.color =
       BALLOON_COLORS[Math.floor(Math.random() * BALLOON_COLORS.length)];
     this.wobbleSpeed = Math.random() * 0.03 + 0.02;
@@ -253,9 +254,14 @@ export default function BalloonGame({
     lives: 3,
     question: "",
     correctAnswer: 0,
-    balloons: [] as Balloon[],
+    // One slot per column; a wrong balloon that floats away leaves its slot empty.
+    balloons: [] as (Balloon | null)[],
     particles: [] as Particle[],
     buttons: [] as Button[],
+    // Gameplay draws come from the recorder's seeded RNG, in the order the
+    // server's replay makes them; frame counts game steps for the log.
+    recorder: null as ReplayRecorder | null,
+    frame: 0,
   });
 
   useEffect(() => {
@@ -286,6 +292,7 @@ export default function BalloonGame({
 
   const generateQuestion = () => {
     const state = gameState.current;
+    const rng = state.recorder!.rng;
     const opTypes = ["+"];
     const rangeMax = 10 + Math.floor(state.score / 2);
 
@@ -293,9 +300,9 @@ export default function BalloonGame({
     if (state.score > 15) opTypes.push("*");
     if (state.score > 25) opTypes.push("/");
 
-    const op = opTypes[Math.floor(Math.random() * opTypes.length)];
-    let num1 = Math.floor(Math.random() * rangeMax) + 1;
-    let num2 = Math.floor(Math.random() * rangeMax) + 1;
+    const op = opTypes[rng.below(opTypes.length)];
+    let num1 = rng.below(rangeMax) + 1;
+    let num2 = rng.below(rangeMax) + 1;
 
     if (op === "+") {
       state.correctAnswer = num1 + num2;
@@ -305,15 +312,13 @@ export default function BalloonGame({
       state.correctAnswer = num1 - num2;
       state.question = `${num1} - ${num2} = ?`;
     } else if (op === "*") {
-      const n1 =
-        Math.floor(Math.random() * (6 + Math.floor(state.score / 5))) + 1;
-      const n2 =
-        Math.floor(Math.random() * (6 + Math.floor(state.score / 5))) + 1;
+      const n1 = rng.below(6 + Math.floor(state.score / 5)) + 1;
+      const n2 = rng.below(6 + Math.floor(state.score / 5)) + 1;
       state.correctAnswer = n1 * n2;
       state.question = `${n1} x ${n2} = ?`;
     } else if (op === "/") {
-      num2 = Math.floor(Math.random() * 7) + 2; 
-      const ans = Math.floor(Math.random() * 9) + 2; 
+      num2 = rng.below(7) + 2;
+      const ans = rng.below(9) + 2;
       num1 = num2 * ans;
       state.correctAnswer = ans;
       state.question = `${num1} / ${num2} = ?`;
@@ -324,11 +329,12 @@ export default function BalloonGame({
 
   const spawnBalloons = () => {
     const state = gameState.current;
+    const rng = state.recorder!.rng;
     state.balloons = [];
     const answers = [state.correctAnswer];
 
     while (answers.length < 3) {
-      const offset = Math.floor(Math.random() * 11) - 5;
+      const offset = rng.below(11) - 5;
       const fake = state.correctAnswer + offset;
       if (
         fake !== state.correctAnswer &&
@@ -340,7 +346,7 @@ export default function BalloonGame({
     }
 
     for (let i = answers.length - 1; i > 0; i--) {
-      const j = Math.floor(Math.random() * (i + 1));
+      const j = rng.below(i + 1);
       [answers[i], answers[j]] = [answers[j], answers[i]];
     }
 
@@ -349,10 +355,9 @@ export default function BalloonGame({
     const speedMult = 1.0 + state.score * 0.05;
 
     for (let i = 0; i < 3; i++) {
-      const yPos = HEIGHT + 50 + Math.floor(Math.random() * 100);
-      state.balloons.push(
-        new Balloon(positions[i], yPos, answers[i], speedMult)
-      );
+      const yPos = HEIGHT + 50 + rng.below(100);
+      const speed = (rng.random() + 1.0) * speedMult;
+      state.balloons.push(new Balloon(positions[i], yPos, answers[i], speed));
     }
   };
 
@@ -368,6 +373,8 @@ export default function BalloonGame({
     state.lives = 3;
     state.particles = [];
     state.balloons = [];
+    state.recorder = new ReplayRecorder(BALLOON);
+    state.frame = 0;
     generateQuestion();
     state.state = "PLAYING";
   };
@@ -376,7 +383,7 @@ export default function BalloonGame({
     const state = gameState.current;
     if (state.score > state.highScore) {
       state.highScore = state.score;
-      onUpdateHighScore(state.highScore);
+      onUpdateHighScore(state.highScore, state.recorder?.encode());
     } else {
     }
   };
@@ -397,15 +404,11 @@ export default function BalloonGame({
     } else if (state.state === "GAMEOVER") {
       state.buttons[1].checkClick(); 
     } else if (state.state === "PLAYING") {
-      let clickedBalloon: Balloon | null = null;
-      for (const b of state.balloons) {
-        if (b.isClicked(pos)) {
-          clickedBalloon = b;
-          break;
-        }
-      }
+      const slot = state.balloons.findIndex((b) => b?.isClicked(pos));
+      const clickedBalloon = slot >= 0 ? state.balloons[slot] : null;
 
       if (clickedBalloon) {
+        state.recorder!.record(state.frame, slot);
         playPopSound();
         createExplosion(
           clickedBalloon.x,
@@ -517,25 +520,27 @@ export default function BalloonGame({
         ctx.fillStyle = "rgb(100, 255, 255)";
         ctx.fillText(state.question, WIDTH / 2, 55);
 
-        for (let i = state.balloons.length - 1; i >= 0; i--) {
+        // Move every balloon, then let them escape left to right; the
+        // server's replay steps a frame exactly like this.
+        state.frame += 1;
+        for (const b of state.balloons) b?.move();
+        for (let i = 0; i < state.balloons.length; i++) {
           const b = state.balloons[i];
-          b.move();
-          b.draw(ctx);
-
-          if (b.y < -50) {
-            if (b.number === state.correctAnswer) {
-              state.lives -= 1;
-              if (state.lives <= 0) {
-                saveHighScore();
-                state.state = "GAMEOVER";
-              } else {
-                generateQuestion();
-              }
-            } else {
-              state.balloons.splice(i, 1);
-            }
+          if (!b || b.y >= -50) continue;
+          if (b.number !== state.correctAnswer) {
+            state.balloons[i] = null;
+            continue;
           }
+          state.lives -= 1;
+          if (state.lives <= 0) {
+            saveHighScore();
+            state.state = "GAMEOVER";
+          } else {
+            generateQuestion();
+          }
+          break;
         }
+        for (const b of state.balloons) b?.draw(ctx);
       } else if (state.state === "GAMEOVER") {
         ctx.fillStyle = RED;
         ctx.font = "bold 80px 'Comic Sans MS', 'Arial'";
@@ -1,11 +1,12 @@
 /* eslint-disable react-hooks/set-state-in-effect */
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
+import { PENCIL, Random, ReplayRecorder } from "../services/replay";
 
 interface PixelMathGameProps {
   gameName: string;
   currentHighScore: number;
   onClose: () => void;
-  onUpdateHighScore?: (score: number) => void;
+  onUpdateHighScore?: (score: number, replay?: string) => void;
 }
 
 interface TileData {
@@ -309,18 +310,20 @@ const RAW_PATTERNS: PatternData[] = [
 ];
 
 
-const getRandomInt = (min: number, max: number) => {
-  return Math.floor(Math.random() * (max - min + 1)) + min;
+// Every draw below comes from the game's seeded RNG, in the order the
+// server's replay (backend/base/replays/pencil.py) makes them.
+const getRandomInt = (rng: Random, min: number, max: number) => {
+  return rng.below(max - min + 1) + min;
 };
 
-const generateMathProblem = (target: number): string => {
-  const op = Math.random() > 0.5 ? "+" : "-";
+const generateMathProblem = (rng: Random, target: number): string => {
+  const op = rng.random() > 0.5 ? "+" : "-";
   if (op === "+") {
-    const a = target > 1 ? getRandomInt(1, target - 1) : 0;
+    const a = target > 1 ? getRandomInt(rng, 1, target - 1) : 0;
     const b = target - a;
     return `${a} + ${b}`;
   } else {
-    const b = getRandomInt(1, 10);
+    const b = getRandomInt(rng, 1, 10);
     const a = target + b;
     return `${a} - ${b}`;
   }
@@ -343,10 +346,12 @@ const parseGridData = (patternData: string[]) => {
   return { grid, usedChars: Array.from(usedColors) };
 };
 
-const createPalette = (usedChars: string[]) => {
-  const pool = Array.from({ length: 50 }, (_, i) => i + 1).sort(
-    () => Math.random() - 0.5
-  );
+const createPalette = (rng: Random, usedChars: string[]) => {
+  const pool = Array.from({ length: 50 }, (_, i) => i + 1);
+  for (let i = pool.length - 1; i > 0; i--) {
+    const j = rng.below(i + 1);
+    [pool[i], pool[j]] = [pool[j], pool[i]];
+  }
 
   const charToAnswers: Record<string, number[]> = {};
   const paletteList: PaletteItem[] = [];
@@ -363,7 +368,7 @@ const createPalette = (usedChars: string[]) => {
       color: rgb(colorRGB[0], colorRGB[1], colorRGB[2]),
     });
 
-    if (Math.random() > 0.6) {
+    if (rng.random() > 0.6) {
       const ans2 = pool[poolIdx++];
       charToAnswers[char].push(ans2);
       paletteList.push({
@@ -394,20 +399,23 @@ export default function PixelMathGame({
   const [msgColor, setMsgColor] = useState("black");
   const [gameOver, setGameOver] = useState(false);
   const [patternName, setPatternName] = useState("");
+  const recorder = useRef<ReplayRecorder | null>(null);
 
   const startNewGame = useCallback(() => {
+    const rec = new ReplayRecorder(PENCIL);
+    const rng = rec.rng;
+    recorder.current = rec;
     setScore(0);
     setGameOver(false);
     setSelectedIdx(null);
     setMessage("Select a number -> Click the math!");
     setMsgColor("black");
 
-    const pattern =
-      RAW_PATTERNS[Math.floor(Math.random() * RAW_PATTERNS.length)];
+    const pattern = RAW_PATTERNS[rng.below(RAW_PATTERNS.length)];
     setPatternName(pattern.name);
 
     const { grid, usedChars } = parseGridData(pattern.data);
-    const { paletteList, charToAnswers } = createPalette(usedChars);
+    const { paletteList, charToAnswers } = createPalette(rng, usedChars);
 
     setPalette(paletteList);
 
@@ -419,9 +427,8 @@ export default function PixelMathGame({
       for (let c = 0; c < cols; c++) {
         const char = grid[r][c];
         const validNums = charToAnswers[char];
-        const chosenAns =
-          validNums[Math.floor(Math.random() * validNums.length)];
-        const equation = generateMathProblem(chosenAns);
+        const chosenAns = validNums[rng.below(validNums.length)];
+        const equation = generateMathProblem(rng, chosenAns);
         const visualRGB = COLORS[char];
 
         newTiles.push({
@@ -450,6 +457,7 @@ export default function PixelMathGame({
     const tile = tiles[tileIndex];
 
     if (tile.isPainted) return;
+    recorder.current?.record(0, tileIndex | (selectedBtn.ans << 8));
 
     if (tile.answer === selectedBtn.ans) {
       const updatedTiles = [...tiles];
@@ -461,7 +469,9 @@ export default function PixelMathGame({
 
       if (newScore > highScore) {
         setHighScore(newScore);
-        if (onUpdateHighScore) onUpdateHighScore(newScore);
+        if (onUpdateHighScore) {
+          onUpdateHighScore(newScore, recorder.current?.encode());
+        }
       }
 
       if (updatedTiles.every((t) => t.isPainted)) {
@@ -1,13 +1,42 @@
 /* eslint-disable @typescript-eslint/no-explicit-any */
 import { useEffect, useRef, useState, useCallback } from "react";
 import api from "../services/api";
+import { Random, ReplayRecorder, SNAKE } from "../services/replay";
 
 const CANVAS_SIZE = 600;
 const SCALE = 20;
+const GRID = CANVAS_SIZE / SCALE;
 const POINTS_PER_FOOD = 10;
 
 const SPEED_MAP: Record<string, number> = { Easy: 150, Medium: 100, Hard: 60 };
 const OBSTACLE_COUNT: Record<string, number> = { Easy: 0, Medium: 8, Hard: 15 };
+const DIFFICULTIES = Object.keys(SPEED_MAP);
+
+// Up, down, left, right: the order the server's replay numbers them in.
+const DIRS = [
+  [0, -1],
+  [0, 1],
+  [-1, 0],
+  [1, 0],
+];
+const RIGHT = 3;
+const START = [
+  [10, 10],
+  [9, 10],
+  [8, 10],
+];
+
+const contains = (cells: number[][], [x, y]: number[]) =>
+  cells.some((c) => c[0] === x && c[1] === y);
+
+// Draws x then y until the cell is free, as the server's replay does.
+const freeCell = (rng: Random, snake: number[][], obstacles: number[][]) => {
+  let cell: number[];
+  do {
+    cell = [rng.below(GRID), rng.below(GRID)];
+  } while (contains(snake, cell) || contains(obstacles, cell));
+  return cell;
+};
 
 const SNAKE_COLORS = [
   "lime",
@@ -54,15 +83,10 @@ export default function SnakeGame({
 }: Props) {
   const canvasRef = useRef<HTMLCanvasElement>(null);
 
-  const [snake, setSnake] = useState([
-    [10, 10],
-    [9, 10],
-    [8, 10],
-  ]);
+  const [snake, setSnake] = useState(START);
   const [food, setFood] = useState([15, 15]);
   const [obstacles, setObstacles] = useState<number[][]>([]);
-  const [dir, setDir] = useState([1, 0]);
-  const [nextDir, setNextDir] = useState([1, 0]);
+  const [dir, setDir] = useState(DIRS[RIGHT]);
   const [gameOver, setGameOver] = useState(false);
   const [score, setScore] = useState(0);
   const [paused, setPaused] = useState(false);
@@ -75,6 +99,18 @@ export default function SnakeGame({
   const [difficulty, setDifficulty] = useState("Medium");
   const [fruitShape, setFruitShape] = useState("Circle");
 
+  // The game itself lives in refs, so a tick runs exactly once and draws from
+  // the seeded RNG in the order the server's replay does; state mirrors it
+  // for rendering.
+  const recorder = useRef<ReplayRecorder | null>(null);
+  const snakeRef = useRef(START);
+  const foodRef = useRef([15, 15]);
+  const obstaclesRef = useRef<number[][]>([]);
+  const dirRef = useRef(RIGHT);
+  const nextDirRef = useRef(RIGHT);
+  const tickRef = useRef(0);
+  const scoreRef = useRef(0);
+
   const playBeep = (freq: number, duration: number) => {
     try {
       const audioCtx = new (window.AudioContext ||
@@ -93,52 +129,47 @@ export default function SnakeGame({
     }
   };
 
-  const generateItems = useCallback(
-    (currentSnake: number[][], count: number) => {
-      const newObstacles: number[][] = [];
-      for (let i = 0; i < count; i++) {
-        let x: number, y: number;
-        do {
-          x = Math.floor(Math.random() * (CANVAS_SIZE / SCALE));
-          y = Math.floor(Math.random() * (CANVAS_SIZE / SCALE));
-        } while (
-          currentSnake.some((s) => s[0] === x && s[1] === y) ||
-          newObstacles.some((o) => o[0] === x && o[1] === y)
-        );
-        newObstacles.push([x, y]);
-      }
-      return newObstacles;
-    },
-    []
-  );
-
   const startGame = () => {
-    const initialSnake = [
-      [10, 10],
-      [9, 10],
-      [8, 10],
-    ];
-    setSnake(initialSnake);
-    setDir([1, 0]);
-    setNextDir([1, 0]);
+    const rec = new ReplayRecorder(SNAKE, DIFFICULTIES.indexOf(difficulty));
+    const newObstacles: number[][] = [];
+    for (let i = 0; i < OBSTACLE_COUNT[difficulty]; i++) {
+      newObstacles.push(freeCell(rec.rng, START, newObstacles));
+    }
+    const newFood = freeCell(rec.rng, START, newObstacles);
+
+    recorder.current = rec;
+    snakeRef.current = START;
+    foodRef.current = newFood;
+    obstaclesRef.current = newObstacles;
+    dirRef.current = nextDirRef.current = RIGHT;
+    tickRef.current = 0;
+    scoreRef.current = 0;
+
+    setSnake(START);
+    setFood(newFood);
+    setObstacles(newObstacles);
+    setDir(DIRS[RIGHT]);
     setScore(0);
     setGameOver(false);
     setPaused(false);
     setRunning(true);
     setCountdown(2); 
-    setObstacles(generateItems(initialSnake, OBSTACLE_COUNT[difficulty]));
   };
 
   const endGame = useCallback(() => {
     setRunning(false);
     setGameOver(true);
     playBeep(200, 400);
-    if (score > 0) {
+    if (scoreRef.current > 0 && recorder.current) {
       api
-        .post("/submit-score/", { game_name: gameName, score: score })
+        .post("/submit-score/", {
+          game_name: gameName,
+          score: scoreRef.current,
+          replay: recorder.current.encode(),
+        })
         .catch(() => {});
     }
-  }, [score, gameName]);
+  }, [gameName]);
 
   useEffect(() => {
     if (countdown > 0 && running && !paused && !gameOver) {
@@ -153,63 +184,44 @@ export default function SnakeGame({
     if (!running || paused || gameOver || countdown > 0) return;
 
     const moveSnake = setInterval(() => {
-      setDir(nextDir);
-      setSnake((prev) => {
-        const head = prev[0];
-        const newHead = [head[0] + nextDir[0], head[1] + nextDir[1]];
-
-        if (
-          newHead[0] < 0 ||
-          newHead[0] >= CANVAS_SIZE / SCALE ||
-          newHead[1] < 0 ||
-          newHead[1] >= CANVAS_SIZE / SCALE
-        ) {
-          endGame();
-          return prev;
-        }
-        if (
-          prev.some((s) => s[0] === newHead[0] && s[1] === newHead[1]) ||
-          obstacles.some((o) => o[0] === newHead[0] && o[1] === newHead[1])
-        ) {
-          endGame();
-          return prev;
-        }
+      dirRef.current = nextDirRef.current;
+      const [dx, dy] = DIRS[dirRef.current];
+      const prev = snakeRef.current;
+      const obstacleCells = obstaclesRef.current;
+      const newHead = [prev[0][0] + dx, prev[0][1] + dy];
 
-        const newSnake = [newHead, ...prev];
-
-        if (newHead[0] === food[0] && newHead[1] === food[1]) {
-          setScore((s) => s + POINTS_PER_FOOD);
-          let newFood: number[];
-          do {
-            newFood = [
-              Math.floor(Math.random() * (CANVAS_SIZE / SCALE)),
-              Math.floor(Math.random() * (CANVAS_SIZE / SCALE)),
-            ];
-          } while (
-            newSnake.some((s) => s[0] === newFood[0] && s[1] === newFood[1]) ||
-            obstacles.some((o) => o[0] === newFood[0] && o[1] === newFood[1])
-          );
-          setFood(newFood);
-          playBeep(900, 50);
-        } else {
-          newSnake.pop();
-        }
-        return newSnake;
-      });
+      if (
+        newHead[0] < 0 ||
+        newHead[0] >= GRID ||
+        newHead[1] < 0 ||
+        newHead[1] >= GRID ||
+        contains(prev, newHead) ||
+        contains(obstacleCells, newHead)
+      ) {
+        clearInterval(moveSnake);
+        endGame();
+        return;
+      }
+
+      const newSnake = [newHead, ...prev];
+      const [fx, fy] = foodRef.current;
+      if (newHead[0] === fx && newHead[1] === fy) {
+        scoreRef.current += POINTS_PER_FOOD;
+        foodRef.current = freeCell(recorder.current!.rng, newSnake, obstacleCells);
+        setScore(scoreRef.current);
+        setFood(foodRef.current);
+        playBeep(900, 50);
+      } else {
+        newSnake.pop();
+      }
+      snakeRef.current = newSnake;
+      tickRef.current++;
+      setSnake(newSnake);
+      setDir(DIRS[dirRef.current]);
     }, SPEED_MAP[difficulty]);
 
     return () => clearInterval(moveSnake);
-  }, [
-    running,
-    paused,
-    gameOver,
-    nextDir,
-    food,
-    obstacles,
-    difficulty,
-    endGame,
-    countdown,
-  ]);
+  }, [running, paused, gameOver, difficulty, endGame, countdown]);
 
   useEffect(() => {
     const ctx = canvasRef.current?.getContext("2d");
@@ -330,24 +342,26 @@ export default function SnakeGame({
       ) {
         e.preventDefault();
       }
-      const keys: any = {
-        ArrowUp: [0, -1],
-        ArrowDown: [0, 1],
-        ArrowLeft: [-1, 0],
-        ArrowRight: [1, 0],
+      const keys: Record<string, number> = {
+        ArrowUp: 0,
+        ArrowDown: 1,
+        ArrowLeft: 2,
+        ArrowRight: 3,
       };
       if (e.key === " ") setPaused((p) => !p);
 
-      if (countdown === 0 && keys[e.key]) {
-        const newDir = keys[e.key];
-        if (newDir[0] !== -dir[0] || newDir[1] !== -dir[1]) {
-          setNextDir(newDir);
+      const turn = keys[e.key];
+      if (countdown === 0 && running && !gameOver && turn !== undefined) {
+        // Directions pair up (up/down, left/right), so turn ^ 1 is its reverse.
+        if ((turn ^ 1) !== dirRef.current) {
+          nextDirRef.current = turn;
+          recorder.current?.record(tickRef.current, turn);
         }
       }
     };
     window.addEventListener("keydown", handleKeyDown);
     return () => window.removeEventListener("keydown", handleKeyDown);
-  }, [dir, countdown]);
+  }, [countdown, running, gameOver]);
 
   return (
     <>
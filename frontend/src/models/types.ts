@@ -2,8 +2,10 @@ export interface Game {
     id: string;
     name: string;
     image?: string | null;
+    // srcset of the image's resized variants, by format ("avif", "webp").
+    image_srcset?: Record<string, string>;
     high_score?: number | null; 
-    high_score_player?: number | null;
+    high_score_player?: string | null;
     high_score_player_username?: string | null;
 }
 
@@ -1,6 +1,8 @@
 import axios from 'axios';
 
 export const API_URL = import.meta.env.VITE_API_URL || ''; 
+// The server pushes record changes (events/records/) only when it runs under ASGI.
+export const LIVE_RECORDS = import.meta.env.VITE_SERVER_MODE === 'asgi';
 
 const api = axios.create({
     baseURL: API_URL,
@@ -0,0 +1,79 @@
+// Seeded randomness and input logs for server-verified scores. The server
+// replays the log with the same rules (backend/base/replays) and only accepts
+// a score the replay reaches, so every draw that shapes gameplay must come
+// from the game's Random, in the order the server's simulator makes them.
+
+export const SNAKE = 1;
+export const BALLOON = 2;
+export const PENCIL = 3;
+const WEB = 0;
+const VERSION = 1;
+
+// mulberry32, bit for bit as backend/base/replays/log.py runs it.
+export class Random {
+  private state: number;
+
+  constructor(seed: number) {
+    this.state = seed >>> 0;
+  }
+
+  nextUint32(): number {
+    this.state = (this.state + 0x6d2b79f5) | 0;
+    let t = Math.imul(this.state ^ (this.state >>> 15), this.state | 1);
+    t = (t + Math.imul(t ^ (t >>> 7), t | 61)) ^ t;
+    return (t ^ (t >>> 14)) >>> 0;
+  }
+
+  random(): number {
+    return this.nextUint32() / 4294967296;
+  }
+
+  below(n: number): number {
+    return Math.floor((this.nextUint32() / 4294967296) * n);
+  }
+}
+
+export const newSeed = (): number =>
+  crypto.getRandomValues(new Uint32Array(1))[0];
+
+export class ReplayRecorder {
+  readonly rng: Random;
+  private readonly game: number;
+  private readonly level: number;
+  private readonly seed: number;
+  private bytes: number[] = [];
+  private count = 0;
+  private lastTick = 0;
+
+  constructor(game: number, level = 0, seed = newSeed()) {
+    this.game = game;
+    this.level = level;
+    this.seed = seed;
+    this.rng = new Random(seed);
+  }
+
+  record(tick: number, value: number) {
+    writeVarint(this.bytes, tick - this.lastTick);
+    writeVarint(this.bytes, value);
+    this.lastTick = tick;
+    this.count++;
+  }
+
+  encode(): string {
+    const out = [VERSION, this.game, WEB, this.level];
+    for (let i = 0; i < 4; i++) out.push((this.seed >>> (8 * i)) & 0xff);
+    writeVarint(out, this.count);
+    out.push(...this.bytes);
+    let binary = "";
+    for (const b of out) binary += String.fromCharCode(b);
+    return btoa(binary);
+  }
+}
+
+const writeVarint = (out: number[], value: number) => {
+  while (value >= 0x80) {
+    out.push((value & 0x7f) | 0x80);
+    value = Math.floor(value / 128);
+  }
+  out.push(value);
+};
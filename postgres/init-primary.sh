@@ -0,0 +1,12 @@
+#!/bin/sh
+# Runs once, when the primary's data volume is first initialised. For an
+# existing volume, run it by hand:
+#   docker compose exec -e REPLICATION_PASSWORD=... db sh /docker-entrypoint-initdb.d/init-primary.sh
+# then restart db so pg_hba.conf is reread.
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<SQL
+CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD '$REPLICATION_PASSWORD';
+SQL
+
+echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,16 @@
+#!/bin/sh
+# Streaming replica of the db service: clones the primary on first start,
+# then follows its WAL as a read-only hot standby.
+set -e
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -h "$PRIMARY_HOST" -U replicator -q; do
+        sleep 1
+    done
+    # -R writes standby.signal and primary_conninfo, so postgres starts as a standby.
+    PGPASSWORD="$REPLICATION_PASSWORD" pg_basebackup \
+        -h "$PRIMARY_HOST" -U replicator -D "$PGDATA" -R -X stream -c fast
+    chmod 0700 "$PGDATA"
+fi
+
+exec postgres -c hot_standby=on -c max_connections=100 -c shared_buffers=128MB